@@ -0,0 +1,134 @@
+"""Versioned model artifact layout.
+
+    artifacts/
+      CURRENT                 name of the active version, replaced atomically
+      versions/ml-3/          model.pkl + metadata.json (+ compiled/, see app.flatmodel),
+                              immutable once renamed into place
+      model.pkl, metadata.json  legacy mirror of the active version
+
+A version directory is staged under a temporary name and renamed into place, then CURRENT
+is swapped with os.replace, so readers only ever see a complete model/metadata pair.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+
+from app.utils import load_json, next_model_version
+
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+MODEL_FILE = "model.pkl"
+METADATA_FILE = "metadata.json"
+
+ArtifactToken = tuple[int, int]
+
+
+def _atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def atomic_dump_json(path: Path, payload: dict[str, Any]) -> None:
+    def write(tmp: Path) -> None:
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+
+    _atomic_write(path, write)
+
+
+def current_version(artifact_dir: Path) -> str | None:
+    try:
+        return (artifact_dir / CURRENT_FILE).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_artifact(artifact_dir: Path) -> tuple[Path, Path] | None:
+    """(model_path, metadata_path) of the active version, falling back to the legacy root files."""
+    version = current_version(artifact_dir)
+    if version:
+        version_dir = artifact_dir / VERSIONS_DIR / version
+        return version_dir / MODEL_FILE, version_dir / METADATA_FILE
+    model_path, metadata_path = artifact_dir / MODEL_FILE, artifact_dir / METADATA_FILE
+    if model_path.exists() and metadata_path.exists():
+        return model_path, metadata_path
+    return None
+
+
+def artifact_token(artifact_dir: Path) -> ArtifactToken | None:
+    """Cheap change marker: a single stat of CURRENT (or the legacy metadata file)."""
+    for name in (CURRENT_FILE, METADATA_FILE):
+        try:
+            st = os.stat(artifact_dir / name)
+        except FileNotFoundError:
+            continue
+        return st.st_mtime_ns, st.st_ino
+    return None
+
+
+def latest_version(artifact_dir: Path) -> str | None:
+    version = current_version(artifact_dir)
+    if version:
+        return version
+    legacy = artifact_dir / METADATA_FILE
+    if legacy.exists():
+        return str(load_json(legacy).get("model_version"))
+    return None
+
+
+def publish(
+    artifact_dir: Path,
+    estimator: Any,
+    metadata: dict[str, Any],
+    write_extra: Callable[[Path], None] | None = None,
+) -> dict[str, Any]:
+    """Write a new immutable version directory and point CURRENT at it.
+
+    metadata["model_version"] is assigned here (bumped past any existing version directory, so
+    concurrent publishers in other processes never share one). `write_extra(staging_dir)` adds
+    version-independent files to the directory before it is renamed. Returns the final metadata.
+    """
+    versions_dir = artifact_dir / VERSIONS_DIR
+    versions_dir.mkdir(parents=True, exist_ok=True)
+
+    staging = versions_dir / f".staging-{uuid.uuid4().hex}"
+    staging.mkdir()
+    try:
+        joblib.dump(estimator, staging / MODEL_FILE)
+        if write_extra is not None:
+            write_extra(staging)
+        version = next_model_version(latest_version(artifact_dir))
+        while True:
+            metadata = metadata | {"model_version": version}
+            atomic_dump_json(staging / METADATA_FILE, metadata)
+            try:
+                os.rename(staging, versions_dir / version)
+                break
+            except OSError:
+                if not (versions_dir / version).exists():
+                    raise
+                version = next_model_version(version)
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging)
+
+    version_dir = versions_dir / version
+    _atomic_write(artifact_dir / CURRENT_FILE, lambda tmp: tmp.write_text(version + "\n", encoding="utf-8"))
+
+    # Legacy mirror for tooling that still reads the root files; never read while CURRENT exists.
+    _atomic_write(artifact_dir / MODEL_FILE, lambda tmp: tmp.write_bytes((version_dir / MODEL_FILE).read_bytes()))
+    atomic_dump_json(artifact_dir / METADATA_FILE, metadata)
+    return metadata
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from app.models import FEATURE_NAMES_V1, Driver, FeaturesV1
+from app.utils import bands_for_risk
+
+
+ScoreTuple = tuple[float, str, list[Driver], str]
+# Plain-tuple forms of Driver and ScoreTuple: immutable, cheap to cache and to encode as JSON.
+DriverRow = tuple[str, float, str, float]
+ScoreRow = tuple[float, str, tuple[DriverRow, ...], str]
+
+
+def driver_row(driver: Driver) -> DriverRow:
+    return driver.name, driver.value, driver.direction, driver.contribution
+
+
+def driver_models(rows: Sequence[DriverRow]) -> list[Driver]:
+    return [Driver(name=name, value=value, direction=direction, contribution=contrib) for name, value, direction, contrib in rows]
+
+
+def as_score_row(result: ScoreTuple) -> ScoreRow:
+    risk, band, drivers, version = result
+    return risk, band, tuple(driver_row(d) for d in drivers), version
+
+
+def as_score_tuple(row: ScoreRow) -> ScoreTuple:
+    risk, band, drivers, version = row
+    return risk, band, driver_models(drivers), version
+
+
+def feature_matrix(items: Sequence[FeaturesV1]) -> np.ndarray:
+    x = np.empty((len(items), len(FEATURE_NAMES_V1)), dtype=float)
+    for idx, item in enumerate(items):
+        x[idx] = item.as_feature_vector()
+    return x
+
+
+@dataclass(frozen=True)
+class BatchScores:
+    """Scores for a whole feature matrix, kept as arrays until a caller needs rows."""
+
+    values: np.ndarray
+    risk: np.ndarray
+    contributions: np.ndarray
+    driver_mask: np.ndarray
+    driver_names: Sequence[str]
+    baseline: Driver
+    model_version: str
+
+    def __len__(self) -> int:
+        return int(self.risk.shape[0])
+
+    def bands(self) -> list[str]:
+        return bands_for_risk(self.risk)
+
+    def driver_rows(self, idx: int) -> tuple[DriverRow, ...]:
+        cols = np.flatnonzero(self.driver_mask[idx])
+        if cols.size == 0:
+            return (driver_row(self.baseline),)
+
+        drivers: list[DriverRow] = []
+        for col in cols.tolist():
+            contrib = float(self.contributions[idx, col])
+            drivers.append(
+                (
+                    self.driver_names[col],
+                    round(float(self.values[idx, col]), 4),
+                    "up" if contrib >= 0 else "down",
+                    round(contrib, 4),
+                )
+            )
+        drivers.sort(key=lambda d: (-abs(d[3]), d[0]))
+        return tuple(drivers[:6])
+
+    def drivers_for(self, idx: int) -> list[Driver]:
+        return driver_models(self.driver_rows(idx))
+
+    def as_rows(self) -> list[ScoreRow]:
+        bands = self.bands()
+        return [
+            (round(float(risk), 6), bands[idx], self.driver_rows(idx), self.model_version)
+            for idx, risk in enumerate(self.risk.tolist())
+        ]
+
+    def as_tuples(self) -> list[ScoreTuple]:
+        return [as_score_tuple(row) for row in self.as_rows()]
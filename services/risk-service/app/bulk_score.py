@@ -0,0 +1,279 @@
+"""Offline bulk scoring over CSV or Parquet feature files.
+
+    python -m app.bulk_score features.parquet scores.csv --workers 4
+
+Input needs `user_id`, `as_of_date` and any of FEATURE_NAMES_V1 (missing columns and empty
+cells get the FeaturesV1 defaults). Output has one row per input row with risk, band, the
+top three drivers and an `error` column for rows that fail FeaturesV1 validation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+from app.batch import BatchScores
+from app.ml import ModelManager
+from app.models import FEATURE_FILL_V1, FEATURE_NAMES_V1
+from app.scoring import score_rule_v0_batch
+
+
+logger = logging.getLogger("risk-service.bulk")
+
+TOP_DRIVERS = 3
+REQUIRED_COLUMNS = ("user_id", "as_of_date")
+OUTPUT_COLUMNS = ["user_id", "as_of_date", "risk", "band", "model_version", "error"] + [
+    f"driver_{idx}{suffix}" for idx in range(1, TOP_DRIVERS + 1) for suffix in ("", "_contribution")
+]
+
+Chunk = dict[str, list[Any]]
+
+_worker_manager: ModelManager | None = None
+_worker_rule_only = False
+_worker_version: str | None = None
+
+
+def iter_csv_chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        columns = list(reader.fieldnames or [])
+        chunk: Chunk = {name: [] for name in columns}
+        for row in reader:
+            for name in columns:
+                chunk[name].append(row[name])
+            if len(chunk[columns[0]]) >= chunk_size:
+                yield chunk
+                chunk = {name: [] for name in columns}
+        if columns and chunk[columns[0]]:
+            yield chunk
+
+
+def iter_parquet_chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+    try:
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as exc:
+        raise SystemExit("Parquet input requires pyarrow (pip install pyarrow)") from exc
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pydict()
+
+
+def float_column(values: list[Any] | None, n: int, fill: float) -> tuple[np.ndarray, np.ndarray]:
+    """Column as floats with FeaturesV1 defaults for missing cells, plus a mask of unparseable cells."""
+    bad = np.zeros(n, dtype=bool)
+    if values is None:
+        return np.full(n, fill), bad
+    cleaned = [fill if v is None or v == "" else v for v in values]
+    try:
+        col = np.array(cleaned, dtype=float)
+    except (TypeError, ValueError):
+        col = np.full(n, fill)
+        for idx, v in enumerate(cleaned):
+            try:
+                col[idx] = float(v)
+            except (TypeError, ValueError):
+                bad[idx] = True
+    col[np.isnan(col)] = fill
+    return col, bad
+
+
+def _row_errors(dates: list[Any], adherence: np.ndarray, bad: np.ndarray) -> list[str]:
+    errors = []
+    for date, adh, bad_cols in zip(dates, adherence.tolist(), bad):
+        if bad_cols.any():
+            names = [FEATURE_NAMES_V1[col] for col in np.flatnonzero(bad_cols)]
+            errors.append(f"not a number: {', '.join(names)}")
+            continue
+        try:
+            datetime.strptime(str(date), "%Y-%m-%d")
+        except ValueError:
+            errors.append(f"as_of_date: invalid date {date!r}")
+            continue
+        errors.append("" if 0 <= adh <= 1 else "adherence_nudge_7d must be in [0, 1]")
+    return errors
+
+
+def init_worker(artifact_dir: str | None, rule_only: bool, model_version: str | None = None) -> None:
+    global _worker_manager, _worker_rule_only, _worker_version
+    _worker_rule_only = rule_only
+    _worker_version = model_version
+    _worker_manager = None if rule_only else ModelManager(artifact_dir=Path(artifact_dir) if artifact_dir else None)
+
+
+def chunk_features(chunk: Chunk, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """(n, 13) feature matrix with FeaturesV1 defaults, and the matching mask of unparseable cells."""
+    columns = [float_column(chunk.get(name), n, FEATURE_FILL_V1[name]) for name in FEATURE_NAMES_V1]
+    return np.column_stack([col for col, _ in columns]), np.column_stack([mask for _, mask in columns])
+
+
+def score_chunk(chunk: Chunk) -> list[dict[str, Any]]:
+    n = len(chunk.get("as_of_date") or [])
+    x, bad = chunk_features(chunk, n)
+    errors = _row_errors(chunk.get("as_of_date") or [], x[:, FEATURE_NAMES_V1.index("adherence_nudge_7d")], bad)
+
+    if _worker_rule_only or _worker_manager is None:
+        scores: BatchScores = score_rule_v0_batch(x)
+    else:
+        scores = _worker_manager.score_matrix(x, _worker_version)
+
+    bands = scores.bands()
+    user_ids = chunk.get("user_id") or [None] * n
+    rows: list[dict[str, Any]] = []
+    for idx in range(n):
+        row: dict[str, Any] = {"user_id": user_ids[idx], "as_of_date": chunk["as_of_date"][idx], "error": errors[idx]}
+        if not errors[idx]:
+            row.update(risk=round(float(scores.risk[idx]), 6), band=bands[idx], model_version=scores.model_version)
+            for rank, driver in enumerate(scores.drivers_for(idx)[:TOP_DRIVERS], start=1):
+                row[f"driver_{rank}"] = driver.name
+                row[f"driver_{rank}_contribution"] = driver.contribution
+        rows.append(row)
+    return rows
+
+
+class _CsvWriter:
+    def __init__(self, path: Path) -> None:
+        self._file = path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=OUTPUT_COLUMNS, restval="")
+        self._writer.writeheader()
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path) -> None:
+        try:
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+        except ImportError as exc:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)") from exc
+        self._pa = pa
+        self._pq = pq
+        self._path = path
+        self._writer: Any = None
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        table = self._pa.Table.from_pylist([{col: row.get(col) for col in OUTPUT_COLUMNS} for row in rows])
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in {".parquet", ".pq"}
+
+
+def read_columns(path: Path) -> list[str]:
+    """Column names from a CSV header or a Parquet schema, without reading any rows."""
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq  # type: ignore
+        except ImportError as exc:
+            raise SystemExit("Parquet input requires pyarrow (pip install pyarrow)") from exc
+        return list(pq.read_schema(path).names)
+    with path.open("r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def check_columns(path: Path) -> None:
+    missing = [name for name in REQUIRED_COLUMNS if name not in read_columns(path)]
+    if missing:
+        raise SystemExit(f"{path}: missing required column(s): {', '.join(missing)}")
+
+
+def score_chunks(chunks: Iterable[Chunk], workers: int, init_args: tuple[Any, ...]) -> Iterator[list[dict[str, Any]]]:
+    """Scored rows per chunk, in input order."""
+    if workers <= 1:
+        init_worker(*init_args)
+        for chunk in chunks:
+            yield score_chunk(chunk)
+        return
+    # Bounded window: Executor.map would read the whole input up front; never read more than 2 x workers chunks ahead.
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=init_args) as pool:
+        in_flight: deque[Future[list[dict[str, Any]]]] = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(score_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def iter_chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+    return (iter_parquet_chunks if _is_parquet(path) else iter_csv_chunks)(path, chunk_size)
+
+
+def open_writer(path: Path) -> _CsvWriter | _ParquetWriter:
+    """Parquet for .parquet/.pq paths, CSV otherwise; rows are dicts keyed by OUTPUT_COLUMNS."""
+    return _ParquetWriter(path) if _is_parquet(path) else _CsvWriter(path)
+
+
+def run(
+    input_path: Path,
+    output_path: Path,
+    *,
+    chunk_size: int = 50_000,
+    workers: int = 1,
+    artifact_dir: Path | None = None,
+    rule_only: bool = False,
+) -> dict[str, float]:
+    check_columns(input_path)
+    chunks = iter_chunks(input_path, chunk_size)
+    writer = open_writer(output_path)
+    init_args = (str(artifact_dir) if artifact_dir else None, rule_only)
+
+    n_rows = 0
+    started = time.perf_counter()
+    try:
+        for rows in score_chunks(chunks, workers, init_args):
+            writer.write(rows)
+            n_rows += len(rows)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {"rows": n_rows, "seconds": round(elapsed, 3), "rows_per_second": round(n_rows / elapsed, 1) if elapsed else 0.0}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bulk_score", description="Bulk-score a CSV/Parquet feature file.")
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1, help="process pool size; 1 scores in-process")
+    parser.add_argument("--artifact-dir", type=Path, default=None, help="defaults to RISK_ARTIFACT_DIR")
+    parser.add_argument("--rule-only", action="store_true", help="score with rule-v0 even if a model artifact exists")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    stats = run(
+        args.input,
+        args.output,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        artifact_dir=args.artifact_dir,
+        rule_only=args.rule_only,
+    )
+    logger.info("bulk_score rows=%d seconds=%.3f rows_per_second=%.1f", stats["rows"], stats["seconds"], stats["rows_per_second"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
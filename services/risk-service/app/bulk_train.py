@@ -0,0 +1,214 @@
+"""Out-of-core training from CSV or Parquet files of labeled feature rows.
+
+    python -m app.bulk_train history/*.parquet --label-column label --memory-budget-mb 2048
+
+Rows are counted first (a newline scan for CSV, file metadata for Parquet), then streamed
+chunk by chunk straight into two preallocated float32 matrices: the training set and a
+random holdout. The input matrices take about 57 bytes per row plus one chunk, with no list
+of row objects and no extra copy for the split. Fitting adds the estimator's own working
+copies on top of that, such as xgboost's DMatrix or sklearn's validation copies, so peak RSS
+is a few times the matrix size. Rows with an unparseable feature or label are skipped.
+The fitted model is published like any /train result. Its rows replace the incremental
+training store, as a full /train does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+from app.bulk_score import Chunk, float_column, iter_csv_chunks, iter_parquet_chunks
+from app.ml import ModelManager
+from app.models import FEATURE_FILL_V1, FEATURE_NAMES_V1
+
+
+logger = logging.getLogger("risk-service.bulk_train")
+
+# float32 features + float32 label + one byte of holdout mask per row.
+BYTES_PER_ROW = 4 * len(FEATURE_NAMES_V1) + 4 + 1
+ADHERENCE_COL = FEATURE_NAMES_V1.index("adherence_nudge_7d")
+_COUNT_BLOCK = 1 << 20
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in {".parquet", ".pq"}
+
+
+def count_rows(path: Path) -> int:
+    """Upper bound on data rows; exact unless quoted CSV cells contain newlines."""
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq  # type: ignore
+        except ImportError as exc:
+            raise SystemExit("Parquet input requires pyarrow (pip install pyarrow)") from exc
+        return int(pq.ParquetFile(path).metadata.num_rows)
+    lines = 0
+    last = b"\n"
+    with path.open("rb") as f:
+        while block := f.read(_COUNT_BLOCK):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def _chunk_arrays(chunk: Chunk, label_column: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(x, y, valid) for one chunk; invalid rows have a bad feature, a bad label or adherence outside [0, 1]."""
+    values = chunk.get(label_column)
+    if values is None:
+        raise SystemExit(f"Input is missing the label column {label_column!r}")
+    n = len(values)
+    x = np.empty((n, len(FEATURE_NAMES_V1)), dtype=np.float32)
+    valid = np.ones(n, dtype=bool)
+    for col, name in enumerate(FEATURE_NAMES_V1):
+        values_col, bad = float_column(chunk.get(name), n, FEATURE_FILL_V1[name])
+        x[:, col] = values_col
+        valid &= ~bad
+    y, bad = float_column(values, n, np.nan)
+    valid &= ~bad & ~np.isnan(y)
+    adherence = x[:, ADHERENCE_COL]
+    valid &= (adherence >= 0) & (adherence <= 1)
+    return x, y.astype(np.float32), valid
+
+
+def _fill(x_out: np.ndarray, y_out: np.ndarray, offset: int, x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> int:
+    count = int(mask.sum())
+    x_out[offset : offset + count] = x[mask]
+    y_out[offset : offset + count] = y[mask]
+    return offset + count
+
+
+def _iter_chunks(paths: list[Path], chunk_size: int) -> Iterator[Chunk]:
+    for path in paths:
+        yield from (iter_parquet_chunks if _is_parquet(path) else iter_csv_chunks)(path, chunk_size)
+
+
+def run(
+    paths: list[Path],
+    *,
+    label_column: str = "label",
+    chunk_size: int = 100_000,
+    holdout: float = 0.2,
+    model_type: str | None = None,
+    memory_budget_mb: float = 0.0,
+    artifact_dir: Path | None = None,
+    seed: int = 42,
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    baseline_rss = peak_rss_mb()
+    capacity = sum(count_rows(path) for path in paths)
+    matrix_mb = capacity * BYTES_PER_ROW / (1024 * 1024)
+    # Input matrices only: the estimator's fit-time copies are not included.
+    if memory_budget_mb and matrix_mb > memory_budget_mb:
+        raise SystemExit(
+            f"{capacity} rows need ~{matrix_mb:.0f} MB of input matrices, over the {memory_budget_mb:.0f} MB budget"
+        )
+
+    # Holdout membership is fixed per input position up front, so both matrices have exact sizes.
+    rng = np.random.default_rng(seed)
+    is_eval = np.empty(capacity, dtype=bool)
+    for start in range(0, capacity, _COUNT_BLOCK):
+        stop = min(start + _COUNT_BLOCK, capacity)
+        is_eval[start:stop] = rng.random(stop - start, dtype=np.float32) < holdout
+    n_eval = int(is_eval.sum())
+    x_train = np.empty((capacity - n_eval, len(FEATURE_NAMES_V1)), dtype=np.float32)
+    y_train = np.empty(capacity - n_eval, dtype=np.float32)
+    x_eval = np.empty((n_eval, len(FEATURE_NAMES_V1)), dtype=np.float32)
+    y_eval = np.empty(n_eval, dtype=np.float32)
+
+    position = n_train_rows = n_eval_rows = skipped = 0
+    for chunk in _iter_chunks(paths, chunk_size):
+        x, y, valid = _chunk_arrays(chunk, label_column)
+        n = len(y)
+        if position + n > capacity:
+            raise SystemExit("Input grew while it was being read")
+        eval_mask = is_eval[position : position + n]
+        position += n
+        skipped += int(n - valid.sum())
+        n_train_rows = _fill(x_train, y_train, n_train_rows, x, y, valid & ~eval_mask)
+        n_eval_rows = _fill(x_eval, y_eval, n_eval_rows, x, y, valid & eval_mask)
+    load_seconds = time.perf_counter() - started
+
+    stats: dict[str, Any] = {
+        "files": [str(path) for path in paths],
+        "rows": n_train_rows + n_eval_rows,
+        "skipped": skipped,
+        "matrix_mb": round(matrix_mb, 1),
+        "load_seconds": round(load_seconds, 3),
+    }
+    manager = ModelManager(artifact_dir=artifact_dir)
+    # Slices of the preallocated matrices are views: trailing unused rows are never copied.
+    out = manager.train_arrays(
+        x_train[:n_train_rows],
+        y_train[:n_train_rows],
+        x_eval[:n_eval_rows],
+        y_eval[:n_eval_rows],
+        model_type=model_type,
+        extra_metadata={"out_of_core": stats},
+    )
+    stats |= {
+        "model_version": out["model_version"],
+        "metrics": out["metrics"],
+        "seconds": round(time.perf_counter() - started, 3),
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bulk_train", description="Train a model from CSV/Parquet files without loading them into memory."
+    )
+    parser.add_argument("inputs", type=Path, nargs="+")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction of rows kept for evaluation")
+    parser.add_argument("--model-type", choices=["xgboost", "logistic_regression"], default=None)
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=float,
+        default=0.0,
+        help="refuse inputs whose input matrices exceed this (fitting needs more on top); 0 = no limit",
+    )
+    parser.add_argument("--artifact-dir", type=Path, default=None, help="defaults to RISK_ARTIFACT_DIR")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    stats = run(
+        args.inputs,
+        label_column=args.label_column,
+        chunk_size=args.chunk_size,
+        holdout=args.holdout,
+        model_type=args.model_type,
+        memory_budget_mb=args.memory_budget_mb,
+        artifact_dir=args.artifact_dir,
+    )
+    logger.info(
+        "bulk_train version=%s rows=%d skipped=%d seconds=%.3f matrix_mb=%.1f peak_rss_mb=%.1f",
+        stats["model_version"],
+        stats["rows"],
+        stats["skipped"],
+        stats["seconds"],
+        stats["matrix_mb"],
+        stats["peak_rss_mb"],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Population risk and feature distributions per model version, for cohort comparisons.
+
+Each model version keeps fixed-bin histograms: RISK_BINS bins over [0, 1] for risk,
+FEATURE_BINS bins per feature over FEATURE_RANGES (out-of-range values land in the edge
+bins), plus band counts. It also keeps each user's current bins, so a user scored again
+replaces their old contribution instead of being counted twice. Rows without a user_id
+are not recorded.
+
+An update costs O(rows). Queries never look at individual users. Percentiles and quantiles
+read cumulative counts, which are rebuilt lazily (O(bins)) after an update, so query cost
+does not depend on population size. Percentiles are exact to within one bin.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+from app.columnar import BAND_NAMES
+from app.models import FEATURE_NAMES_V1
+from app.vitals import CLAMPS
+
+
+RISK_BINS = 1000
+FEATURE_BINS = 200
+FEATURE_RANGES = CLAMPS | {"a1c_latest": (3.0, 15.0), "ldl_latest": (0.0, 400.0)}
+_LOW = np.array([FEATURE_RANGES[name][0] for name in FEATURE_NAMES_V1])
+_HIGH = np.array([FEATURE_RANGES[name][1] for name in FEATURE_NAMES_V1])
+_BAND_CODES = {name: code for code, name in enumerate(BAND_NAMES)}
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def risk_bins(risk: np.ndarray) -> np.ndarray:
+    return np.clip((np.asarray(risk, dtype=float) * RISK_BINS).astype(np.int64), 0, RISK_BINS - 1)
+
+
+def feature_bins(x: np.ndarray) -> np.ndarray:
+    scaled = (np.asarray(x, dtype=float) - _LOW) / (_HIGH - _LOW) * FEATURE_BINS
+    return np.clip(np.nan_to_num(scaled, nan=0.0).astype(np.int64), 0, FEATURE_BINS - 1)
+
+
+def _rank(counts: np.ndarray, cum: np.ndarray, bin_idx: int, frac: float) -> float:
+    """Count of population values below a point `frac` of the way through bin `bin_idx`."""
+    return float(cum[bin_idx] - counts[bin_idx]) + float(counts[bin_idx]) * frac
+
+
+class CohortStats:
+    """One model version's population. Not thread-safe on its own; CohortIndex holds the lock."""
+
+    def __init__(self) -> None:
+        self.users: dict[str, int] = {}
+        self.risk = np.empty(0, dtype=np.float64)
+        self.risk_bin = np.empty(0, dtype=np.int16)
+        self.band = np.empty(0, dtype=np.int8)
+        self.feature_bin = np.empty((0, len(FEATURE_NAMES_V1)), dtype=np.int16)
+        self.risk_counts = np.zeros(RISK_BINS, dtype=np.int64)
+        self.band_counts = np.zeros(len(BAND_NAMES), dtype=np.int64)
+        self.feature_counts = np.zeros((len(FEATURE_NAMES_V1), FEATURE_BINS), dtype=np.int64)
+        self._risk_cum: np.ndarray | None = None
+        self._feature_cum: np.ndarray | None = None
+
+    @property
+    def n(self) -> int:
+        return len(self.users)
+
+    def _grow(self, n: int) -> None:
+        if n <= len(self.risk):
+            return
+        capacity = max(n, 2 * len(self.risk), 1024)
+        for name in ("risk", "risk_bin", "band", "feature_bin"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def _count(self, slots: np.ndarray, sign: int) -> None:
+        self.risk_counts += sign * np.bincount(self.risk_bin[slots], minlength=RISK_BINS)
+        self.band_counts += sign * np.bincount(self.band[slots], minlength=len(BAND_NAMES))
+        flat = (np.arange(len(FEATURE_NAMES_V1)) * FEATURE_BINS + self.feature_bin[slots]).ravel()
+        self.feature_counts += sign * np.bincount(flat, minlength=self.feature_counts.size).reshape(self.feature_counts.shape)
+
+    def add(self, user_ids: Sequence[str | None], x: np.ndarray, risk: np.ndarray, bands: Sequence[str]) -> int:
+        latest = {user_id: idx for idx, user_id in enumerate(user_ids) if user_id}
+        if not latest:
+            return 0
+        rows = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+        slots = np.empty(len(latest), dtype=np.int64)
+        known = np.zeros(len(latest), dtype=bool)
+        for k, user_id in enumerate(latest):
+            slot = self.users.get(user_id)
+            known[k] = slot is not None
+            slots[k] = self.users.setdefault(user_id, len(self.users)) if slot is None else slot
+        self._grow(len(self.users))
+        self._count(slots[known], -1)
+        self.risk[slots] = np.asarray(risk, dtype=float)[rows]
+        self.risk_bin[slots] = risk_bins(self.risk[slots])
+        self.band[slots] = [_BAND_CODES[bands[row]] for row in rows.tolist()]
+        self.feature_bin[slots] = feature_bins(x[rows])
+        self._count(slots, 1)
+        self._risk_cum = self._feature_cum = None
+        return len(latest)
+
+    def _cums(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._risk_cum is None or self._feature_cum is None:
+            self._risk_cum = np.cumsum(self.risk_counts)
+            self._feature_cum = np.cumsum(self.feature_counts, axis=1)
+        return self._risk_cum, self._feature_cum
+
+    def percentile(self, risk: float) -> float:
+        """Share of the population (0-100) scored below `risk`."""
+        if not self.n:
+            return 0.0
+        risk_cum, _ = self._cums()
+        scaled = min(max(risk, 0.0), 1.0) * RISK_BINS
+        bin_idx = min(int(scaled), RISK_BINS - 1)
+        return 100.0 * _rank(self.risk_counts, risk_cum, bin_idx, scaled - bin_idx) / self.n
+
+    def feature_percentiles(self, bins: np.ndarray) -> dict[str, float]:
+        """Per-feature share (0-100) of the population below one user's feature bins (mid-bin)."""
+        if not self.n:
+            return {name: 0.0 for name in FEATURE_NAMES_V1}
+        _, feature_cum = self._cums()
+        return {
+            name: round(100.0 * _rank(self.feature_counts[col], feature_cum[col], int(bins[col]), 0.5) / self.n, 2)
+            for col, name in enumerate(FEATURE_NAMES_V1)
+        }
+
+    def quantiles(self, qs: Sequence[float] = QUANTILES) -> dict[str, float]:
+        if not self.n:
+            return {}
+        risk_cum, _ = self._cums()
+        out = {}
+        for q in qs:
+            target = q * self.n
+            bin_idx = min(int(np.searchsorted(risk_cum, target, side="left")), RISK_BINS - 1)
+            before = float(risk_cum[bin_idx] - self.risk_counts[bin_idx])
+            frac = (target - before) / self.risk_counts[bin_idx] if self.risk_counts[bin_idx] else 0.0
+            out[f"p{round(q * 100):d}"] = round((bin_idx + frac) / RISK_BINS, 4)
+        return out
+
+    def histogram(self, n_bins: int) -> list[dict[str, float]]:
+        edges = np.linspace(0, RISK_BINS, n_bins + 1).round().astype(np.int64)
+        counts = np.add.reduceat(self.risk_counts, edges[:-1])
+        return [
+            {"low": low / RISK_BINS, "high": high / RISK_BINS, "count": int(count)}
+            for low, high, count in zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist())
+        ]
+
+    def band_shares(self) -> dict[str, float]:
+        return {name: round(float(count) / self.n, 4) if self.n else 0.0 for name, count in zip(BAND_NAMES, self.band_counts)}
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        n = self.n
+        return {
+            "users": np.array(list(self.users), dtype=str),
+            "risk": self.risk[:n],
+            "band": self.band[:n],
+            "feature_bin": self.feature_bin[:n],
+        }
+
+    @classmethod
+    def from_arrays(cls, users: np.ndarray, risk: np.ndarray, band: np.ndarray, feature_bin: np.ndarray) -> CohortStats:
+        stats = cls()
+        stats.users = {user_id: slot for slot, user_id in enumerate(users.tolist())}
+        stats._grow(len(users))
+        n = len(users)
+        stats.risk[:n] = risk
+        stats.risk_bin[:n] = risk_bins(risk)
+        stats.band[:n] = band
+        stats.feature_bin[:n] = feature_bin
+        stats._count(np.arange(n), 1)
+        return stats
+
+
+class CohortIndex:
+    def __init__(self) -> None:
+        self._versions: dict[str, CohortStats] = {}
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    def add(
+        self, version: str, user_ids: Sequence[str | None], x: np.ndarray, risk: np.ndarray, bands: Sequence[str]
+    ) -> int:
+        """Record scored rows; returns how many users were recorded (last row wins per user)."""
+        with self._lock:
+            stats = self._versions.setdefault(version, CohortStats())
+            recorded = stats.add(user_ids, x, risk, bands)
+            self.updates += 1
+        return recorded
+
+    def versions(self) -> list[str]:
+        with self._lock:
+            return sorted(self._versions)
+
+    def summary(self, version: str, n_bins: int) -> dict[str, Any] | None:
+        with self._lock:
+            stats = self._versions.get(version)
+            if stats is None:
+                return None
+            return {
+                "model_version": version,
+                "n_users": stats.n,
+                "band_shares": stats.band_shares(),
+                "quantiles": stats.quantiles(),
+                "histogram": stats.histogram(n_bins),
+            }
+
+    def compare(self, version: str, user_id: str | None, risk: float | None) -> dict[str, Any] | None:
+        """Percentiles of a stored user's score and features, or of a bare risk; None if either is unknown."""
+        with self._lock:
+            stats = self._versions.get(version)
+            if stats is None:
+                return None
+            feature_percentiles: dict[str, float] = {}
+            if user_id is not None:
+                slot = stats.users.get(user_id)
+                if slot is None:
+                    return None
+                risk = float(stats.risk[slot])
+                feature_percentiles = stats.feature_percentiles(stats.feature_bin[slot])
+            if risk is None:
+                return None
+            return {
+                "model_version": version,
+                "n_users": stats.n,
+                "risk": round(risk, 6),
+                "percentile": round(stats.percentile(risk), 2),
+                "feature_percentiles": feature_percentiles,
+                "band_shares": stats.band_shares(),
+            }
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "versions": len(self._versions),
+                "users": sum(stats.n for stats in self._versions.values()),
+                "updates": self.updates,
+            }
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            arrays = {
+                f"{version}:{name}": values
+                for version, stats in self._versions.items()
+                for name, values in stats.arrays().items()
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".tmp-{path.name}")
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        tmp.replace(path)
+
+    def load(self, path: Path) -> list[str]:
+        """Replace the populations of every version in a saved index; returns those versions."""
+        with np.load(path, allow_pickle=False) as data:
+            versions = sorted({key.rsplit(":", 1)[0] for key in data.files})
+            names = ("users", "risk", "band", "feature_bin")
+            loaded = {version: CohortStats.from_arrays(*(data[f"{version}:{name}"] for name in names)) for version in versions}
+        with self._lock:
+            self._versions.update(loaded)
+        return versions
@@ -0,0 +1,154 @@
+"""Columnar binary bodies for /score/batch, for callers that want to skip JSON entirely.
+
+Request (Content-Type: application/x-risk-features), little-endian:
+
+    b"RSF1" | uint32 n_rows | uint32 ids_bytes | uint32 dates_bytes
+    float64[13][n_rows]   one column per FEATURE_NAMES_V1 entry, in order; NaN = missing
+    ids_bytes             UTF-8 user ids joined by "\\n" ("" = none); 0 bytes = no ids
+    dates_bytes           as_of_date values joined by "\\n"
+
+Response (application/x-risk-scores):
+
+    b"RSS1" | uint32 n_rows | uint32 meta_bytes | uint32 flags (bit 0: contributions follow)
+    meta_bytes            JSON {"model_version", "bands", "drivers"}, space-padded to 8 bytes
+    float64[n_rows]       risk, rounded to 6 places
+    uint8[n_rows]         band, as an index into meta["bands"], zero-padded to 8 bytes
+    float64[len(drivers)][n_rows]  driver contributions (rounded to 4 places, 0 = not a driver)
+
+The feature block starts 8-byte aligned and is used in place as the scoring matrix.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any
+
+import numpy as np
+from fastapi.exceptions import RequestValidationError
+
+from app.batch import BatchScores
+from app.fastpath import ADHERENCE, FEATURE_INDEX, FILL_VECTOR, DecodedBatch, date_error
+from app.models import FEATURE_NAMES_V1
+
+
+FEATURES_CONTENT_TYPE = "application/x-risk-features"
+SCORES_CONTENT_TYPE = "application/x-risk-scores"
+BAND_NAMES = ("green", "amber", "red")
+
+_REQUEST_HEADER = struct.Struct("<4sIII")
+_RESPONSE_HEADER = struct.Struct("<4sIII")
+_REQUEST_MAGIC = b"RSF1"
+_RESPONSE_MAGIC = b"RSS1"
+FLAG_CONTRIBUTIONS = 1
+
+
+def _body_error(msg: str) -> RequestValidationError:
+    return RequestValidationError([{"type": "value_error", "loc": ("body",), "msg": msg, "input": None}])
+
+
+def _split(raw: bytes, n_rows: int, field: str) -> list[str]:
+    try:
+        values = raw.decode("utf-8").split("\n")
+    except UnicodeDecodeError as exc:
+        raise _body_error(f"{field} are not valid UTF-8") from exc
+    if len(values) != n_rows:
+        raise _body_error(f"expected {n_rows} {field}, got {len(values)}")
+    return values
+
+
+def decode_columnar(body: bytes, max_rows: int) -> DecodedBatch:
+    """Feature columns become an (n_rows, 13) Fortran-ordered view of the body, not a copy."""
+    if len(body) < _REQUEST_HEADER.size:
+        raise _body_error("truncated header")
+    magic, n_rows, ids_bytes, dates_bytes = _REQUEST_HEADER.unpack_from(body)
+    if magic != _REQUEST_MAGIC:
+        raise _body_error("not an application/x-risk-features body")
+    if not 1 <= n_rows <= max_rows:
+        raise _body_error(f"n_rows must be between 1 and {max_rows}")
+    n_features = len(FEATURE_NAMES_V1)
+    start = _REQUEST_HEADER.size
+    ids_start = start + 8 * n_features * n_rows
+    dates_start = ids_start + ids_bytes
+    if len(body) != dates_start + dates_bytes:
+        raise _body_error("body length does not match the header")
+
+    x = np.frombuffer(body, dtype="<f8", count=n_features * n_rows, offset=start).reshape(n_features, n_rows).T
+    missing = np.isnan(x)
+    if missing.any():
+        x = np.where(missing, FILL_VECTOR, x)
+
+    user_ids: list[str | None] = [None] * n_rows
+    if ids_bytes:
+        user_ids = [value or None for value in _split(body[ids_start:dates_start], n_rows, "user ids")]
+    dates = _split(body[dates_start:], n_rows, "dates")
+
+    errors: dict[int, list[dict[str, Any]]] = {}
+    for idx, value in enumerate(dates):
+        message = date_error(value)
+        if message is not None:
+            errors.setdefault(idx, []).append(
+                {"type": "value_error", "loc": ("as_of_date",), "msg": f"Value error, {message}", "input": value}
+            )
+    adherence = x[:, FEATURE_INDEX[ADHERENCE]]
+    for idx in np.flatnonzero((adherence < 0) | (adherence > 1)).tolist():
+        errors.setdefault(idx, []).append(
+            {
+                "type": "value_error",
+                "loc": (ADHERENCE,),
+                "msg": "Value error, adherence_nudge_7d must be in [0, 1]",
+                "input": float(adherence[idx]),
+            }
+        )
+    return DecodedBatch(user_ids=user_ids, dates=dates, x=x, errors=errors)
+
+
+def _pad8(raw: bytes, fill: bytes) -> bytes:
+    return raw + fill * (-len(raw) % 8)
+
+
+def encode_columnar(scores: BatchScores, drivers: bool) -> bytes:
+    n_rows = len(scores)
+    risk = np.asarray(scores.risk, dtype=float)
+    bands = ((risk >= 0.33).astype(np.uint8) + (risk >= 0.66)).astype(np.uint8)
+    meta = {"model_version": scores.model_version, "bands": list(BAND_NAMES), "drivers": list(scores.driver_names)}
+    meta_raw = _pad8(json.dumps(meta, separators=(",", ":")).encode("utf-8"), b" ")
+
+    parts = [
+        _RESPONSE_HEADER.pack(_RESPONSE_MAGIC, n_rows, len(meta_raw), FLAG_CONTRIBUTIONS if drivers else 0),
+        meta_raw,
+        np.round(risk, 6).astype("<f8").tobytes(),
+        _pad8(bands.tobytes(), b"\0"),
+    ]
+    if drivers:
+        contributions = np.where(scores.driver_mask, np.round(scores.contributions, 4), 0.0)
+        parts.append(np.ascontiguousarray(contributions.T, dtype="<f8").tobytes())
+    return b"".join(parts)
+
+
+def encode_features(x: np.ndarray, dates: list[str], user_ids: list[str | None] | None = None) -> bytes:
+    """Client-side helper (tests, benchmarks, Python callers) building a request body."""
+    x = np.asarray(x, dtype=float)
+    ids_raw = "\n".join(value or "" for value in user_ids).encode("utf-8") if user_ids is not None else b""
+    dates_raw = "\n".join(dates).encode("utf-8")
+    header = _REQUEST_HEADER.pack(_REQUEST_MAGIC, x.shape[0], len(ids_raw), len(dates_raw))
+    return header + np.ascontiguousarray(x.T, dtype="<f8").tobytes() + ids_raw + dates_raw
+
+
+def decode_scores(body: bytes) -> dict[str, Any]:
+    """Client-side helper: parse an application/x-risk-scores body into numpy columns."""
+    magic, n_rows, meta_bytes, flags = _RESPONSE_HEADER.unpack_from(body)
+    if magic != _RESPONSE_MAGIC:
+        raise ValueError("not an application/x-risk-scores body")
+    offset = _RESPONSE_HEADER.size
+    meta = json.loads(body[offset : offset + meta_bytes])
+    offset += meta_bytes
+    risk = np.frombuffer(body, dtype="<f8", count=n_rows, offset=offset)
+    offset += 8 * n_rows
+    bands = np.frombuffer(body, dtype=np.uint8, count=n_rows, offset=offset)
+    offset += n_rows + (-n_rows % 8)
+    out: dict[str, Any] = meta | {"risk": risk, "band": [meta["bands"][code] for code in bands.tolist()]}
+    if flags & FLAG_CONTRIBUTIONS:
+        width = len(meta["drivers"])
+        out["contributions"] = np.frombuffer(body, dtype="<f8", count=width * n_rows, offset=offset).reshape(width, n_rows).T
+    return out
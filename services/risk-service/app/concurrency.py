@@ -0,0 +1,97 @@
+"""Sized executor lanes for CPU work, with admission control and per-request deadlines.
+
+Each lane owns its threads, so a burst of batch scoring cannot starve interactive /score
+calls and training never takes a scoring thread. A lane admits at most workers + queue_size
+calls; beyond that callers get LaneOverloaded immediately (503) instead of waiting in an
+unbounded queue. A call that misses its deadline raises LaneTimeout (504); its slot stays
+taken until the work actually finishes, so the limit reflects real load.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.metrics import LANE_REJECTED, LANE_TIMEOUTS
+
+
+T = TypeVar("T")
+
+
+class LaneOverloaded(Exception):
+    def __init__(self, lane: str) -> None:
+        super().__init__(f"{lane} lane is at capacity, retry shortly")
+        self.lane = lane
+
+
+class LaneTimeout(Exception):
+    def __init__(self, lane: str, timeout_s: float) -> None:
+        super().__init__(f"{lane} request exceeded {timeout_s:g}s")
+        self.lane = lane
+
+
+class Lane:
+    def __init__(self, name: str, workers: int, queue_size: int, timeout_s: float | None) -> None:
+        self.name = name
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 0)
+        self.timeout_s = timeout_s if timeout_s and timeout_s > 0 else None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{name}-lane")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> Future[T]:
+        """Admit and queue `fn(*args)` (run in the caller's contextvars context) or raise LaneOverloaded."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                LANE_REJECTED.inc(1.0, self.name)
+                raise LaneOverloaded(self.name)
+            self._pending += 1
+        try:
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise LaneOverloaded(self.name) from None
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        future = asyncio.wrap_future(self.submit(fn, *args))
+        if self.timeout_s is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, self.timeout_s)
+        except asyncio.TimeoutError as exc:
+            self.timeouts += 1
+            LANE_TIMEOUTS.inc(1.0, self.name)
+            raise LaneTimeout(self.name, self.timeout_s) from exc
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": pending,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "timeout_s": self.timeout_s or 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
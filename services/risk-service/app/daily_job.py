@@ -0,0 +1,263 @@
+"""Daily population scoring straight from a feature export, with checkpoint and resume.
+
+    python -m app.daily_job 2026-02-28 --source 'exports/features-{date}.parquet' --out runs/ --workers 4
+
+The source is read in fixed-size chunks. Each chunk is scored vectorized (app.bulk_score) on a
+process pool with at most two chunks per worker in flight, and written as its own part file:
+
+    runs/2026-02-28/
+      part-00000.csv          one per chunk, renamed into place once complete
+      _checkpoint.json        model version, chunk size and completed chunks
+      _cohort.npz             population index of the run (app.cohort), for RISK_COHORT_SNAPSHOT
+      _SUCCESS                run summary, written last
+
+A rerun for the same date skips chunks that already have a part file and scores the rest with
+the model version recorded in the checkpoint, so a resumed run never mixes model versions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Protocol
+
+import numpy as np
+
+from app.artifacts import atomic_dump_json
+from app.bulk_score import Chunk, chunk_features, float_column, init_worker, iter_chunks, open_writer, score_chunk
+from app.cohort import CohortIndex
+from app.ml import ModelManager
+from app.utils import load_json
+from app.vitals import compute_features, load_readings
+
+
+logger = logging.getLogger("risk-service.daily_job")
+
+CHECKPOINT_FILE = "_checkpoint.json"
+SUCCESS_FILE = "_SUCCESS"
+COHORT_FILE = "_cohort.npz"
+
+
+class FeatureSource(Protocol):
+    """Anything that yields column chunks (see app.bulk_score.Chunk) for one date, in a stable order."""
+
+    def chunks(self, as_of_date: str, chunk_size: int) -> Iterable[Chunk]: ...
+
+
+@dataclass(frozen=True)
+class FileFeatureSource:
+    """A CSV/Parquet export per day; `{date}` in the template is replaced with the run date."""
+
+    path_template: str
+
+    def path(self, as_of_date: str) -> Path:
+        return Path(self.path_template.format(date=as_of_date))
+
+    def chunks(self, as_of_date: str, chunk_size: int) -> Iterable[Chunk]:
+        return iter_chunks(self.path(as_of_date), chunk_size)
+
+
+@dataclass(frozen=True)
+class VitalsFeatureSource:
+    """Raw vitals (user_id, ts, kind, value) per day, turned into features with app.vitals.
+
+    Each file needs the readings of the 181 days up to the run date (31 are enough without labs).
+    """
+
+    path_template: str
+
+    def chunks(self, as_of_date: str, chunk_size: int) -> Iterable[Chunk]:
+        readings = load_readings(Path(self.path_template.format(date=as_of_date)))
+        return compute_features(readings, as_of_date).chunks(chunk_size)
+
+
+def _part_name(idx: int, output_format: str) -> str:
+    return f"part-{idx:05d}.{output_format}"
+
+
+def _write_part(run_dir: Path, idx: int, output_format: str, rows: list[dict[str, Any]]) -> None:
+    final = run_dir / _part_name(idx, output_format)
+    tmp = run_dir / f".tmp-{final.name}"
+    writer = open_writer(tmp)
+    try:
+        writer.write(rows)
+    finally:
+        writer.close()
+    os.replace(tmp, final)
+
+
+def _start_checkpoint(
+    run_dir: Path, as_of_date: str, chunk_size: int, output_format: str, artifact_dir: Path | None
+) -> dict[str, Any]:
+    for stale in [*run_dir.glob("part-*"), *run_dir.glob(".tmp-*"), run_dir / SUCCESS_FILE]:
+        stale.unlink(missing_ok=True)
+    checkpoint = {
+        "as_of_date": as_of_date,
+        "model_version": ModelManager(artifact_dir=artifact_dir).model_version(),
+        "chunk_size": chunk_size,
+        "format": output_format,
+        "completed": {},
+    }
+    atomic_dump_json(run_dir / CHECKPOINT_FILE, checkpoint)
+    return checkpoint
+
+
+def _record_cohort(cohort: CohortIndex, version: str, chunk: Chunk, rows: list[dict[str, Any]]) -> None:
+    ok = [idx for idx, row in enumerate(rows) if not row["error"]]
+    if not ok:
+        return
+    x, _ = chunk_features(chunk, len(rows))
+    risk, _ = float_column([rows[idx]["risk"] for idx in ok], len(ok), np.nan)
+    cohort.add(version, [rows[idx]["user_id"] for idx in ok], x[ok], risk, [rows[idx]["band"] for idx in ok])
+
+
+def _read_part(path: Path) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for part in iter_chunks(path, 100_000):
+        rows.extend(dict(zip(part, values)) for values in zip(*part.values()))
+    return rows
+
+
+def _pending(
+    source: FeatureSource, as_of_date: str, chunk_size: int, done: set[int], on_done: Callable[[int, Chunk], None]
+) -> Iterator[tuple[int, Chunk]]:
+    for idx, chunk in enumerate(source.chunks(as_of_date, chunk_size)):
+        if "as_of_date" not in chunk:
+            n = len(next(iter(chunk.values()), []))
+            chunk = chunk | {"as_of_date": [as_of_date] * n}
+        if idx in done:
+            on_done(idx, chunk)
+            continue
+        yield idx, chunk
+
+
+def _score_chunks(
+    chunks: Iterator[tuple[int, Chunk]], workers: int, init_args: tuple[Any, ...]
+) -> Iterator[tuple[int, Chunk, list[dict[str, Any]]]]:
+    if workers <= 1:
+        init_worker(*init_args)
+        for idx, chunk in chunks:
+            yield idx, chunk, score_chunk(chunk)
+        return
+    # Bounded window: the source is never read more than 2 x workers chunks ahead of the writer.
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=init_args) as pool:
+        in_flight: deque[tuple[int, Chunk, Future[list[dict[str, Any]]]]] = deque()
+        for idx, chunk in chunks:
+            in_flight.append((idx, chunk, pool.submit(score_chunk, chunk)))
+            if len(in_flight) >= 2 * workers:
+                done_idx, done_chunk, future = in_flight.popleft()
+                yield done_idx, done_chunk, future.result()
+        while in_flight:
+            done_idx, done_chunk, future = in_flight.popleft()
+            yield done_idx, done_chunk, future.result()
+
+
+def run(
+    as_of_date: str,
+    source: FeatureSource,
+    out_dir: Path,
+    *,
+    chunk_size: int = 50_000,
+    workers: int = 1,
+    artifact_dir: Path | None = None,
+    output_format: str = "csv",
+    restart: bool = False,
+) -> dict[str, Any]:
+    datetime.strptime(as_of_date, "%Y-%m-%d")
+    run_dir = out_dir / as_of_date
+    run_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = run_dir / CHECKPOINT_FILE
+    if restart or not checkpoint_path.exists():
+        checkpoint = _start_checkpoint(run_dir, as_of_date, chunk_size, output_format, artifact_dir)
+    else:
+        checkpoint = load_json(checkpoint_path)
+        # Chunk indices only line up with the original chunk size and format.
+        chunk_size, output_format = checkpoint["chunk_size"], checkpoint["format"]
+    completed: dict[str, int] = checkpoint["completed"]
+    done = {int(idx) for idx in completed if (run_dir / _part_name(int(idx), output_format)).exists()}
+    resumed = len(done)
+    model_version = checkpoint["model_version"]
+    init_args = (str(artifact_dir) if artifact_dir else None, False, model_version)
+
+    # Chunks finished by an earlier attempt are re-read from their part files, so the index covers the whole run.
+    cohort = CohortIndex()
+
+    def resumed_chunk(idx: int, chunk: Chunk) -> None:
+        _record_cohort(cohort, model_version, chunk, _read_part(run_dir / _part_name(idx, output_format)))
+
+    started = time.perf_counter()
+    n_rows = n_errors = 0
+    pending = _pending(source, as_of_date, chunk_size, done, resumed_chunk)
+    for idx, chunk, rows in _score_chunks(pending, workers, init_args):
+        _write_part(run_dir, idx, output_format, rows)
+        _record_cohort(cohort, model_version, chunk, rows)
+        completed[str(idx)] = len(rows)
+        atomic_dump_json(checkpoint_path, checkpoint)
+        n_rows += len(rows)
+        n_errors += sum(1 for row in rows if row["error"])
+
+    cohort.save(run_dir / COHORT_FILE)
+    elapsed = time.perf_counter() - started
+    stats = {
+        "as_of_date": as_of_date,
+        "model_version": model_version,
+        "chunks": len(completed),
+        "resumed_chunks": resumed,
+        "rows": sum(completed.values()),
+        "scored_rows": n_rows,
+        "error_rows": n_errors,
+        "cohort_users": int(cohort.snapshot()["users"]),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(n_rows / elapsed, 1) if elapsed else 0.0,
+    }
+    atomic_dump_json(run_dir / SUCCESS_FILE, stats)
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.daily_job", description="Score every user's features for one day.")
+    parser.add_argument("date", help="as_of_date, YYYY-MM-DD")
+    parser.add_argument("--source", required=True, help="CSV/Parquet export path; {date} is replaced with the run date")
+    parser.add_argument("--vitals", action="store_true", help="--source holds raw vitals (user_id, ts, kind, value)")
+    parser.add_argument("--out", type=Path, required=True, help="run outputs go to <out>/<date>/")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1, help="process pool size; 1 scores in-process")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--artifact-dir", type=Path, default=None, help="defaults to RISK_ARTIFACT_DIR")
+    parser.add_argument("--restart", action="store_true", help="discard any checkpoint for this date and start over")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    stats = run(
+        args.date,
+        VitalsFeatureSource(args.source) if args.vitals else FileFeatureSource(args.source),
+        args.out,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        artifact_dir=args.artifact_dir,
+        output_format=args.format,
+        restart=args.restart,
+    )
+    logger.info(
+        "daily_job date=%s version=%s rows=%d scored=%d resumed_chunks=%d seconds=%.3f rows_per_second=%.1f",
+        stats["as_of_date"],
+        stats["model_version"],
+        stats["rows"],
+        stats["scored_rows"],
+        stats["resumed_chunks"],
+        stats["seconds"],
+        stats["rows_per_second"],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
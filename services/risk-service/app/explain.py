@@ -0,0 +1,220 @@
+"""Per-patient driver attributions, in log-odds units, computed for whole batches.
+
+Linear models use coef * (x - feature_means), the exact Shapley value of a linear margin.
+Tree ensembles use exact path-dependent TreeSHAP. For one leaf with unique path features U,
+E[leaf | x_S] = v * prod_{j in S} z_j * prod_{j in U \\ S} r_j, where z_j says whether x
+satisfies every split on j along the path and r_j is the cover fraction of those splits. The
+Shapley value of j therefore only depends on the bit pattern z over U, so each leaf gets a
+small (slots x 2^slots) table at load time and scoring is a gather plus a sum.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.inference import LinearPredictor, Predictor, TreeEnsemblePredictor
+from app.models import FEATURE_NAMES_V1
+
+
+MAX_PATH_FEATURES = 10
+ROW_CHUNK = 1024
+
+
+@dataclass(frozen=True)
+class LinearExplainer:
+    coef: np.ndarray
+    feature_means: np.ndarray
+
+    def contributions(self, x: np.ndarray) -> np.ndarray:
+        return (x - self.feature_means) * self.coef
+
+
+@dataclass(frozen=True)
+class TreeExplainer:
+    """Leaves as rows; each slot is one unique feature on the leaf's path (feature -1 pads)."""
+
+    slot_feature: np.ndarray
+    lo: np.ndarray
+    hi: np.ndarray
+    missing_ok: np.ndarray
+    table: np.ndarray
+    expected_margin: float
+
+    def contributions(self, x: np.ndarray) -> np.ndarray:
+        n_leaves, n_slots = self.slot_feature.shape
+        real = self.slot_feature >= 0
+        feat = np.where(real, self.slot_feature, 0)
+        onehot = np.zeros((n_leaves * n_slots, len(FEATURE_NAMES_V1)))
+        onehot[np.flatnonzero(real.ravel()), feat.ravel()[real.ravel()]] = 1.0
+        shifts = np.arange(n_slots)
+        leaf_idx = np.arange(n_leaves)[:, None]
+
+        out = np.empty((x.shape[0], len(FEATURE_NAMES_V1)))
+        for start in range(0, x.shape[0], ROW_CHUNK):
+            xv = np.asarray(x[start : start + ROW_CHUNK], dtype=np.float32)[:, feat]
+            z = ((xv >= self.lo) & (xv < self.hi)) | (np.isnan(xv) & self.missing_ok)
+            pattern = ((z & real).astype(np.int64) << shifts).sum(axis=2)
+            phi = self.table[leaf_idx, shifts, pattern[:, :, None]]
+            out[start : start + ROW_CHUNK] = phi.reshape(phi.shape[0], -1) @ onehot
+        return out
+
+
+def _leaf_table(value: float, ratios: list[float]) -> np.ndarray:
+    """phi[k, pattern] for one leaf whose path features have the given cover ratios."""
+    m = len(ratios)
+    bits = (np.arange(1 << m)[:, None] >> np.arange(m)) & 1
+    weights = np.array([math.factorial(s) * math.factorial(m - s - 1) / math.factorial(m) for s in range(m)])
+    table = np.zeros((m, 1 << m))
+    for k in range(m):
+        # poly[s] = sum over subsets S of the other features with |S| = s of prod_S z * prod_rest r.
+        poly = np.zeros((1 << m, m))
+        poly[:, 0] = 1.0
+        for j in range(m):
+            if j == k:
+                continue
+            shifted = np.zeros_like(poly)
+            shifted[:, 1:] = poly[:, :-1] * bits[:, j : j + 1]
+            poly = poly * ratios[j] + shifted
+        table[k] = value * (bits[:, k] - ratios[k]) * (poly @ weights)
+    return table
+
+
+def compile_tree_explainer(predictor: TreeEnsemblePredictor) -> TreeExplainer | None:
+    leaves: list[tuple[float, dict[int, list]]] = []
+    expected = predictor.base_margin
+    for root in predictor.roots.tolist():
+        stack: list[tuple[int, dict[int, list]]] = [(root, {})]
+        while stack:
+            node, conds = stack.pop()
+            feat = int(predictor.feature[node])
+            if feat < 0:
+                value = float(predictor.value[node])
+                leaves.append((value, conds))
+                expected += value * math.prod(c[3] for c in conds.values())
+                continue
+            parent_cover = float(predictor.cover[node])
+            if parent_cover <= 0:
+                return None
+            thr = float(predictor.threshold[node])
+            missing = int(predictor.missing[node])
+            for child, is_left in ((int(predictor.left[node]), True), (int(predictor.right[node]), False)):
+                lo, hi, miss_ok, ratio = conds.get(feat, [-np.inf, np.inf, True, 1.0])
+                if is_left:
+                    hi = min(hi, thr)
+                else:
+                    lo = max(lo, thr)
+                child_conds = dict(conds)
+                child_conds[feat] = [lo, hi, miss_ok and missing == child, ratio * float(predictor.cover[child]) / parent_cover]
+                stack.append((child, child_conds))
+
+    n_slots = max((len(conds) for _, conds in leaves), default=0)
+    if n_slots == 0 or n_slots > MAX_PATH_FEATURES:
+        return None
+
+    n_leaves = len(leaves)
+    slot_feature = np.full((n_leaves, n_slots), -1, dtype=np.int64)
+    lo = np.full((n_leaves, n_slots), -np.inf, dtype=np.float32)
+    hi = np.full((n_leaves, n_slots), np.inf, dtype=np.float32)
+    missing_ok = np.zeros((n_leaves, n_slots), dtype=bool)
+    table = np.zeros((n_leaves, n_slots, 1 << n_slots))
+    for idx, (value, conds) in enumerate(leaves):
+        items = sorted(conds.items())
+        for slot, (feat, (c_lo, c_hi, c_miss, _)) in enumerate(items):
+            slot_feature[idx, slot] = feat
+            lo[idx, slot], hi[idx, slot], missing_ok[idx, slot] = c_lo, c_hi, c_miss
+        m = len(items)
+        # Padding bits are always 0, so only the first 2^m patterns are ever read.
+        table[idx, :m, : 1 << m] = _leaf_table(value, [c[3] for _, c in items])
+
+    return TreeExplainer(
+        slot_feature=slot_feature,
+        lo=lo,
+        hi=hi,
+        missing_ok=missing_ok,
+        table=table,
+        expected_margin=expected,
+    )
+
+
+Explainer = LinearExplainer | TreeExplainer
+
+
+def compile_explainer(predictor: Predictor | None, feature_means: np.ndarray) -> Explainer | None:
+    if isinstance(predictor, LinearPredictor):
+        return LinearExplainer(coef=predictor.coef, feature_means=feature_means)
+    if isinstance(predictor, TreeEnsemblePredictor):
+        return compile_tree_explainer(predictor)
+    return None
+
+
+@dataclass
+class ExplainStats:
+    calls: int = 0
+    rows: int = 0
+    computed_rows: int = 0
+    cache_hits: int = 0
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, rows: int, computed: int, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.rows += rows
+            self.computed_rows += computed
+            self.cache_hits += rows - computed
+            self.seconds += seconds
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "rows": self.rows,
+                "computed_rows": self.computed_rows,
+                "cache_hits": self.cache_hits,
+                "total_ms": round(self.seconds * 1000.0, 3),
+                "mean_us_per_row": round(self.seconds * 1e6 / self.rows, 3) if self.rows else 0.0,
+            }
+
+
+class ContributionCache:
+    """LRU of contribution rows keyed by (model_version, raw feature-vector bytes)."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._rows: OrderedDict[tuple[str, bytes], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = ExplainStats()
+
+    def contributions(self, version: str, explainer: Explainer, x: np.ndarray) -> np.ndarray:
+        started = time.perf_counter()
+        x = np.ascontiguousarray(x, dtype=float)
+        out = np.empty_like(x)
+        keys = [(version, row.tobytes()) for row in x]
+        missing: list[int] = []
+        with self._lock:
+            for idx, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is None:
+                    missing.append(idx)
+                else:
+                    self._rows.move_to_end(key)
+                    out[idx] = row
+
+        if missing:
+            computed = explainer.contributions(x[missing])
+            out[missing] = computed
+            if self.max_size > 0:
+                with self._lock:
+                    for idx, row in zip(missing, computed):
+                        self._rows[keys[idx]] = row
+                    while len(self._rows) > self.max_size:
+                        self._rows.popitem(last=False)
+
+        self.stats.record(x.shape[0], len(missing), time.perf_counter() - started)
+        return out
@@ -0,0 +1,186 @@
+"""Decode /score/batch bodies straight into a feature matrix and encode responses from arrays.
+
+Items made only of JSON numbers, strings and nulls are checked inline with the FeaturesV1
+rules (no extra keys, %Y-%m-%d dates, adherence in [0, 1], None -> FEATURE_FILL_V1). Anything
+else goes through FeaturesV1 itself, so unusual inputs get pydantic's exact coercions and
+error messages. orjson is used when installed.
+"""
+
+from __future__ import annotations
+
+import email.message
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Sequence
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from app.batch import ScoreRow
+from app.models import FEATURE_FILL_V1, FEATURE_NAMES_V1, BatchScoreRequest, FeaturesV1
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+MAX_BATCH_ITEMS = 500
+FEATURE_INDEX = {name: idx for idx, name in enumerate(FEATURE_NAMES_V1)}
+FILL_VECTOR = np.array([FEATURE_FILL_V1[name] for name in FEATURE_NAMES_V1], dtype=float)
+ADHERENCE = "adherence_nudge_7d"
+
+
+def loads(body: bytes) -> Any:
+    """Raises json.JSONDecodeError for malformed JSON, other ValueErrors (e.g. invalid UTF-8) like json.loads."""
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass  # NaN literals, huge ints, bad encodings, ...: let json decide (and word the error)
+    return json.loads(body)
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def is_json_content_type(content_type: str | None) -> bool:
+    """Same check FastAPI applies before JSON-decoding a body."""
+    if not content_type:
+        return False
+    message = email.message.Message()
+    message["content-type"] = content_type
+    if message.get_content_maintype() != "application":
+        return False
+    subtype = message.get_content_subtype()
+    return subtype == "json" or subtype.endswith("+json")
+
+
+@lru_cache(maxsize=4096)
+def date_error(value: str) -> str | None:
+    """The FeaturesV1.validate_date failure message for `value`, or None if it is valid."""
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError as exc:
+        return str(exc)
+    return None
+
+
+def _decode_inline(item: Any, out: np.ndarray) -> bool:
+    """Fill `out` from a plain item; False means "not plainly valid, ask FeaturesV1"."""
+    if type(item) is not dict or type(item.get("as_of_date")) is not str:
+        return False
+    for key, value in item.items():
+        idx = FEATURE_INDEX.get(key)
+        if idx is not None:
+            if value is None:
+                continue
+            if type(value) is not float and type(value) is not int:
+                return False
+            try:
+                out[idx] = value
+            except OverflowError:
+                return False
+        elif key == "as_of_date":
+            if date_error(value) is not None:
+                return False
+        elif key != "user_id" or (value is not None and type(value) is not str):
+            return False
+    adherence = item.get(ADHERENCE)
+    return adherence is None or not (adherence < 0 or adherence > 1)
+
+
+@dataclass
+class DecodedBatch:
+    user_ids: list[str | None]
+    dates: list[str]
+    x: np.ndarray
+    errors: dict[int, list[dict[str, Any]]]
+
+    def request_errors(self) -> list[dict[str, Any]]:
+        """Errors in the shape FastAPI reports for a BatchScoreRequest body."""
+        return [
+            {**err, "loc": ("body", "items", idx) + tuple(err["loc"])}
+            for idx in sorted(self.errors)
+            for err in self.errors[idx]
+        ]
+
+
+def decode_items(items: Sequence[Any]) -> DecodedBatch:
+    n = len(items)
+    x = np.tile(FILL_VECTOR, (n, 1))
+    user_ids: list[str | None] = [None] * n
+    dates = [""] * n
+    errors: dict[int, list[dict[str, Any]]] = {}
+    for idx, item in enumerate(items):
+        if _decode_inline(item, x[idx]):
+            user_ids[idx] = item.get("user_id")
+            dates[idx] = item["as_of_date"]
+            continue
+        try:
+            features = FeaturesV1.model_validate(item, from_attributes=True)
+        except ValidationError as exc:
+            errors[idx] = exc.errors(include_url=False)
+            continue
+        x[idx] = features.as_feature_vector()
+        user_ids[idx] = features.user_id
+        dates[idx] = features.as_of_date
+    return DecodedBatch(user_ids=user_ids, dates=dates, x=x, errors=errors)
+
+
+def decode_batch_request(body: bytes, content_type: str | None) -> DecodedBatch:
+    """Parse a /score/batch body; raises RequestValidationError exactly where FastAPI would."""
+    if not body:
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    payload: Any = body
+    if is_json_content_type(content_type):
+        try:
+            payload = loads(body)
+        except json.JSONDecodeError as exc:
+            raise RequestValidationError(
+                [{"type": "json_invalid", "loc": ("body", exc.pos), "msg": "JSON decode error", "input": {}, "ctx": {"error": exc.msg}}],
+                body=exc.doc,
+            ) from exc
+        except ValueError as exc:
+            # Undecodable bytes: FastAPI answers anything but a JSONDecodeError this way.
+            raise HTTPException(status_code=400, detail="There was an error parsing the body") from exc
+
+    items = payload.get("items") if type(payload) is dict and len(payload) == 1 else None
+    if type(items) is not list or not 1 <= len(items) <= MAX_BATCH_ITEMS:
+        # Malformed envelope: let pydantic produce the errors (or the items, if it somehow passes).
+        try:
+            items = BatchScoreRequest.model_validate(payload, from_attributes=True).items
+        except ValidationError as exc:
+            raise RequestValidationError(
+                [{**err, "loc": ("body",) + tuple(err["loc"])} for err in exc.errors(include_url=False)], body=payload
+            ) from exc
+
+    decoded = decode_items(items)
+    if decoded.errors:
+        raise RequestValidationError(decoded.request_errors(), body=payload)
+    return decoded
+
+
+def encode_batch_output(rows: Sequence[ScoreRow], dates: Sequence[str]) -> bytes:
+    """BatchScoreOutput JSON built from score rows, without ScoreOutput/Driver objects."""
+    items = [
+        {
+            "risk": risk,
+            "band": band,
+            "drivers": [
+                {"name": name, "value": value, "direction": direction, "contribution": contrib}
+                for name, value, direction, contrib in drivers
+            ],
+            "model_version": version,
+            "as_of_date": as_of_date,
+        }
+        for (risk, band, drivers, version), as_of_date in zip(rows, dates)
+    ]
+    return dumps({"items": items})
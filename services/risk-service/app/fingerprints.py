@@ -0,0 +1,126 @@
+"""Persistent per-user fingerprints, so unchanged users are not re-scored.
+
+One SQLite row per (user_id, model_version) holds a hash of the last feature vector scored
+for that user and the result. A request row whose user_id, vector hash and model version all
+match is answered from the index. Unlike the in-memory score cache, the index survives
+restarts, is shared by every worker on the host (WAL mode) and holds one entry per user,
+however many distinct vectors that user has had.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from app.batch import ScoreRow
+from app.cache import vector_key
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    user_id TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (user_id, model_version)
+) WITHOUT ROWID
+"""
+_LOOKUP_BATCH = 500
+
+
+def _encode(row: ScoreRow) -> str:
+    return json.dumps(row, separators=(",", ":"))
+
+
+def _decode(raw: str) -> ScoreRow:
+    risk, band, drivers, version = json.loads(raw)
+    return risk, band, tuple(tuple(driver) for driver in drivers), version  # type: ignore[return-value]
+
+
+class FingerprintIndex:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.known = 0
+        self.hits = 0
+        self.forced = 0
+        self._conn().execute(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, user_ids: Sequence[str | None], x: np.ndarray, version: str) -> list[ScoreRow | None]:
+        """Stored results for rows whose user's last vector under `version` is identical, else None."""
+        results: list[ScoreRow | None] = [None] * len(user_ids)
+        found: dict[str, tuple[bytes, str]] = {}
+        keys = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+        for start in range(0, len(keys), _LOOKUP_BATCH):
+            batch = keys[start : start + _LOOKUP_BATCH]
+            rows = self._conn().execute(
+                "SELECT user_id, fingerprint, result FROM fingerprints "
+                f"WHERE model_version = ? AND user_id IN ({','.join('?' * len(batch))})",
+                (version, *batch),
+            )
+            found.update((user_id, (digest, result)) for user_id, digest, result in rows)
+        known = hits = 0
+        for idx, user_id in enumerate(user_ids):
+            entry = found.get(user_id) if user_id else None
+            if entry is None:
+                continue
+            known += 1
+            # A user listed twice with different vectors only matches the one that was stored.
+            if entry[0] == vector_key(version, x[idx])[1]:
+                results[idx] = _decode(entry[1])
+                hits += 1
+        with self._lock:
+            self.lookups += len(user_ids)
+            self.known += known
+            self.hits += hits
+        return results
+
+    def store(self, user_ids: Sequence[str | None], x: np.ndarray, rows: Sequence[ScoreRow]) -> None:
+        entries = [
+            (user_id, row[3], vector_key(row[3], x[idx])[1], _encode(row))
+            for idx, (user_id, row) in enumerate(zip(user_ids, rows))
+            if user_id
+        ]
+        if not entries:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)", entries)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def count_forced(self, n: int) -> None:
+        with self._lock:
+            self.forced += n
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            # skip_rate: share of all rows not re-scored; hit_rate: share of previously seen users unchanged.
+            return {
+                "lookups": self.lookups,
+                "known": self.known,
+                "skipped": self.hits,
+                "skip_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "hit_rate": round(self.hits / self.known, 4) if self.known else 0.0,
+                "forced": self.forced,
+            }
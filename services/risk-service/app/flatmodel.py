@@ -0,0 +1,74 @@
+"""Compiled predictors and explainers stored as flat arrays, memory-mapped at load.
+
+    versions/ml-3/compiled/
+      manifest.json           {"predictor": {"kind", "scalars", "arrays"}, "explainer": ...}
+      predictor.coef.npy      one uncompressed .npy per array field
+      explainer.table.npy
+
+Loading never unpickles anything, so a pod without sklearn/xgboost can serve the model,
+and every worker maps the same page-cache pages instead of holding its own copy.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.explain import Explainer, LinearExplainer, TreeExplainer
+from app.inference import LinearPredictor, Predictor, TreeEnsemblePredictor
+
+
+FLAT_DIR = "compiled"
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+_KINDS: dict[str, type] = {
+    cls.__name__: cls for cls in (LinearPredictor, TreeEnsemblePredictor, LinearExplainer, TreeExplainer)
+}
+
+
+def _dump_part(path: Path, role: str, obj: Any) -> dict[str, Any]:
+    scalars: dict[str, Any] = {}
+    arrays: list[str] = []
+    for field in dataclasses.fields(obj):
+        value = getattr(obj, field.name)
+        if isinstance(value, np.ndarray):
+            np.save(path / f"{role}.{field.name}.npy", np.ascontiguousarray(value), allow_pickle=False)
+            arrays.append(field.name)
+        else:
+            scalars[field.name] = value
+    return {"kind": type(obj).__name__, "scalars": scalars, "arrays": arrays}
+
+
+def dump_flat(path: Path, predictor: Predictor, explainer: Explainer | None) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    manifest: dict[str, Any] = {"format": FORMAT_VERSION, "predictor": _dump_part(path, "predictor", predictor)}
+    if explainer is not None:
+        manifest["explainer"] = _dump_part(path, "explainer", explainer)
+    # The manifest goes last: a directory without one is never loaded.
+    with (path / MANIFEST_FILE).open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _load_part(path: Path, role: str, spec: dict[str, Any]) -> Any:
+    cls = _KINDS[spec["kind"]]
+    arrays = {name: np.load(path / f"{role}.{name}.npy", mmap_mode="r", allow_pickle=False) for name in spec["arrays"]}
+    return cls(**spec["scalars"], **arrays)
+
+
+def load_flat(path: Path) -> tuple[Predictor, Explainer | None] | None:
+    """(predictor, explainer) backed by read-only memory maps, or None if `path` has no compiled model."""
+    try:
+        with (path / MANIFEST_FILE).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get("format") != FORMAT_VERSION:
+        return None
+    predictor = _load_part(path, "predictor", manifest["predictor"])
+    explainer = _load_part(path, "explainer", manifest["explainer"]) if "explainer" in manifest else None
+    return predictor, explainer
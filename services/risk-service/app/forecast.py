@@ -0,0 +1,143 @@
+"""Risk trajectories projected from a user's daily feature history.
+
+Per-feature statistics are fitted once per distinct history and cached. Trend features
+(*_trend_14d) follow their least-squares line over the history, clamped to the observed range
+widened by its span. Labs keep their latest observed value, and every other feature is held at
+its mean over the last RECENT_DAYS days. Values missing on the latest observed day take the
+same fitted level, so a lab seen earlier does not make day 1 jump. The latest observed day and
+all projected days are scored together in a single score_matrix call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.ml import ModelManager
+from app.models import FEATURE_FILL_V1, FEATURE_NAMES_V1, ForecastOutput, ForecastPoint, ForecastRequest
+
+
+TREND_COLUMNS = np.array([name.endswith("_trend_14d") for name in FEATURE_NAMES_V1])
+LATEST_COLUMNS = np.array([name.endswith("_latest") for name in FEATURE_NAMES_V1])
+ADHERENCE_COL = FEATURE_NAMES_V1.index("adherence_nudge_7d")
+FILL_VECTOR = np.array([FEATURE_FILL_V1[name] for name in FEATURE_NAMES_V1], dtype=float)
+RECENT_DAYS = 7
+
+
+@dataclass(frozen=True)
+class HistoryStats:
+    level: np.ndarray  # projected value at day 0 (the last observed day), per feature
+    slope: np.ndarray  # per-day change; zero for held features
+    low: np.ndarray
+    high: np.ndarray
+
+
+def history_stats(x: np.ndarray, days: np.ndarray) -> HistoryStats:
+    """Fit every column of an (n_days, 13) history at once; NaN marks a missing value.
+
+    `days` are day offsets relative to the last observed day (so the last entry is 0).
+    """
+    observed = ~np.isnan(x)
+    values = np.where(observed, x, 0.0)
+    t = np.where(observed, days[:, None].astype(float), 0.0)
+    count = observed.sum(axis=0)
+    seen = count > 0
+    safe_count = np.maximum(count, 1)
+    mean_x = values.sum(axis=0) / safe_count
+    mean_t = t.sum(axis=0) / safe_count
+    dt = np.where(observed, days[:, None] - mean_t, 0.0)
+    var_t = (dt * dt).sum(axis=0)
+    fitted = TREND_COLUMNS & (var_t > 0)
+    slope = np.where(fitted, (dt * (values - mean_x)).sum(axis=0) / np.where(fitted, var_t, 1.0), 0.0)
+    trend_level = mean_x - slope * mean_t
+
+    recent = observed & (days[:, None] > -RECENT_DAYS)
+    recent_count = recent.sum(axis=0)
+    recent_sum = np.where(recent, x, 0.0).sum(axis=0)
+    recent_mean = np.where(recent_count > 0, recent_sum / np.maximum(recent_count, 1), mean_x)
+    # Row index of the last observed value per column (0 for never observed; masked by `seen`).
+    last_idx = np.where(seen, x.shape[0] - 1 - np.argmax(observed[::-1], axis=0), 0)
+    latest = x[last_idx, np.arange(x.shape[1])]
+
+    level = np.where(TREND_COLUMNS, trend_level, np.where(LATEST_COLUMNS, latest, recent_mean))
+    level = np.where(seen, level, FILL_VECTOR)
+    low = np.where(seen, np.where(observed, x, np.inf).min(axis=0), FILL_VECTOR)
+    high = np.where(seen, np.where(observed, x, -np.inf).max(axis=0), FILL_VECTOR)
+    span = high - low
+    return HistoryStats(level=level, slope=slope, low=low - span, high=high + span)
+
+
+def project(stats: HistoryStats, horizon_days: int) -> np.ndarray:
+    """(horizon_days, 13) feature rows for days 1..horizon_days after the last observed day."""
+    steps = np.arange(1, horizon_days + 1, dtype=float)[:, None]
+    rows = np.clip(stats.level + stats.slope * steps, stats.low, stats.high)
+    rows[:, ADHERENCE_COL] = np.clip(rows[:, ADHERENCE_COL], 0.0, 1.0)
+    return rows
+
+
+class HistoryStatsCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, HistoryStats] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fit(self, x: np.ndarray, days: np.ndarray) -> HistoryStats:
+        digest = hashlib.blake2b(x.tobytes() + days.tobytes(), digest_size=16).digest()
+        with self._lock:
+            stats = self._entries.get(digest)
+            if stats is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return stats
+            self.misses += 1
+        stats = history_stats(x, days)
+        if self.max_size > 0:
+            with self._lock:
+                self._entries[digest] = stats
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return stats
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+class Forecaster:
+    def __init__(self, cache_size: int) -> None:
+        self.cache = HistoryStatsCache(cache_size)
+
+    def forecast(self, manager: ModelManager, req: ForecastRequest, version: str | None = None) -> ForecastOutput:
+        history = sorted(req.history, key=lambda item: item.as_of_date)
+        # Unlike feature_matrix, missing values stay NaN so they do not drag the fitted trends.
+        x = np.array([[getattr(item, name) for name in FEATURE_NAMES_V1] for item in history], dtype=float)
+        last_day = date.fromisoformat(history[-1].as_of_date)
+        days = np.array([(date.fromisoformat(item.as_of_date) - last_day).days for item in history], dtype=np.int64)
+        stats = self.cache.get_or_fit(x, days)
+
+        current = np.where(np.isnan(x[-1]), stats.level, x[-1])
+        scores = manager.score_matrix(np.vstack([current, project(stats, req.horizon_days)]), version)
+        risk = np.round(scores.risk, 6)
+        bands = scores.bands()
+        points = [
+            ForecastPoint(as_of_date=(last_day + timedelta(days=step)).isoformat(), day=step, risk=value, band=band)
+            for step, (value, band) in enumerate(zip(risk.tolist(), bands))
+        ]
+        steps = np.arange(len(risk), dtype=float)
+        slope = float(np.polyfit(steps, risk, 1)[0])
+        n_days = len(history)
+        return ForecastOutput(
+            user_id=next((item.user_id for item in reversed(history) if item.user_id), None),
+            model_version=scores.model_version,
+            current=points[0],
+            trajectory=points[1:],
+            slope_per_day=round(slope, 6),
+            confidence="high" if n_days >= 10 else "medium" if n_days >= 5 else "low",
+        )
@@ -0,0 +1,160 @@
+"""Closed-form predictors compiled from trained estimators at load time.
+
+Scoring through these skips sklearn/xgboost input validation and dispatch; the math is the
+same, so results match the estimator's predict_proba to floating-point precision.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from app.models import FEATURE_NAMES_V1
+
+
+def _sigmoid(margin: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-margin))
+
+
+@dataclass(frozen=True)
+class LinearPredictor:
+    coef: np.ndarray
+    intercept: float
+
+    @property
+    def driver_weights(self) -> np.ndarray:
+        return self.coef
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        return _sigmoid(x @ self.coef + self.intercept)
+
+
+@dataclass(frozen=True)
+class TreeEnsemblePredictor:
+    """Every tree's nodes flattened into shared arrays; leaves have feature == -1."""
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    missing: np.ndarray
+    value: np.ndarray
+    cover: np.ndarray
+    roots: np.ndarray
+    max_depth: int
+    base_margin: float
+    importances: np.ndarray
+
+    @property
+    def driver_weights(self) -> np.ndarray:
+        return self.importances
+
+    def predict_margin(self, x: np.ndarray) -> np.ndarray:
+        # xgboost compares in float32, so do the same to land on identical leaves.
+        x32 = np.asarray(x, dtype=np.float32)
+        rows = np.arange(x32.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (x32.shape[0], self.roots.shape[0])).copy()
+        for _ in range(self.max_depth):
+            feat = self.feature[node]
+            leaf = feat < 0
+            if leaf.all():
+                break
+            xv = x32[rows, np.where(leaf, 0, feat)]
+            nxt = np.where(xv < self.threshold[node], self.left[node], self.right[node])
+            nxt = np.where(np.isnan(xv), self.missing[node], nxt)
+            node = np.where(leaf, node, nxt)
+        return self.value[node].sum(axis=1, dtype=np.float32).astype(float) + self.base_margin
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        return _sigmoid(self.predict_margin(x))
+
+
+Predictor = LinearPredictor | TreeEnsemblePredictor
+
+
+def _feature_index(name: str) -> int:
+    match = re.fullmatch(r"f(\d+)", name)
+    if match:
+        return int(match.group(1))
+    return FEATURE_NAMES_V1.index(name)
+
+
+def _base_margin(booster: Any) -> float:
+    raw = json.loads(booster.save_config())["learner"]["learner_model_param"]["base_score"]
+    base_score = float(str(raw).strip("[]"))
+    return float(np.log(base_score / (1.0 - base_score)))
+
+
+def compile_tree_dump(trees: list[dict[str, Any]], base_margin: float, importances: np.ndarray) -> TreeEnsemblePredictor:
+    """Flatten xgboost JSON tree dumps (get_dump(with_stats=True, dump_format="json")) into node arrays."""
+    feature: list[int] = []
+    threshold: list[float] = []
+    left: list[int] = []
+    right: list[int] = []
+    missing: list[int] = []
+    value: list[float] = []
+    cover: list[float] = []
+    roots: list[int] = []
+    max_depth = 0
+
+    for tree in trees:
+        offset = len(feature)
+        nodes: dict[int, tuple[dict[str, Any], int]] = {}
+        stack = [(tree, 0)]
+        while stack:
+            node, depth = stack.pop()
+            nodes[int(node["nodeid"])] = (node, depth)
+            max_depth = max(max_depth, depth)
+            stack.extend((child, depth + 1) for child in node.get("children", []))
+
+        # Node ids are dense per tree, so position = offset + nodeid.
+        for node_id in range(len(nodes)):
+            node, _ = nodes[node_id]
+            cover.append(float(node.get("cover", 0.0)))
+            if "leaf" in node:
+                feature.append(-1)
+                threshold.append(0.0)
+                left.append(offset + node_id)
+                right.append(offset + node_id)
+                missing.append(offset + node_id)
+                value.append(float(node["leaf"]))
+            else:
+                feature.append(_feature_index(str(node["split"])))
+                threshold.append(float(node["split_condition"]))
+                left.append(offset + int(node["yes"]))
+                right.append(offset + int(node["no"]))
+                missing.append(offset + int(node.get("missing", node["yes"])))
+                value.append(0.0)
+        roots.append(offset)
+
+    return TreeEnsemblePredictor(
+        feature=np.asarray(feature, dtype=np.int64),
+        threshold=np.asarray(threshold, dtype=np.float32),
+        left=np.asarray(left, dtype=np.int64),
+        right=np.asarray(right, dtype=np.int64),
+        missing=np.asarray(missing, dtype=np.int64),
+        value=np.asarray(value, dtype=np.float32),
+        cover=np.asarray(cover, dtype=float),
+        roots=np.asarray(roots, dtype=np.int64),
+        max_depth=max_depth,
+        base_margin=base_margin,
+        importances=np.asarray(importances, dtype=float),
+    )
+
+
+def compile_model(model: Any) -> Predictor | None:
+    """Compile a fitted binary classifier, or None if its type has no closed-form path."""
+    if model is None:
+        return None
+    if hasattr(model, "get_booster") and model.get_params().get("objective") in (None, "binary:logistic"):
+        booster = model.get_booster()
+        trees = [json.loads(dump) for dump in booster.get_dump(with_stats=True, dump_format="json")]
+        return compile_tree_dump(trees, _base_margin(booster), model.feature_importances_)
+    if type(model).__name__ == "LogisticRegression" and np.shape(model.coef_)[0] == 1:
+        coef, intercept = model.coef_, model.intercept_
+        return LinearPredictor(coef=np.asarray(coef[0], dtype=float).copy(), intercept=float(np.asarray(intercept)[0]))
+    return None
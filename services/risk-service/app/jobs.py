@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+
+from app.concurrency import Lane, LaneOverloaded
+from app.ml import ModelManager
+from app.models import TrainJobOutput, TrainOutput, TrainRequest
+from app.utils import now_iso8601
+
+
+logger = logging.getLogger(__name__)
+
+
+class TrainJobRunner:
+    """Runs /train requests on the training lane and keeps the most recent job states."""
+
+    def __init__(self, lane: Lane | None = None, max_jobs: int = 50) -> None:
+        self._lane = lane or Lane("train", workers=1, queue_size=4, timeout_s=None)
+        self._jobs: OrderedDict[str, TrainJobOutput] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_jobs = max_jobs
+
+    def submit(self, manager: ModelManager, req: TrainRequest) -> TrainJobOutput:
+        job = TrainJobOutput(job_id=uuid.uuid4().hex, status="queued", stage="queued", progress=0.0, created_at=now_iso8601())
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self._max_jobs:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest].status in {"queued", "running"}:
+                    break
+                self._jobs.popitem(last=False)
+        try:
+            self._lane.submit(self._run, manager, req, job.job_id)
+        except LaneOverloaded:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+            raise
+        return job
+
+    def get(self, job_id: str) -> TrainJobOutput | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _update(self, job_id: str, **changes: object) -> None:
+        with self._lock:
+            self._jobs[job_id] = self._jobs[job_id].model_copy(update=changes)
+
+    def _run(self, manager: ModelManager, req: TrainRequest, job_id: str) -> None:
+        self._update(job_id, status="running", stage="starting", started_at=now_iso8601())
+        try:
+            out = manager.train_and_save(req, progress=lambda stage, fraction: self._update(job_id, stage=stage, progress=fraction))
+        except Exception as exc:
+            logger.exception("train_job_failed job_id=%s", job_id)
+            self._update(job_id, status="failed", stage="failed", error=str(exc), finished_at=now_iso8601())
+            return
+        result = TrainOutput(model_version=out["model_version"], metrics=out["metrics"], n_samples=out["n_samples"])
+        self._update(job_id, status="succeeded", stage="done", progress=1.0, result=result, finished_at=now_iso8601())
+
+    def shutdown(self) -> None:
+        self._lane.shutdown()
@@ -1,59 +1,434 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
+from typing import Any, AsyncIterator
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
+from app.batch import ScoreRow, ScoreTuple, feature_matrix
+from app.cohort import CohortIndex
+from app.columnar import FEATURES_CONTENT_TYPE, SCORES_CONTENT_TYPE, decode_columnar, encode_columnar
+from app.concurrency import Lane, LaneOverloaded, LaneTimeout
+from app.fastpath import decode_batch_request, encode_batch_output
+from app.forecast import Forecaster
+from app.jobs import TrainJobRunner
+from app.metrics import BATCH_SIZE, REGISTRY, SCORES_TOTAL, MetricsMiddleware, enter_handler, stage
+from app.microbatch import MicroBatcher
 from app.ml import ModelManager
-from app.models import BatchScoreOutput, BatchScoreRequest, FeaturesV1, HealthOutput, ScoreOutput, TrainOutput, TrainRequest
+from app.models import (
+    BatchScoreOutput,
+    BatchScoreRequest,
+    CohortCompareOutput,
+    CohortOutput,
+    FeaturesV1,
+    ForecastOutput,
+    ForecastRequest,
+    HealthOutput,
+    ModelsOutput,
+    ScoreOutput,
+    TrainJobOutput,
+    TrainOutput,
+    TrainRequest,
+)
+from app.registry import UnknownModelVersion
+from app.shadow import ShadowScorer
+from app.streaming import BodyStreamingResponse, score_ndjson
+from app.utils import get_env_float, get_env_int
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 logger = logging.getLogger("risk-service")
 
-app = FastAPI(title="Cardiometrix AI Risk Service", version="0.1.0")
-model_manager = ModelManager()
+# The artifact is loaded by the lifespan after the port is bound; /health says "warming" until then.
+model_manager = ModelManager(load=False)
+# Interactive /score, bulk /score/batch + /score/stream and training each get their own threads.
+score_lane = Lane(
+    "score",
+    workers=get_env_int("RISK_SCORE_WORKERS", 4),
+    queue_size=get_env_int("RISK_SCORE_QUEUE", 64),
+    timeout_s=get_env_float("RISK_SCORE_TIMEOUT_S", 2.0),
+)
+batch_lane = Lane(
+    "batch",
+    workers=get_env_int("RISK_BATCH_WORKERS", 2),
+    queue_size=get_env_int("RISK_BATCH_QUEUE", 16),
+    timeout_s=get_env_float("RISK_BATCH_TIMEOUT_S", 30.0),
+)
+train_lane = Lane(
+    "train",
+    workers=1,
+    queue_size=get_env_int("RISK_TRAIN_QUEUE", 4),
+    timeout_s=get_env_float("RISK_TRAIN_TIMEOUT_S", 900.0),
+)
+# Shadow scoring never queues behind (or ahead of) real traffic; a full lane drops the sample.
+shadow_lane = Lane(
+    "shadow",
+    workers=get_env_int("RISK_SHADOW_WORKERS", 1),
+    queue_size=get_env_int("RISK_SHADOW_QUEUE", 8),
+    timeout_s=None,
+)
+LANES = (score_lane, batch_lane, train_lane, shadow_lane)
+shadow = ShadowScorer(
+    model_manager,
+    shadow_lane,
+    version=os.getenv("RISK_SHADOW_VERSION", "").strip() or None,
+    sample_rate=get_env_float("RISK_SHADOW_SAMPLE_RATE", 1.0),
+)
+# Opt-in: RISK_MICROBATCH_WINDOW_MS > 0 coalesces concurrent /score calls into one batch.
+score_batcher = MicroBatcher(
+    lambda items: model_manager.score_batch(items),
+    score_lane,
+    window_s=get_env_float("RISK_MICROBATCH_WINDOW_MS", 0.0) / 1000.0,
+    max_items=get_env_int("RISK_MICROBATCH_MAX_ITEMS", 64),
+)
+train_jobs = TrainJobRunner(train_lane)
+forecaster = Forecaster(cache_size=get_env_int("RISK_FORECAST_CACHE_SIZE", 1024))
+# Population distributions per model version, fed by /score/batch and seeded from a daily_job snapshot.
+cohort_index = CohortIndex() if get_env_int("RISK_COHORT_INDEX", 1) else None
+COHORT_SNAPSHOT = os.getenv("RISK_COHORT_SNAPSHOT", "").strip() or None
+STREAM_BATCH_SIZE = get_env_int("RISK_STREAM_BATCH_SIZE", 256)
+REQUEST_LOG_SAMPLE_RATE = get_env_float("RISK_REQUEST_LOG_SAMPLE_RATE", 0.01)
+COLUMNAR_MAX_ROWS = get_env_int("RISK_COLUMNAR_MAX_ROWS", 10000)
+
+
+def _service_metrics() -> list[str]:
+    manager = model_manager
+    lines = [
+        "# HELP risk_model_info Active model version (value is always 1).",
+        "# TYPE risk_model_info gauge",
+        f'risk_model_info{{model_version="{manager.model_version()}"}} 1',
+        "# TYPE risk_score_cache gauge",
+    ]
+    lines += [f'risk_score_cache{{stat="{k}"}} {v}' for k, v in manager.score_cache.snapshot().items()]
+    lines.append("# TYPE risk_explain gauge")
+    lines += [f'risk_explain{{stat="{k}"}} {v}' for k, v in manager.contribution_cache.stats.snapshot().items()]
+    lines.append("# TYPE risk_lane gauge")
+    for lane in LANES:
+        lines += [f'risk_lane{{lane="{lane.name}",stat="{k}"}} {v}' for k, v in lane.snapshot().items()]
+    lines.append("# TYPE risk_microbatch gauge")
+    lines += [f'risk_microbatch{{stat="{k}"}} {v}' for k, v in score_batcher.snapshot().items()]
+    lines.append("# TYPE risk_registry gauge")
+    lines += [f'risk_registry{{stat="{k}"}} {v}' for k, v in manager.registry.snapshot().items()]
+    if manager.fingerprints is not None:
+        lines.append("# TYPE risk_fingerprints gauge")
+        lines += [f'risk_fingerprints{{stat="{k}"}} {v}' for k, v in manager.fingerprints.snapshot().items()]
+    lines.append("# TYPE risk_forecast_cache gauge")
+    lines += [f'risk_forecast_cache{{stat="{k}"}} {v}' for k, v in forecaster.cache.snapshot().items()]
+    if cohort_index is not None:
+        lines.append("# TYPE risk_cohort gauge")
+        lines += [f'risk_cohort{{stat="{k}"}} {v}' for k, v in cohort_index.snapshot().items()]
+    lines.append("# TYPE risk_shadow gauge")
+    lines += [f'risk_shadow{{stat="{k}"}} {v}' for k, v in shadow.snapshot().items()]
+    return lines
+
+
+REGISTRY.add_collector(_service_metrics)
+
+
+def _mark_first_score() -> None:
+    if "first_score_s" not in startup:
+        startup["first_score_s"] = round(time.perf_counter() - SERVICE_STARTED, 4)
+
+
+def _record_scores(endpoint: str, results: list[ScoreTuple] | list[ScoreRow]) -> None:
+    _mark_first_score()
+    BATCH_SIZE.observe(len(results), endpoint)
+    for _, band, _, model_version in results:
+        SCORES_TOTAL.inc(1.0, band, model_version)
+
+
+async def _require_ready() -> None:
+    if model_manager.status == "cold":
+        # Nothing started warming (no lifespan, e.g. a bare TestClient): load now, off the event loop.
+        await run_in_threadpool(model_manager.warm_up)
+    if model_manager.status != "ready":
+        raise HTTPException(status_code=503, detail="Model is still loading", headers={"Retry-After": "1"})
+
+
+async def warm_model() -> None:
+    await run_in_threadpool(model_manager.warm_up)
+    if model_manager.load_seconds is not None:
+        startup["model_load_s"] = round(model_manager.load_seconds, 4)
+    logger.info("model_ready version=%s load_s=%s", model_manager.model_version(), startup.get("model_load_s"))
+    if cohort_index is not None and COHORT_SNAPSHOT and os.path.exists(COHORT_SNAPSHOT):
+        await run_in_threadpool(_load_cohort_snapshot, cohort_index, COHORT_SNAPSHOT)
+
+
+def _load_cohort_snapshot(index: CohortIndex, path: str) -> list[str]:
+    versions = index.load(Path(path))
+    logger.info("cohort_snapshot_loaded path=%s versions=%s", path, ",".join(versions))
+    return versions
+
+
+async def watch_artifacts() -> None:
+    """Lets every uvicorn worker pick up models published by another worker's /train."""
+    while True:
+        await asyncio.sleep(model_manager.reload_interval)
+        await run_in_threadpool(model_manager.reload_if_changed)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    loader = asyncio.create_task(warm_model())
+    watcher = asyncio.create_task(watch_artifacts())
+    try:
+        yield
+    finally:
+        loader.cancel()
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+        for lane in LANES:
+            lane.shutdown()
+
+
+app = FastAPI(title="Cardiometrix AI Risk Service", version="0.1.0", lifespan=lifespan)
+SERVICE_STARTED = time.perf_counter()
+startup: dict[str, float] = {}
+app.add_middleware(MetricsMiddleware, paths=("/score", "/score/batch", "/forecast", "/train"))
+
+
+@app.exception_handler(LaneOverloaded)
+async def lane_overloaded(_: Request, exc: LaneOverloaded) -> JSONResponse:
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(LaneTimeout)
+async def lane_timeout(_: Request, exc: LaneTimeout) -> JSONResponse:
+    return JSONResponse({"detail": str(exc)}, status_code=504)
+
+
+@app.exception_handler(UnknownModelVersion)
+async def unknown_model_version(_: Request, exc: UnknownModelVersion) -> JSONResponse:
+    return JSONResponse({"detail": str(exc)}, status_code=404)
 
 
 @app.get("/health", response_model=HealthOutput)
-def health() -> HealthOutput:
-    return HealthOutput(ok=True, model_loaded=model_manager.model_loaded(), model_version=model_manager.model_version())
+async def health() -> HealthOutput:
+    return HealthOutput(
+        ok=True,
+        status=model_manager.status,
+        model_loaded=model_manager.model_loaded(),
+        model_version=model_manager.model_version(),
+        explain_stats=model_manager.contribution_cache.stats.snapshot(),
+        score_cache=model_manager.score_cache.snapshot(),
+        lanes={lane.name: lane.snapshot() for lane in LANES},
+        startup=dict(startup),
+        fingerprints=model_manager.fingerprints.snapshot() if model_manager.fingerprints is not None else {},
+        cohort=cohort_index.snapshot() if cohort_index is not None else {},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/models", response_model=ModelsOutput)
+async def models() -> ModelsOutput:
+    available = await run_in_threadpool(model_manager.available_versions)
+    return ModelsOutput(
+        active=model_manager.model_version(),
+        available=available,
+        loaded=model_manager.registry.loaded(),
+        registry=model_manager.registry.snapshot(),
+        shadow_version=shadow.version,
+        shadow=shadow.snapshot(),
+    )
 
 
 @app.post("/score", response_model=ScoreOutput)
-def score(payload: FeaturesV1) -> ScoreOutput:
-    logger.info("score_request user_id=%s as_of_date=%s", payload.user_id, payload.as_of_date)
-    risk, band, drivers, model_version = model_manager.score_one(payload)
+async def score(payload: FeaturesV1, model_version: str | None = None, force: bool = False) -> ScoreOutput:
+    """`model_version` pins any published version (or rule-v0) instead of the active one; unknown versions 404.
+
+    With the fingerprint index enabled, an unchanged user gets their stored result unless `force` is set.
+    """
+    enter_handler()
+    await _require_ready()
+    if REQUEST_LOG_SAMPLE_RATE and random.random() < REQUEST_LOG_SAMPLE_RATE:
+        logger.info("score_request user_id=%s as_of_date=%s", payload.user_id, payload.as_of_date)
+    if score_batcher.enabled and model_version is None and not force:
+        with stage("predict"):
+            result = await score_batcher.score(payload)
+    elif model_manager.fingerprints is not None and payload.user_id:
+        result = (await score_lane.run(model_manager.score_batch, [payload], model_version, force))[0]
+    else:
+        result = await score_lane.run(model_manager.score_one, payload, model_version)
+    _record_scores("/score", [result])
+    risk, band, drivers, version = result
+    # Pinned requests already chose their model; only default traffic is shadowed.
+    if shadow.enabled and model_version is None:
+        shadow.observe(feature_matrix([payload]), [(risk, band)], version)
     return ScoreOutput(
         risk=risk,
         band=band,
         drivers=drivers,
-        model_version=model_version,
+        model_version=version,
         as_of_date=payload.as_of_date,
     )
 
 
-@app.post("/score/batch", response_model=BatchScoreOutput)
-def score_batch(payload: BatchScoreRequest) -> BatchScoreOutput:
-    scored = []
-    for item in payload.items:
-        risk, band, drivers, model_version = model_manager.score_one(item)
-        scored.append(
-            ScoreOutput(
-                risk=risk,
-                band=band,
-                drivers=drivers,
-                model_version=model_version,
-                as_of_date=item.as_of_date,
-            )
-        )
-    return BatchScoreOutput(items=scored)
-
-
-@app.post("/train", response_model=TrainOutput)
-def train(payload: TrainRequest) -> TrainOutput:
+# The body is decoded by app.fastpath rather than FastAPI, so document it by hand.
+_BATCH_REQUEST_SCHEMA = BatchScoreRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+_BATCH_REQUEST_SCHEMA.pop("$defs", None)
+
+
+def _score_batch_body(body: bytes, content_type: str | None, model_version: str | None, force: bool) -> Response:
+    # Validation and vectorization are a single pass here.
+    with stage("vectorize"):
+        decoded = decode_batch_request(body, content_type)
+    rows, skipped = model_manager.score_users(decoded.user_ids, decoded.x, model_version, force)
+    _record_scores("/score/batch", rows)
+    if cohort_index is not None and rows:
+        risk = np.array([row[0] for row in rows])
+        cohort_index.add(rows[0][3], decoded.user_ids, decoded.x, risk, [row[1] for row in rows])
+    if shadow.enabled and model_version is None and rows:
+        shadow.observe(decoded.x, [(risk, band) for risk, band, _, _ in rows], rows[0][3])
+    headers = {"X-Risk-Skipped": str(skipped)} if model_manager.fingerprints is not None else None
+    return Response(encode_batch_output(rows, decoded.dates), media_type="application/json", headers=headers)
+
+
+def _score_columnar_body(body: bytes, drivers: bool, model_version: str | None) -> Response:
+    with stage("vectorize"):
+        decoded = decode_columnar(body, COLUMNAR_MAX_ROWS)
+        if decoded.errors:
+            raise RequestValidationError(decoded.request_errors())
+    # Rows here are rarely repeated, so this path goes straight to the arrays and skips the score cache.
+    scores = model_manager.score_matrix(decoded.x, model_version)
+    _mark_first_score()
+    BATCH_SIZE.observe(len(scores), "/score/batch")
+    bands = scores.bands()
+    for band, count in zip(*np.unique(bands, return_counts=True)):
+        SCORES_TOTAL.inc(float(count), str(band), scores.model_version)
+    if cohort_index is not None:
+        cohort_index.add(scores.model_version, decoded.user_ids, decoded.x, scores.risk, bands)
+    if shadow.enabled and model_version is None:
+        shadow.observe(decoded.x, list(zip(np.round(scores.risk, 6).tolist(), bands)), scores.model_version)
+    return Response(encode_columnar(scores, drivers), media_type=SCORES_CONTENT_TYPE)
+
+
+@app.post(
+    "/score/batch",
+    response_model=BatchScoreOutput,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _BATCH_REQUEST_SCHEMA},
+                FEATURES_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def score_batch(
+    request: Request, drivers: bool = False, model_version: str | None = None, force: bool = False
+) -> Response:
+    """BatchScoreRequest JSON, or a columnar application/x-risk-features body (see app.columnar).
+
+    `drivers` only applies to columnar responses; JSON responses always include drivers.
+    `model_version` pins a version as on /score. JSON bodies skip unchanged users via the fingerprint
+    index (when enabled; `force` re-scores them) and report the count in X-Risk-Skipped.
+    """
+    enter_handler()
+    await _require_ready()
+    with stage("validation"):
+        body = await request.body()
+    content_type = request.headers.get("content-type")
+    if content_type and content_type.split(";")[0].strip().lower() == FEATURES_CONTENT_TYPE:
+        return await batch_lane.run(_score_columnar_body, body, drivers, model_version)
+    return await batch_lane.run(_score_batch_body, body, content_type, model_version, force)
+
+
+@app.post("/score/stream")
+async def score_stream(request: Request, model_version: str | None = None) -> BodyStreamingResponse:
+    """Score newline-delimited FeaturesV1 records; one ScoreOutput or {"line", "error"} object per input line."""
+    await _require_ready()
+    if model_version is not None:
+        # Resolve (and load) the pinned version before the 200 goes out, so unknown versions still 404.
+        await run_in_threadpool(model_manager.bundle_for, model_version)
+    return BodyStreamingResponse(
+        score_ndjson(model_manager, request.stream(), STREAM_BATCH_SIZE, run=batch_lane.run, version=model_version),
+        media_type="application/x-ndjson",
+    )
+
+
+def _require_cohort() -> CohortIndex:
+    if cohort_index is None:
+        raise HTTPException(status_code=404, detail="Cohort index is disabled (RISK_COHORT_INDEX=0)")
+    return cohort_index
+
+
+@app.get("/cohort", response_model=CohortOutput)
+async def cohort(model_version: str | None = None, bins: int = Query(default=20, ge=1, le=100)) -> CohortOutput:
+    """Band shares, risk quantiles and a risk histogram for everyone scored under a version (default: active)."""
+    index = _require_cohort()
+    version = model_version or model_manager.model_version()
+    out = index.summary(version, bins)
+    if out is None:
+        raise HTTPException(status_code=404, detail=f"No cohort scores for model version {version}")
+    return CohortOutput(**out)
+
+
+@app.get("/cohort/compare", response_model=CohortCompareOutput)
+async def cohort_compare(
+    user_id: str | None = None, risk: float | None = Query(default=None, ge=0.0, le=1.0), model_version: str | None = None
+) -> CohortCompareOutput:
+    """Where a user (by their latest indexed score and features) or a bare risk falls in the population."""
+    index = _require_cohort()
+    if (user_id is None) == (risk is None):
+        raise HTTPException(status_code=422, detail="Pass exactly one of user_id or risk")
+    version = model_version or model_manager.model_version()
+    out = index.compare(version, user_id, risk)
+    if out is None:
+        raise HTTPException(status_code=404, detail=f"No cohort scores for {user_id or 'model version'} under {version}")
+    return CohortCompareOutput(**out)
+
+
+@app.post("/cohort/reload")
+async def cohort_reload() -> dict[str, Any]:
+    """Re-read RISK_COHORT_SNAPSHOT (e.g. after a daily_job run), replacing the populations it holds."""
+    index = _require_cohort()
+    if not COHORT_SNAPSHOT or not os.path.exists(COHORT_SNAPSHOT):
+        raise HTTPException(status_code=404, detail="RISK_COHORT_SNAPSHOT is not set or does not exist")
+    return {"versions": await run_in_threadpool(_load_cohort_snapshot, index, COHORT_SNAPSHOT)}
+
+
+@app.post("/forecast", response_model=ForecastOutput)
+async def forecast(payload: ForecastRequest, model_version: str | None = None) -> ForecastOutput:
+    """Project a user's daily FeaturesV1 history `horizon_days` ahead and score every day in one pass (app.forecast)."""
+    enter_handler()
+    await _require_ready()
+    out = await score_lane.run(forecaster.forecast, model_manager, payload, model_version)
+    BATCH_SIZE.observe(len(out.trajectory) + 1, "/forecast")
+    return out
+
+
+def _train_sync(payload: TrainRequest) -> dict[str, Any]:
+    with stage("fit"):
+        return model_manager.train_and_save(payload)
+
+
+@app.post("/train", response_model=TrainOutput | TrainJobOutput)
+async def train(payload: TrainRequest, response: Response, background: bool = False) -> TrainOutput | TrainJobOutput:
+    """Synchronous training answers 504 past RISK_TRAIN_TIMEOUT_S (the fit still completes); prefer ?background=true."""
+    enter_handler()
+    await _require_ready()
+    if background:
+        response.status_code = 202
+        return train_jobs.submit(model_manager, payload)
+
     try:
-        out = model_manager.train_and_save(payload)
+        out = await train_lane.run(_train_sync, payload)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -62,3 +437,23 @@ def train(payload: TrainRequest) -> TrainOutput:
         metrics=out["metrics"],
         n_samples=out["n_samples"],
     )
+
+
+@app.get("/train/jobs/{job_id}", response_model=TrainJobOutput)
+async def train_job(job_id: str) -> TrainJobOutput:
+    job = train_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown training job")
+    return job
+
+
+@app.get("/train/jobs/{job_id}/result", response_model=TrainOutput)
+async def train_job_result(job_id: str) -> TrainOutput:
+    job = train_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown training job")
+    if job.status == "failed":
+        raise HTTPException(status_code=400, detail=job.error or "Training failed")
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=f"Training job is {job.status}")
+    return job.result
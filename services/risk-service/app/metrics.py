@@ -0,0 +1,231 @@
+"""In-process Prometheus text-format metrics and per-request stage timing.
+
+Scoring code wraps its stages in `stage("predict")`; the ASGI middleware installs a
+RequestTiming for instrumented paths so those observations are labelled with the endpoint.
+Outside a request (CLI, tests calling ModelManager directly) stage timers are no-ops.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+DIFF_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labels, labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        bounds = [f'le="{bound}"' for bound in self.buckets] + ['le="+Inf"']
+        for labels, series in items:
+            cumulative = 0.0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(self.labels, labels, bound)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {series[-1]}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], Iterable[str]]] = []
+
+    def add(self, metric: Counter | Histogram) -> Counter | Histogram:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Collectors render gauges computed at scrape time (model version, cache sizes, ...)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REQUEST_LATENCY = Histogram(
+    "risk_request_duration_seconds", "End-to-end request latency.", LATENCY_BUCKETS, ("endpoint",)
+)
+STAGE_LATENCY = Histogram(
+    "risk_stage_duration_seconds",
+    "Request latency by stage: validation, vectorize, predict, drivers, fit, serialization.",
+    LATENCY_BUCKETS,
+    ("endpoint", "stage"),
+)
+BATCH_SIZE = Histogram("risk_batch_size", "Rows per scoring request.", BATCH_SIZE_BUCKETS, ("endpoint",))
+SCORES_TOTAL = Counter("risk_scores_total", "Scores returned, by band and model version.", ("band", "model_version"))
+LANE_REJECTED = Counter("risk_lane_rejected_total", "Requests rejected with 503 because a lane was full.", ("lane",))
+LANE_TIMEOUTS = Counter("risk_lane_timeouts_total", "Requests that missed their lane deadline (504).", ("lane",))
+SHADOW_DIFF = Histogram(
+    "risk_shadow_abs_diff", "Absolute risk difference, shadow challenger vs champion.", DIFF_BUCKETS, ("challenger",)
+)
+SHADOW_BAND_CHANGES = Counter(
+    "risk_shadow_band_changes_total", "Shadow-scored rows whose band differs.", ("champion_band", "challenger_band")
+)
+for _metric in (
+    REQUEST_LATENCY,
+    STAGE_LATENCY,
+    BATCH_SIZE,
+    SCORES_TOTAL,
+    LANE_REJECTED,
+    LANE_TIMEOUTS,
+    SHADOW_DIFF,
+    SHADOW_BAND_CHANGES,
+):
+    REGISTRY.add(_metric)
+
+
+class RequestTiming:
+    __slots__ = ("endpoint", "started", "handler_started", "stages")
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.handler_started: float | None = None
+        self.stages: dict[str, float] = {}
+
+    def enter_handler(self) -> None:
+        self.handler_started = time.perf_counter()
+
+    def add(self, stage_name: str, seconds: float) -> None:
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+
+_current: ContextVar[RequestTiming | None] = ContextVar("risk_request_timing", default=None)
+
+
+def current_timing() -> RequestTiming | None:
+    return _current.get()
+
+
+def enter_handler() -> None:
+    timing = _current.get()
+    if timing is not None:
+        timing.enter_handler()
+
+
+class stage:
+    """Adds the elapsed time of the block to the current request's stage total."""
+
+    __slots__ = ("name", "timing", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.timing = _current.get()
+
+    def __enter__(self) -> stage:
+        if self.timing is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self.timing is not None:
+            self.timing.add(self.name, time.perf_counter() - self.started)
+
+
+def _finish(timing: RequestTiming, response_started: float | None) -> None:
+    ended = time.perf_counter()
+    REQUEST_LATENCY.observe(ended - timing.started, timing.endpoint)
+    if timing.handler_started is None:
+        return
+    # Handlers that decode their own body record the rest of validation as a stage.
+    validation = timing.handler_started - timing.started + timing.stages.get("validation", 0.0)
+    STAGE_LATENCY.observe(validation, timing.endpoint, "validation")
+    for name, seconds in timing.stages.items():
+        if name != "validation":
+            STAGE_LATENCY.observe(seconds, timing.endpoint, name)
+    # Whatever the handler and FastAPI spent outside the named stages is response building.
+    serialized_at = response_started or ended
+    accounted = sum(timing.stages.values())
+    STAGE_LATENCY.observe(max(serialized_at - timing.handler_started - accounted, 0.0), timing.endpoint, "serialization")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware buffering) timing the instrumented paths."""
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str]) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(scope["path"])
+        token = _current.set(timing)
+        response_started: list[float] = []
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_started.append(time.perf_counter())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            _finish(timing, response_started[0] if response_started else None)
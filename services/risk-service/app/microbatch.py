@@ -0,0 +1,87 @@
+"""Opt-in coalescing of concurrent /score calls into one batch-path call.
+
+The first request opens a window of `window_s`; everything that arrives before it closes (or
+until `max_items` are waiting) is scored with a single score_batch call on the score lane,
+and each caller gets its own row back. Trades up to one window of latency for throughput.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+from typing import Callable, Sequence
+
+from app.batch import ScoreTuple
+from app.concurrency import Lane
+from app.metrics import BATCH_SIZE
+from app.models import FeaturesV1
+
+
+BatchScorer = Callable[[Sequence[FeaturesV1]], list[ScoreTuple]]
+
+
+class MicroBatcher:
+    def __init__(self, score_batch: BatchScorer, lane: Lane, window_s: float, max_items: int) -> None:
+        self.score_batch = score_batch
+        self.lane = lane
+        self.window_s = window_s
+        self.max_items = max_items
+        self._pending: list[tuple[FeaturesV1, asyncio.Future[ScoreTuple]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_s > 0 and self.max_items > 1
+
+    async def score(self, features: FeaturesV1) -> ScoreTuple:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[ScoreTuple] = loop.create_future()
+        self._pending.append((features, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # A fresh context: the batch belongs to no single request's stage timings.
+        task = asyncio.get_running_loop().create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[FeaturesV1, asyncio.Future[ScoreTuple]]]) -> None:
+        with self._stats_lock:
+            self.batches += 1
+            self.items += len(batch)
+        BATCH_SIZE.observe(len(batch), "/score (coalesced)")
+        try:
+            results = await self.lane.run(self.score_batch, [features for features, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def snapshot(self) -> dict[str, float]:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window_s * 1000.0,
+                "max_items": self.max_items,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            }
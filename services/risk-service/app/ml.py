@@ -1,191 +1,573 @@
 from __future__ import annotations
 
+import dataclasses
 import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Sequence
 
 import joblib
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import log_loss, roc_auc_score
-from sklearn.model_selection import train_test_split
 
+from app.artifacts import METADATA_FILE, MODEL_FILE, VERSIONS_DIR, ArtifactToken, artifact_token, publish, resolve_artifact
+from app.batch import BatchScores, ScoreRow, ScoreTuple, as_score_row, as_score_tuple, feature_matrix
+from app.cache import ScoreCache, vector_key
+from app.explain import ContributionCache, Explainer, compile_explainer
+from app.fingerprints import FingerprintIndex
+from app.flatmodel import FLAT_DIR, dump_flat, load_flat
+from app.inference import Predictor, compile_model
+from app.metrics import stage
 from app.models import FEATURE_NAMES_V1, Driver, FeaturesV1, TrainRequest
-from app.scoring import RULE_MODEL_VERSION, score_rule_v0
-from app.utils import band_for_risk, clip, dump_json, get_artifact_dir, load_json, next_model_version, now_iso8601
+from app.registry import ModelRegistry, UnknownModelVersion
+from app.scoring import RULE_MODEL_VERSION, score_rule_v0, score_rule_v0_batch
+from app.trainstore import STORE_DIR, TrainingStore
+from app.utils import band_for_risk, clip, get_artifact_dir, get_env_float, get_env_int, load_json, now_iso8601
 
 
 logger = logging.getLogger(__name__)
 
+ProgressFn = Callable[[str, float], None]
+
+MODEL_BASELINE = Driver(name="Model baseline", value=0.0, direction="down", contribution=0.0)
+VERSION_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Everything scoring needs from one artifact version; replaced as a whole, never mutated."""
+
+    model: Any | None
+    metadata: dict[str, Any]
+    feature_means: np.ndarray
+    token: ArtifactToken | None = None
+    predictor: Predictor | None = None
+    explainer: Explainer | None = None
+
+    @property
+    def is_rule(self) -> bool:
+        return self.model is None and self.predictor is None
+
+    @property
+    def version(self) -> str:
+        if self.is_rule:
+            return RULE_MODEL_VERSION
+        return str(self.metadata.get("model_version") or RULE_MODEL_VERSION)
+
+    @classmethod
+    def rule(cls, token: ArtifactToken | None = None) -> ModelBundle:
+        return cls(model=None, metadata={}, feature_means=np.zeros(len(FEATURE_NAMES_V1)), token=token)
+
+    @classmethod
+    def from_estimator(cls, model: Any, metadata: dict[str, Any], token: ArtifactToken | None = None) -> ModelBundle:
+        means = np.asarray(metadata.get("feature_means", [0.0] * len(FEATURE_NAMES_V1)), dtype=float)
+        try:
+            predictor = compile_model(model)
+            explainer = compile_explainer(predictor, means)
+        except Exception:
+            logger.exception("model_compile_failed version=%s", metadata.get("model_version"))
+            predictor, explainer = None, None
+        return cls(model=model, metadata=metadata, feature_means=means, token=token, predictor=predictor, explainer=explainer)
+
+    @classmethod
+    def from_flat(cls, version_dir: Path, metadata: dict[str, Any], token: ArtifactToken | None = None) -> ModelBundle | None:
+        """Memory-mapped compiled model with no estimator object, or None if the version has none."""
+        flat = load_flat(version_dir / FLAT_DIR)
+        if flat is None:
+            return None
+        predictor, explainer = flat
+        means = np.asarray(metadata.get("feature_means", [0.0] * len(FEATURE_NAMES_V1)), dtype=float)
+        return cls(model=None, metadata=metadata, feature_means=means, token=token, predictor=predictor, explainer=explainer)
+
+    def dump_flat(self, version_dir: Path) -> None:
+        if self.predictor is not None:
+            dump_flat(version_dir / FLAT_DIR, self.predictor, self.explainer)
+
+
+RULE_BUNDLE = ModelBundle.rule()
+
+
+def load_bundle(model_path: Path, metadata_path: Path, model_format: str, token: ArtifactToken | None = None) -> ModelBundle:
+    """Flat compiled arrays when present (and model_format allows), else the pickled estimator."""
+    metadata = load_json(metadata_path)
+    bundle = None
+    if model_format != "pickle":
+        bundle = ModelBundle.from_flat(model_path.parent, metadata, token)
+    if bundle is None:
+        bundle = ModelBundle.from_estimator(joblib.load(model_path), metadata, token)
+    return bundle
+
 
 class ModelManager:
-    def __init__(self, artifact_dir: Path | None = None) -> None:
+    """Owns the active ModelBundle.
+
+    sklearn/xgboost are only imported by training (app.training) or by unpickling a model
+    that needs them. With load=False the artifact is loaded later by warm_up(), so a server
+    can bind its port first; until then status is "cold" or "warming".
+    """
+
+    def __init__(self, artifact_dir: Path | None = None, load: bool = True) -> None:
         self.artifact_dir = artifact_dir or get_artifact_dir()
         self.model_path = self.artifact_dir / "model.pkl"
         self.metadata_path = self.artifact_dir / "metadata.json"
-        self.model: Any | None = None
-        self.metadata: dict[str, Any] = {}
-        self.load_model_if_exists()
+        self.bundle = ModelBundle.rule()
+        self.reload_interval = get_env_float("RISK_RELOAD_INTERVAL_S", 2.0)
+        self.contribution_cache = ContributionCache(get_env_int("RISK_EXPLAIN_CACHE_SIZE", 10_000))
+        self.score_cache = ScoreCache(
+            max_size=get_env_int("RISK_SCORE_CACHE_SIZE", 10_000),
+            ttl_seconds=get_env_float("RISK_SCORE_CACHE_TTL_S", 3600.0),
+        )
+        self._train_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        self._ready = threading.Event()
+        self._warm_started = False
+        self._warm_lock = threading.Lock()
+        self.load_seconds: float | None = None
+        # "auto" serves the flat compiled arrays when a version has them; "pickle" always unpickles.
+        self.model_format = os.getenv("RISK_MODEL_FORMAT", "auto").strip().lower()
+        self.registry = ModelRegistry(self._load_version, get_env_int("RISK_REGISTRY_BUDGET_MB", 256) * 1024 * 1024)
+        self.training_store = TrainingStore(self.artifact_dir / STORE_DIR)
+        # Opt-in: a SQLite path enables skipping users whose features have not changed.
+        fingerprint_db = os.getenv("RISK_FINGERPRINT_DB", "").strip()
+        self.fingerprints = FingerprintIndex(Path(fingerprint_db)) if fingerprint_db else None
+        if load:
+            self.warm_up()
+
+    @property
+    def status(self) -> str:
+        if self._ready.is_set():
+            return "ready"
+        return "warming" if self._warm_started else "cold"
+
+    def warm_up(self) -> None:
+        """Load the active artifact. A failed load logs and leaves rule-v0 active; the reload watcher retries."""
+        with self._warm_lock:
+            if self._warm_started:
+                return
+            self._warm_started = True
+        started = time.perf_counter()
+        try:
+            with self._reload_lock:
+                self.load_model_if_exists()
+        except Exception:
+            logger.exception("model_load_failed artifact_dir=%s", self.artifact_dir)
+        finally:
+            self.load_seconds = time.perf_counter() - started
+            self._ready.set()
+
+    def ensure_ready(self) -> bool:
+        """True once loaded; loads inline if nothing started warming (e.g. no lifespan), False while warming."""
+        if self._ready.is_set():
+            return True
+        self.warm_up()
+        return self._ready.is_set()
+
+    @property
+    def model(self) -> Any | None:
+        return self.bundle.model
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self.bundle.metadata
 
     def model_loaded(self) -> bool:
-        return self.model is not None
+        return not self.bundle.is_rule
 
     def model_version(self) -> str:
-        if self.model is None:
-            return RULE_MODEL_VERSION
-        return str(self.metadata.get("model_version") or RULE_MODEL_VERSION)
+        return self.bundle.version
 
     def load_model_if_exists(self) -> bool:
         self.artifact_dir.mkdir(parents=True, exist_ok=True)
-        if not self.model_path.exists() or not self.metadata_path.exists():
-            self.model = None
-            self.metadata = {}
+        token = artifact_token(self.artifact_dir)
+        paths = resolve_artifact(self.artifact_dir)
+        if paths is None:
+            self._activate(ModelBundle.rule(token))
             return False
-        self.model = joblib.load(self.model_path)
-        self.metadata = load_json(self.metadata_path)
-        logger.info("loaded_model version=%s", self.metadata.get("model_version"))
+        model_path, metadata_path = paths
+        bundle = load_bundle(model_path, metadata_path, self.model_format, token)
+        self._activate(bundle)
+        logger.info("loaded_model version=%s compiled_only=%s", bundle.version, bundle.model is None)
         return True
 
-    def score_one(self, features: FeaturesV1) -> tuple[float, str, list[Driver], str]:
-        if self.model is None:
-            return score_rule_v0(features)
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """Pick up a version published by another worker; costs one stat() per reload_interval.
 
-        vector = np.array(features.as_feature_vector(), dtype=float)
-        risk = float(self._predict_proba(vector))
+        In-flight requests keep the bundle they already read, so the swap never blocks them.
+        """
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = now + self.reload_interval
+            if artifact_token(self.artifact_dir) == self.bundle.token:
+                return False
+            previous = self.bundle.version
+            self.load_model_if_exists()
+            return self.bundle.version != previous
+        except Exception:
+            logger.exception("model_reload_failed artifact_dir=%s", self.artifact_dir)
+            return False
+        finally:
+            self._reload_lock.release()
+
+    def _activate(self, bundle: ModelBundle) -> None:
+        previous = self.bundle.version
+        self.bundle = bundle
+        if bundle.version != previous:
+            self.score_cache.clear()
+
+    def _load_version(self, version: str) -> tuple[ModelBundle, int]:
+        version_dir = self.artifact_dir / VERSIONS_DIR / version
+        if not VERSION_NAME.fullmatch(version) or not (version_dir / METADATA_FILE).is_file():
+            raise UnknownModelVersion(version)
+        bundle = load_bundle(version_dir / MODEL_FILE, version_dir / METADATA_FILE, self.model_format)
+        size = sum(path.stat().st_size for path in version_dir.rglob("*") if path.is_file())
+        logger.info("registry_loaded version=%s bytes=%d", version, size)
+        return bundle, size
+
+    def bundle_for(self, version: str | None = None) -> ModelBundle:
+        """The active bundle, or a pinned one (rule-v0 or any published version); raises UnknownModelVersion."""
+        bundle = self.bundle
+        if version is None or version == bundle.version:
+            return bundle
+        if version == RULE_MODEL_VERSION:
+            return RULE_BUNDLE
+        return self.registry.get(version)
+
+    def available_versions(self) -> list[str]:
+        versions_dir = self.artifact_dir / VERSIONS_DIR
+        published = [p.name for p in versions_dir.iterdir() if (p / METADATA_FILE).is_file()] if versions_dir.is_dir() else []
+        return [RULE_MODEL_VERSION] + sorted(published, key=lambda name: (len(name), name))
+
+    def score_one(self, features: FeaturesV1, version: str | None = None) -> tuple[float, str, list[Driver], str]:
+        bundle = self.bundle_for(version)
+        with stage("vectorize"):
+            vector = np.array(features.as_feature_vector(), dtype=float)
+        if not self.score_cache.enabled:
+            return self._score_vector(bundle, features, vector)
+
+        key = vector_key(bundle.version, vector)
+        cached = self.score_cache.get(key)
+        if cached is not None:
+            return as_score_tuple(cached)
+        result = self._score_vector(bundle, features, vector)
+        self.score_cache.put(key, as_score_row(result))
+        return result
+
+    def _score_vector(self, bundle: ModelBundle, features: FeaturesV1, vector: np.ndarray) -> ScoreTuple:
+        if bundle.is_rule:
+            with stage("predict"):
+                return score_rule_v0(features)
+
+        with stage("predict"):
+            risk = float(self._predict_proba(bundle, vector))
         risk = clip(risk, 0.0, 1.0)
-        drivers = self._drivers_from_model(vector)
+        with stage("drivers"):
+            drivers = self._drivers_for_vector(bundle, vector)
         if not drivers:
-            drivers = [Driver(name="Model baseline", value=0.0, direction="down", contribution=0.0)]
-        return round(risk, 6), band_for_risk(risk), drivers, self.model_version()
-
-    def train_and_save(self, req: TrainRequest) -> dict[str, Any]:
+            drivers = [MODEL_BASELINE.model_copy()]
+        return round(risk, 6), band_for_risk(risk), drivers, bundle.version
+
+    def score_batch(self, items: Sequence[FeaturesV1], version: str | None = None, force: bool = False) -> list[ScoreTuple]:
+        with stage("vectorize"):
+            x = feature_matrix(items)
+        rows, _ = self.score_users([item.user_id for item in items], x, version, force)
+        return [as_score_tuple(row) for row in rows]
+
+    def score_users(
+        self, user_ids: Sequence[str | None], x: np.ndarray, version: str | None = None, force: bool = False
+    ) -> tuple[list[ScoreRow], int]:
+        """score_rows, answering users whose vector is unchanged from the fingerprint index.
+
+        Returns the rows and how many were skipped. `force` re-scores everything (and refreshes the index).
+        """
+        index = self.fingerprints
+        if index is None:
+            return self.score_rows(x, version), 0
+        results: list[ScoreRow | None]
+        if force:
+            index.count_forced(len(user_ids))
+            results = [None] * len(user_ids)
+        else:
+            with stage("fingerprints"):
+                results = index.lookup(user_ids, x, self.bundle_for(version).version)
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing:
+            scored = self.score_rows(x[missing], version)
+            for idx, row in zip(missing, scored):
+                results[idx] = row
+            with stage("fingerprints"):
+                index.store([user_ids[idx] for idx in missing], x[missing], scored)
+        return results, len(results) - len(missing)  # type: ignore[return-value]
+
+    def score_rows(self, x: np.ndarray, version: str | None = None) -> list[ScoreRow]:
+        """Cache-aware scoring of a feature matrix into plain tuples (no pydantic objects)."""
+        bundle = self.bundle_for(version)
+        if not self.score_cache.enabled:
+            return self._batch_rows(bundle, x)
+
+        results = [self.score_cache.get(vector_key(bundle.version, row)) for row in x]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing:
+            for idx, result in zip(missing, self._batch_rows(bundle, x[missing])):
+                results[idx] = result
+                self.score_cache.put(vector_key(result[3], x[idx]), result)
+        return results  # type: ignore[return-value]
+
+    def _batch_rows(self, bundle: ModelBundle, x: np.ndarray) -> list[ScoreRow]:
+        scores = self._score_bundle(bundle, x)
+        with stage("drivers"):
+            return scores.as_rows()
+
+    def score_matrix(self, x: np.ndarray, version: str | None = None) -> BatchScores:
+        return self._score_bundle(self.bundle_for(version), x)
+
+    def _score_bundle(self, bundle: ModelBundle, x: np.ndarray) -> BatchScores:
+        if bundle.is_rule:
+            with stage("predict"):
+                return score_rule_v0_batch(x)
+
+        with stage("predict"):
+            if bundle.predictor is not None:
+                probs = bundle.predictor.predict_proba(x)
+            else:
+                probs = self._predict_proba_batch(bundle.model, x)
+        risk = np.clip(np.asarray(probs, dtype=float), 0.0, 1.0)
+        with stage("drivers"):
+            contributions = self._drivers_from_model(bundle, x)
+        if contributions is None:
+            contributions = np.zeros_like(x)
+        return BatchScores(
+            values=x,
+            risk=risk,
+            contributions=contributions,
+            driver_mask=np.abs(contributions) >= 1e-4,
+            driver_names=FEATURE_NAMES_V1,
+            baseline=MODEL_BASELINE,
+            model_version=bundle.version,
+        )
+
+    def train_and_save(self, req: TrainRequest, progress: ProgressFn | None = None) -> dict[str, Any]:
+        # Serialized so concurrent trainings cannot claim the same next_model_version.
+        with self._train_lock:
+            return self._train_and_save(req, progress)
+
+    def _train_and_save(self, req: TrainRequest, progress: ProgressFn | None) -> dict[str, Any]:
+        from app.training import cross_validated_search, safe_auc, safe_logloss
+
+        report = progress or (lambda stage, fraction: None)
+        report("vectorizing", 0.05)
         rows = req.rows
-        x = np.array([r.features.as_feature_vector() for r in rows], dtype=float)
-        y_raw = np.array([float(r.label) for r in rows], dtype=float)
+        if req.incremental and req.search:
+            raise ValueError("search is not supported for incremental training")
+        new_x = np.array([r.features.as_feature_vector() for r in rows], dtype=float)
+        new_y = np.array([float(r.label) for r in rows], dtype=float)
+        warm: tuple[Any, str, str] | None = None
+        if req.incremental:
+            # Evaluated only on rows of this upload: the stored rows already trained the previous model.
+            keep, held = self._split_dataset(np.arange(len(rows)), (new_y >= 0.5).astype(int))[:2]
+            # Stored rows plus the upload's training part, in one preallocated float32 matrix.
+            x, y_raw = self.training_store.load(extra_rows=len(keep))
+            x[-len(keep) :] = new_x[keep]
+            y_raw[-len(keep) :] = new_y[keep]
+            x_holdout, y_holdout = new_x[held], (new_y[held] >= 0.5).astype(int)
+            warm = self._warm_start_source(req.model_type)
+        else:
+            x, y_raw = new_x, new_y
         y = (y_raw >= 0.5).astype(int)
 
         if len(np.unique(y)) < 2:
             raise ValueError("Training labels must contain at least two classes after thresholding at 0.5")
 
-        estimator, model_type = self._build_estimator()
-
-        x_train, x_eval, y_train, y_eval = self._split_dataset(x, y)
-        estimator.fit(x_train, y_train)
-
-        probs_eval = self._predict_proba_batch(estimator, x_eval)
-        auc = self._safe_auc(y_eval, probs_eval)
-        ll = self._safe_logloss(y_eval, probs_eval)
-
-        prev_version = None
-        if self.metadata_path.exists():
-            prev_meta = load_json(self.metadata_path)
-            prev_version = str(prev_meta.get("model_version"))
-
-        model_version = next_model_version(prev_version)
-        feature_means = x_train.mean(axis=0).tolist()
+        report("fitting", 0.1)
+        started = time.perf_counter()
+        cv_report: dict[str, Any] | None = None
+        if req.incremental:
+            from app.training import warm_start_estimator
+
+            start = warm_start_estimator(warm[1], warm[0]) if warm is not None else None
+            if start is None:
+                # No compatible active model, or the xgboost tree cap is reached: refit from scratch.
+                estimator, model_type = self._build_estimator(warm[1] if warm is not None else req.model_type)
+                fit_kwargs: dict[str, Any] = {}
+                warm = None
+            else:
+                (estimator, fit_kwargs), model_type = start, warm[1]
+            x_train, x_eval, y_train, y_eval = x, x_holdout, y, y_holdout
+            estimator.fit(x_train, y_train, **fit_kwargs)
+
+            report("evaluating", 0.8)
+            probs_eval = self._predict_proba_batch(estimator, x_eval)
+            auc = safe_auc(y_eval, probs_eval)
+            ll = safe_logloss(y_eval, probs_eval)
+        elif req.search:
+            estimator, model_type, cv_report = cross_validated_search(x, y, req.cv_folds, model_type=req.model_type)
+            best = next(c for c in cv_report["candidates"] if c["params"] == cv_report["best_params"])
+            auc, ll = best["mean_auc"], best["mean_logloss"]
+            x_train = x
+        else:
+            estimator, model_type = self._build_estimator(req.model_type)
+
+            x_train, x_eval, y_train, y_eval = self._split_dataset(x, y)
+            estimator.fit(x_train, y_train)
+
+            report("evaluating", 0.8)
+            probs_eval = self._predict_proba_batch(estimator, x_eval)
+            auc = safe_auc(y_eval, probs_eval)
+            ll = safe_logloss(y_eval, probs_eval)
+        train_seconds = time.perf_counter() - started
+
+        extra: dict[str, Any] = {}
+        if cv_report is not None:
+            extra["cross_validation"] = cv_report
+        if req.incremental:
+            extra["incremental"] = {
+                "n_new_samples": len(rows),
+                "n_holdout": len(rows) - len(keep),  # 0: too small to split, evaluated in-sample
+                "warm_start_from": warm[2] if warm else None,
+            }
+
+        report("saving", 0.9)
+        # Every row this call used, including an incremental upload's holdout.
+        n_samples = int(x.shape[0]) + (len(rows) - len(keep) if req.incremental else 0)
+        model_version = self._publish_trained(
+            estimator, model_type, x_train, auc, ll, n_samples, train_seconds, extra
+        )
+        # Stored only once the model is published, so a failed fit never leaves its rows behind.
+        if req.incremental:
+            self.training_store.append(new_x, new_y)
+        else:
+            self.training_store.replace((new_x, new_y))
+
+        logger.info("trained_model version=%s n_samples=%d", model_version, n_samples)
+        return {
+            "model_version": model_version,
+            "metrics": {
+                "auc": auc,
+                "logloss": ll,
+            },
+            "n_samples": n_samples,
+        }
 
+    def train_arrays(
+        self,
+        x_train: np.ndarray,
+        y_train: np.ndarray,
+        x_eval: np.ndarray,
+        y_eval: np.ndarray,
+        model_type: str | None = None,
+        extra_metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Fit on an already split dataset (raw labels), used as-is: no list of rows, no split copies."""
+        from app.training import safe_auc, safe_logloss
+
+        with self._train_lock:
+            y_fit = (y_train >= 0.5).astype(np.int8)
+            if len(np.unique(y_fit)) < 2:
+                raise ValueError("Training labels must contain at least two classes after thresholding at 0.5")
+            started = time.perf_counter()
+            estimator, model_type = self._build_estimator(model_type)
+            estimator.fit(x_train, y_fit)
+            if len(y_eval):
+                probs_eval = self._predict_proba_batch(estimator, x_eval)
+                y_check = (y_eval >= 0.5).astype(np.int8)
+                auc, ll = safe_auc(y_check, probs_eval), safe_logloss(y_check, probs_eval)
+            else:
+                auc, ll = None, None
+            train_seconds = time.perf_counter() - started
+            n_samples = int(x_train.shape[0] + x_eval.shape[0])
+            model_version = self._publish_trained(
+                estimator, model_type, x_train, auc, ll, n_samples, train_seconds, extra_metadata or {}
+            )
+            # Like a full /train: later incremental calls build on exactly these rows.
+            self.training_store.replace((x_train, y_train), (x_eval, y_eval))
+        logger.info("trained_model version=%s n_samples=%d", model_version, n_samples)
+        return {"model_version": model_version, "metrics": {"auc": auc, "logloss": ll}, "n_samples": n_samples}
+
+    def _publish_trained(
+        self,
+        estimator: Any,
+        model_type: str,
+        x_train: np.ndarray,
+        auc: float | None,
+        ll: float | None,
+        n_samples: int,
+        train_seconds: float,
+        extra: dict[str, Any],
+    ) -> str:
         metadata: dict[str, Any] = {
-            "model_version": model_version,
             "trained_at": now_iso8601(),
             "feature_names": FEATURE_NAMES_V1,
-            "feature_means": feature_means,
+            "feature_means": x_train.mean(axis=0, dtype=np.float64).tolist(),
             "training_metrics": {
                 "auc": auc,
                 "logloss": ll,
             },
-            "n_samples": int(x.shape[0]),
+            "n_samples": n_samples,
             "model_type": model_type,
             "label_mode": "binary_threshold_0.5",
-        }
-
-        self.artifact_dir.mkdir(parents=True, exist_ok=True)
-        joblib.dump(estimator, self.model_path)
-        dump_json(self.metadata_path, metadata)
+            "train_seconds": round(train_seconds, 4),
+        } | extra
+        bundle = ModelBundle.from_estimator(estimator, metadata)
+        metadata = publish(self.artifact_dir, estimator, metadata, write_extra=bundle.dump_flat)
+        self._activate(dataclasses.replace(bundle, metadata=metadata, token=artifact_token(self.artifact_dir)))
+        return metadata["model_version"]
+
+    def _warm_start_source(self, model_type: str | None) -> tuple[Any, str, str] | None:
+        """(estimator, model_type, version) of the active model, unless it is rule-v0 or another model type."""
+        bundle = self.bundle
+        previous_type = bundle.metadata.get("model_type")
+        if bundle.is_rule or previous_type not in {"xgboost", "logistic_regression"}:
+            return None
+        if model_type is not None and model_type != previous_type:
+            return None
+        model = bundle.model
+        if model is None:
+            # Served from the flat arrays; training needs the estimator itself.
+            model = joblib.load(self.artifact_dir / VERSIONS_DIR / bundle.version / MODEL_FILE)
+        return model, previous_type, bundle.version
 
-        self.model = estimator
-        self.metadata = metadata
+    def _build_estimator(self, model_type: str | None = None) -> tuple[Any, str]:
+        from app.training import build_estimator, default_model_type
 
-        logger.info("trained_model version=%s n_samples=%d", model_version, x.shape[0])
-        return {
-            "model_version": model_version,
-            "metrics": {
-                "auc": auc,
-                "logloss": ll,
-            },
-            "n_samples": int(x.shape[0]),
-        }
-
-    def _build_estimator(self) -> tuple[Any, str]:
-        try:
-            from xgboost import XGBClassifier  # type: ignore
-
-            model = XGBClassifier(
-                n_estimators=80,
-                learning_rate=0.08,
-                max_depth=3,
-                subsample=1.0,
-                colsample_bytree=1.0,
-                random_state=42,
-                eval_metric="logloss",
-            )
-            return model, "xgboost"
-        except Exception:
-            model = LogisticRegression(max_iter=1000, random_state=42)
-            return model, "logistic_regression"
+        model_type = model_type or default_model_type()
+        return build_estimator(model_type), model_type
 
     def _split_dataset(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         n = x.shape[0]
         if n >= 20 and len(np.unique(y)) > 1:
+            from sklearn.model_selection import train_test_split
+
             return train_test_split(x, y, test_size=0.2, random_state=42, stratify=y)
         return x, x, y, y
 
-    def _predict_proba(self, vector: np.ndarray) -> float:
+    def _predict_proba(self, bundle: ModelBundle, vector: np.ndarray) -> float:
+        model = bundle.model
         arr = vector.reshape(1, -1)
-        if hasattr(self.model, "predict_proba"):
-            probs = self.model.predict_proba(arr)
+        if bundle.predictor is not None:
+            return float(bundle.predictor.predict_proba(arr)[0])
+        if hasattr(model, "predict_proba"):
+            probs = model.predict_proba(arr)
             return float(probs[0][1])
-        if hasattr(self.model, "decision_function"):
-            decision = float(self.model.decision_function(arr)[0])
+        if hasattr(model, "decision_function"):
+            decision = float(model.decision_function(arr)[0])
             return 1.0 / (1.0 + np.exp(-decision))
-        pred = float(self.model.predict(arr)[0])
+        pred = float(model.predict(arr)[0])
         return clip(pred, 0.0, 1.0)
 
     def _predict_proba_batch(self, model: Any, x: np.ndarray) -> np.ndarray:
-        if hasattr(model, "predict_proba"):
-            return model.predict_proba(x)[:, 1]
-        if hasattr(model, "decision_function"):
-            decision = model.decision_function(x)
-            return 1.0 / (1.0 + np.exp(-decision))
-        pred = model.predict(x)
-        return np.clip(np.asarray(pred, dtype=float), 0.0, 1.0)
+        from app.training import predict_proba_batch
 
-    def _safe_auc(self, y_true: np.ndarray, y_prob: np.ndarray) -> float | None:
-        if len(np.unique(y_true)) < 2:
-            return None
-        try:
-            return float(roc_auc_score(y_true, y_prob))
-        except Exception:
-            return None
-
-    def _safe_logloss(self, y_true: np.ndarray, y_prob: np.ndarray) -> float | None:
-        try:
-            prob = np.clip(y_prob, 1e-6, 1 - 1e-6)
-            return float(log_loss(y_true, prob, labels=[0, 1]))
-        except Exception:
-            return None
-
-    def _drivers_from_model(self, vector: np.ndarray) -> list[Driver]:
-        means = np.asarray(self.metadata.get("feature_means", [0.0] * len(FEATURE_NAMES_V1)), dtype=float)
-        centered = vector - means
-
-        contributions = None
-        if hasattr(self.model, "coef_"):
-            coefs = np.asarray(self.model.coef_[0], dtype=float)
-            contributions = centered * coefs
-        elif hasattr(self.model, "feature_importances_"):
-            importances = np.asarray(self.model.feature_importances_, dtype=float)
-            contributions = centered * importances
+        return predict_proba_batch(model, x)
 
+    def _drivers_for_vector(self, bundle: ModelBundle, vector: np.ndarray) -> list[Driver]:
+        contributions = self._drivers_from_model(bundle, vector)
         if contributions is None:
             return []
 
@@ -209,3 +591,25 @@ class ModelManager:
 
         drivers.sort(key=lambda d: (-abs(d.contribution), d.name))
         return drivers[:6]
+
+    def _drivers_from_model(self, bundle: ModelBundle, x: np.ndarray) -> np.ndarray | None:
+        """Per-feature contributions for a vector or an (N, 13) matrix, or None if the model has no weights.
+
+        Compiled models use exact attributions (see app.explain); others fall back to weighting
+        centered features by coef_ or feature_importances_.
+        """
+        if bundle.explainer is not None:
+            contributions = self.contribution_cache.contributions(bundle.version, bundle.explainer, np.atleast_2d(x))
+            return contributions if x.ndim == 2 else contributions[0]
+
+        model = bundle.model
+        centered = x - bundle.feature_means
+        if bundle.predictor is not None:
+            return centered * bundle.predictor.driver_weights
+        if hasattr(model, "coef_"):
+            coefs = np.asarray(model.coef_[0], dtype=float)
+            return centered * coefs
+        if hasattr(model, "feature_importances_"):
+            importances = np.asarray(model.feature_importances_, dtype=float)
+            return centered * importances
+        return None
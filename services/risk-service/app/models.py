@@ -22,6 +22,9 @@ FEATURE_NAMES_V1 = [
     "adherence_nudge_7d",
 ]
 
+# Value used for a missing (None) feature, matching FeaturesV1.as_feature_dict.
+FEATURE_FILL_V1 = {name: 0.0 for name in FEATURE_NAMES_V1} | {"adherence_nudge_7d": 0.5}
+
 
 class Driver(BaseModel):
     name: str
@@ -104,6 +107,60 @@ class BatchScoreOutput(BaseModel):
     items: list[ScoreOutput]
 
 
+class ForecastRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    # One FeaturesV1 snapshot per observed day, any order, distinct as_of_date values.
+    history: list[FeaturesV1] = Field(min_length=1, max_length=366)
+    horizon_days: int = Field(default=30, ge=1, le=180)
+
+    @field_validator("history")
+    @classmethod
+    def validate_distinct_dates(cls, value: list[FeaturesV1]) -> list[FeaturesV1]:
+        if len({item.as_of_date for item in value}) != len(value):
+            raise ValueError("history must have one entry per as_of_date")
+        return value
+
+
+class ForecastPoint(BaseModel):
+    as_of_date: str
+    day: int
+    risk: float = Field(ge=0.0, le=1.0)
+    band: Literal["green", "amber", "red"]
+
+
+class ForecastOutput(BaseModel):
+    user_id: str | None = None
+    model_version: str
+    current: ForecastPoint
+    trajectory: list[ForecastPoint]
+    slope_per_day: float
+    confidence: Literal["low", "medium", "high"]
+
+
+class CohortBin(BaseModel):
+    low: float
+    high: float
+    count: int
+
+
+class CohortOutput(BaseModel):
+    model_version: str
+    n_users: int
+    band_shares: dict[str, float]
+    quantiles: dict[str, float]
+    histogram: list[CohortBin]
+
+
+class CohortCompareOutput(BaseModel):
+    model_version: str
+    n_users: int
+    risk: float
+    percentile: float = Field(ge=0.0, le=100.0)
+    # Only for a user_id in the index: share of the population below the user on each feature.
+    feature_percentiles: dict[str, float] = Field(default_factory=dict)
+    band_shares: dict[str, float]
+
+
 class TrainRow(BaseModel):
     model_config = ConfigDict(extra="forbid")
     features: FeaturesV1
@@ -113,6 +170,11 @@ class TrainRow(BaseModel):
 class TrainRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
     rows: list[TrainRow] = Field(min_length=5, max_length=50000)
+    model_type: Literal["xgboost", "logistic_regression"] | None = None
+    search: bool = False
+    cv_folds: int = Field(default=5, ge=2, le=10)
+    # Append rows to the stored training set and warm-start from the active model (app.trainstore).
+    incremental: bool = False
 
 
 class TrainMetrics(BaseModel):
@@ -126,7 +188,35 @@ class TrainOutput(BaseModel):
     n_samples: int
 
 
+class TrainJobOutput(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    stage: str
+    progress: float = Field(ge=0.0, le=1.0)
+    created_at: str
+    started_at: str | None = None
+    finished_at: str | None = None
+    error: str | None = None
+    result: TrainOutput | None = None
+
+
+class ModelsOutput(BaseModel):
+    active: str
+    available: list[str]
+    loaded: list[str] = Field(default_factory=list)
+    registry: dict[str, float] = Field(default_factory=dict)
+    shadow_version: str | None = None
+    shadow: dict[str, float] = Field(default_factory=dict)
+
+
 class HealthOutput(BaseModel):
     ok: bool
+    status: Literal["cold", "warming", "ready"] = "ready"
     model_loaded: bool
     model_version: str
+    explain_stats: dict[str, float] = Field(default_factory=dict)
+    score_cache: dict[str, float] = Field(default_factory=dict)
+    lanes: dict[str, dict[str, float]] = Field(default_factory=dict)
+    startup: dict[str, float] = Field(default_factory=dict)
+    fingerprints: dict[str, float] = Field(default_factory=dict)
+    cohort: dict[str, float] = Field(default_factory=dict)
@@ -0,0 +1,68 @@
+"""Non-active model versions kept loaded for pinned requests and shadow scoring.
+
+Versions are loaded on first use and kept in LRU order until their on-disk size (model.pkl
+plus compiled arrays, a proxy for resident memory) would push the total past the budget.
+The active model is held by ModelManager itself and never counts against the budget.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+Loader = Callable[[str], tuple[Any, int]]
+
+
+class UnknownModelVersion(LookupError):
+    def __init__(self, version: str) -> None:
+        super().__init__(f"Unknown model version: {version}")
+        self.version = version
+
+
+class ModelRegistry:
+    def __init__(self, loader: Loader, budget_bytes: int) -> None:
+        self.loader = loader
+        self.budget_bytes = budget_bytes
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, version: str) -> Any:
+        """The bundle for `version`, loading it (and evicting older ones) if needed."""
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is not None:
+                self._entries.move_to_end(version)
+                return entry[0]
+            # Loading under the lock keeps concurrent first requests from loading twice.
+            bundle, size = self.loader(version)
+            self.loads += 1
+            self._entries[version] = (bundle, size)
+            while len(self._entries) > 1 and self._used() > self.budget_bytes:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return bundle
+
+    def _used(self) -> int:
+        return sum(size for _, size in self._entries.values())
+
+    def loaded(self) -> list[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "loaded": len(self._entries),
+                "used_bytes": self._used(),
+                "budget_bytes": self.budget_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable
 
-from app.models import Driver, FeaturesV1
+import numpy as np
+
+from app.batch import BatchScores
+from app.models import FEATURE_NAMES_V1, Driver, FeaturesV1
 from app.utils import band_for_risk, clip
 
 
@@ -16,25 +18,38 @@ class RuleTerm:
     name: str
     weight: float
     max_signal: float
-    signal_fn: Callable[[dict[str, float]], float]
+    sign: float = 1.0  # -1.0 when low values are the risk
+    offset: float = 0.0  # signal starts above this (sign-adjusted) value
+
+    def signal(self, values: dict[str, float]) -> float:
+        return max(values[self.key] * self.sign - self.offset, 0.0)
 
 
 RULE_TERMS: list[RuleTerm] = [
-    RuleTerm("bp_sys_trend_14d", "Systolic BP trend", 0.18, 12.0, lambda f: max(f["bp_sys_trend_14d"], 0.0)),
-    RuleTerm("bp_sys_var_7d", "Systolic BP variability", 0.10, 20.0, lambda f: max(f["bp_sys_var_7d"], 0.0)),
-    RuleTerm("bp_dia_trend_14d", "Diastolic BP trend", 0.08, 8.0, lambda f: max(f["bp_dia_trend_14d"], 0.0)),
-    RuleTerm("bp_dia_var_7d", "Diastolic BP variability", 0.07, 15.0, lambda f: max(f["bp_dia_var_7d"], 0.0)),
-    RuleTerm("hrv_z_7d", "Low HRV", 0.10, 3.0, lambda f: max(-f["hrv_z_7d"], 0.0)),
-    RuleTerm("rhr_z_7d", "Elevated resting HR", 0.08, 3.0, lambda f: max(f["rhr_z_7d"], 0.0)),
-    RuleTerm("steps_z_7d", "Low activity", 0.10, 3.0, lambda f: max(-f["steps_z_7d"], 0.0)),
-    RuleTerm("sleep_debt_hours_7d", "Sleep debt", 0.12, 14.0, lambda f: max(f["sleep_debt_hours_7d"], 0.0)),
-    RuleTerm("weight_trend_14d", "Weight gain trend", 0.06, 3.0, lambda f: max(f["weight_trend_14d"], 0.0)),
-    RuleTerm("glucose_trend_14d", "Glucose trend", 0.07, 20.0, lambda f: max(f["glucose_trend_14d"], 0.0)),
-    RuleTerm("a1c_latest", "Elevated A1c", 0.03, 3.0, lambda f: max(f["a1c_latest"] - 5.7, 0.0)),
-    RuleTerm("ldl_latest", "Elevated LDL", 0.03, 80.0, lambda f: max(f["ldl_latest"] - 100.0, 0.0)),
-    RuleTerm("adherence_nudge_7d", "Low nudge adherence", 0.08, 0.5, lambda f: max(0.5 - f["adherence_nudge_7d"], 0.0)),
+    RuleTerm("bp_sys_trend_14d", "Systolic BP trend", 0.18, 12.0),
+    RuleTerm("bp_sys_var_7d", "Systolic BP variability", 0.10, 20.0),
+    RuleTerm("bp_dia_trend_14d", "Diastolic BP trend", 0.08, 8.0),
+    RuleTerm("bp_dia_var_7d", "Diastolic BP variability", 0.07, 15.0),
+    RuleTerm("hrv_z_7d", "Low HRV", 0.10, 3.0, sign=-1.0),
+    RuleTerm("rhr_z_7d", "Elevated resting HR", 0.08, 3.0),
+    RuleTerm("steps_z_7d", "Low activity", 0.10, 3.0, sign=-1.0),
+    RuleTerm("sleep_debt_hours_7d", "Sleep debt", 0.12, 14.0),
+    RuleTerm("weight_trend_14d", "Weight gain trend", 0.06, 3.0),
+    RuleTerm("glucose_trend_14d", "Glucose trend", 0.07, 20.0),
+    RuleTerm("a1c_latest", "Elevated A1c", 0.03, 3.0, offset=5.7),
+    RuleTerm("ldl_latest", "Elevated LDL", 0.03, 80.0, offset=100.0),
+    RuleTerm("adherence_nudge_7d", "Low nudge adherence", 0.08, 0.5, sign=-1.0, offset=-0.5),
 ]
 
+# Vectorized form of RULE_TERMS: signal = max(sign * value - offset, 0), column-aligned with RULE_TERMS.
+RULE_COLUMNS = np.array([FEATURE_NAMES_V1.index(term.key) for term in RULE_TERMS])
+RULE_SIGNS = np.array([term.sign for term in RULE_TERMS])
+RULE_OFFSETS = np.array([term.offset for term in RULE_TERMS])
+RULE_WEIGHTS = np.array([term.weight for term in RULE_TERMS])
+RULE_MAX_SIGNALS = np.array([term.max_signal for term in RULE_TERMS])
+RULE_NAMES = tuple(term.name for term in RULE_TERMS)
+RULE_BASELINE = Driver(name="Baseline", value=0.05, direction="down", contribution=0.0)
+
 
 def score_rule_v0(features: FeaturesV1) -> tuple[float, str, list[Driver], str]:
     vals = features.as_feature_dict()
@@ -42,7 +57,7 @@ def score_rule_v0(features: FeaturesV1) -> tuple[float, str, list[Driver], str]:
     drivers: list[Driver] = []
 
     for term in RULE_TERMS:
-        raw_signal = term.signal_fn(vals)
+        raw_signal = term.signal(vals)
         normalized = clip(raw_signal / term.max_signal, 0.0, 1.0)
         contribution = term.weight * normalized
         risk += contribution
@@ -63,7 +78,28 @@ def score_rule_v0(features: FeaturesV1) -> tuple[float, str, list[Driver], str]:
     band = band_for_risk(risk)
 
     if not drivers:
-        drivers = [Driver(name="Baseline", value=0.05, direction="down", contribution=0.0)]
+        drivers = [RULE_BASELINE.model_copy()]
 
     drivers = sorted(drivers, key=lambda d: (-abs(d.contribution), d.name))[:6]
     return round(risk, 6), band, drivers, RULE_MODEL_VERSION
+
+
+def score_rule_v0_batch(x: np.ndarray) -> BatchScores:
+    values = x[:, RULE_COLUMNS]
+    signals = np.maximum(values * RULE_SIGNS - RULE_OFFSETS, 0.0)
+    contributions = RULE_WEIGHTS * np.clip(signals / RULE_MAX_SIGNALS, 0.0, 1.0)
+
+    # Accumulate term by term so the floating-point result matches score_rule_v0 exactly.
+    risk = np.full(values.shape[0], 0.05)
+    for col in range(contributions.shape[1]):
+        risk += contributions[:, col]
+
+    return BatchScores(
+        values=values,
+        risk=np.clip(risk, 0.0, 1.0),
+        contributions=contributions,
+        driver_mask=contributions >= 0.01,
+        driver_names=RULE_NAMES,
+        baseline=RULE_BASELINE,
+        model_version=RULE_MODEL_VERSION,
+    )
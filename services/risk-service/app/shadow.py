@@ -0,0 +1,94 @@
+"""Shadow scoring: re-score live traffic with a challenger version and record how it differs.
+
+After the champion's result is computed, a sampled copy of the feature matrix is handed to
+a dedicated lane and scored with RISK_SHADOW_VERSION. Nothing waits on it: when the shadow
+lane is full the sample is dropped (and counted), so the challenger can never add latency
+or 503s to the request it shadows.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from concurrent.futures import Future
+from typing import Sequence
+
+import numpy as np
+
+from app.concurrency import Lane, LaneOverloaded
+from app.metrics import SHADOW_BAND_CHANGES, SHADOW_DIFF
+from app.ml import ModelManager
+from app.registry import UnknownModelVersion
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowScorer:
+    def __init__(self, manager: ModelManager, lane: Lane, version: str | None, sample_rate: float = 1.0) -> None:
+        self.manager = manager
+        self.lane = lane
+        self.version = version or None
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.band_changes = 0
+        self.diff_sum = 0.0
+        self.max_diff = 0.0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.version is not None and self.sample_rate > 0
+
+    def observe(
+        self, x: np.ndarray, champion: Sequence[tuple[float, str]], champion_version: str
+    ) -> Future[None] | None:
+        """Queue `x` for challenger scoring; `champion` holds the (risk, band) already returned."""
+        if not self.enabled or champion_version == self.version or not len(champion):
+            return None
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        try:
+            # Copy: x may be a view of the request body, which is released once the response is sent.
+            return self.lane.submit(self._compare, np.array(x, dtype=float), list(champion))
+        except LaneOverloaded:
+            with self._lock:
+                self.dropped += 1
+            return None
+
+    def _compare(self, x: np.ndarray, champion: list[tuple[float, str]]) -> None:
+        try:
+            scores = self.manager.score_matrix(x, self.version)
+        except UnknownModelVersion:
+            with self._lock:
+                self.errors += 1
+            logger.warning("shadow_version_missing version=%s", self.version)
+            return
+        challenger_risk = np.round(np.asarray(scores.risk, dtype=float), 6)
+        diffs = np.abs(challenger_risk - np.fromiter((risk for risk, _ in champion), dtype=float, count=len(champion)))
+        changed = 0
+        for diff, (_, band), challenger_band in zip(diffs.tolist(), champion, scores.bands()):
+            SHADOW_DIFF.observe(diff, self.version)
+            if band != challenger_band:
+                changed += 1
+                SHADOW_BAND_CHANGES.inc(1.0, band, challenger_band)
+        with self._lock:
+            self.rows += len(champion)
+            self.band_changes += changed
+            self.diff_sum += float(diffs.sum())
+            self.max_diff = max(self.max_diff, float(diffs.max()))
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "sample_rate": self.sample_rate if self.enabled else 0.0,
+                "rows": self.rows,
+                "band_changes": self.band_changes,
+                "mean_abs_diff": round(self.diff_sum / self.rows, 6) if self.rows else 0.0,
+                "max_abs_diff": round(self.max_diff, 6),
+                "dropped": self.dropped,
+                "errors": self.errors,
+            }
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator, Awaitable, Callable
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.concurrency import LaneOverloaded, LaneTimeout
+from app.ml import ModelManager
+from app.models import FeaturesV1, ScoreOutput
+
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes | None]]:
+    """Split a byte stream into numbered lines; oversized lines are yielded as None instead of buffered."""
+    buffer = b""
+    line_no = 0
+    overflow = False
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            line_no += 1
+            if overflow:
+                overflow = False
+                yield line_no, None
+            elif line.strip():
+                yield line_no, line
+        if len(buffer) > MAX_LINE_BYTES:
+            overflow = True
+            buffer = b""
+    if overflow:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, buffer
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse whose generator reads the request body itself.
+
+    Starlette's disconnect listener would race the generator for receive() messages and drop body
+    chunks; a disconnect still surfaces here as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+def _error_line(line_no: int, error: str) -> bytes:
+    return json.dumps({"line": line_no, "error": error}).encode() + b"\n"
+
+
+def score_lines(manager: ModelManager, lines: list[tuple[int, bytes | None]], version: str | None = None) -> bytes:
+    parsed: list[tuple[int, FeaturesV1 | str]] = []
+    for line_no, raw in lines:
+        if raw is None:
+            parsed.append((line_no, f"line exceeds {MAX_LINE_BYTES} bytes"))
+            continue
+        try:
+            parsed.append((line_no, FeaturesV1.model_validate_json(raw)))
+        except ValidationError as exc:
+            parsed.append((line_no, "; ".join(f"{'.'.join(map(str, e['loc'])) or 'body'}: {e['msg']}" for e in exc.errors())))
+
+    valid = [item for _, item in parsed if isinstance(item, FeaturesV1)]
+    scored = iter(manager.score_batch(valid, version) if valid else [])
+
+    out = bytearray()
+    for line_no, item in parsed:
+        if isinstance(item, str):
+            out += _error_line(line_no, item)
+            continue
+        risk, band, drivers, model_version = next(scored)
+        out += ScoreOutput(
+            risk=risk,
+            band=band,
+            drivers=drivers,
+            model_version=model_version,
+            as_of_date=item.as_of_date,
+        ).model_dump_json().encode()
+        out += b"\n"
+    return bytes(out)
+
+
+Runner = Callable[..., Awaitable[bytes]]
+
+
+async def _score_chunk(
+    run: Runner, manager: ModelManager, lines: list[tuple[int, bytes | None]], version: str | None
+) -> bytes:
+    try:
+        return await run(score_lines, manager, lines, version)
+    except (LaneOverloaded, LaneTimeout) as exc:
+        # The response has already started, so report the chunk per line and keep going.
+        return b"".join(_error_line(line_no, str(exc)) for line_no, _ in lines)
+
+
+async def score_ndjson(
+    manager: ModelManager,
+    chunks: AsyncIterator[bytes],
+    batch_size: int,
+    run: Runner = run_in_threadpool,
+    version: str | None = None,
+) -> AsyncIterator[bytes]:
+    pending: list[tuple[int, bytes | None]] = []
+    async for line in iter_ndjson_lines(chunks):
+        pending.append(line)
+        if len(pending) >= batch_size:
+            yield await _score_chunk(run, manager, pending, version)
+            pending = []
+    if pending:
+        yield await _score_chunk(run, manager, pending, version)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import log_loss, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from app.utils import get_env_int
+
+
+logger = logging.getLogger(__name__)
+
+PARAM_GRIDS: dict[str, dict[str, list[Any]]] = {
+    "xgboost": {"max_depth": [2, 3, 4], "learning_rate": [0.05, 0.1]},
+    "logistic_regression": {"C": [0.1, 1.0, 10.0]},
+}
+
+
+def default_model_type() -> str:
+    try:
+        import xgboost  # type: ignore  # noqa: F401
+
+        return "xgboost"
+    except Exception:
+        return "logistic_regression"
+
+
+def build_estimator(model_type: str, params: dict[str, Any] | None = None) -> Any:
+    params = params or {}
+    if model_type == "xgboost":
+        from xgboost import XGBClassifier  # type: ignore
+
+        config = {
+            "n_estimators": 80,
+            "learning_rate": 0.08,
+            "max_depth": 3,
+            "subsample": 1.0,
+            "colsample_bytree": 1.0,
+            "random_state": 42,
+            "eval_metric": "logloss",
+        }
+        return XGBClassifier(**(config | params))
+    return LogisticRegression(**({"max_iter": 1000, "random_state": 42} | params))
+
+
+def warm_start_estimator(model_type: str, previous: Any) -> tuple[Any, dict[str, Any]] | None:
+    """An estimator initialised from `previous` (same model type) plus extra fit() kwargs.
+
+    Logistic regression starts its solver at the previous coefficients; xgboost keeps the
+    previous trees and boosts RISK_INCREMENTAL_ROUNDS more on top of them. Returns None once
+    that would exceed RISK_INCREMENTAL_MAX_TREES trees, so the caller refits from scratch and
+    the tree count (scoring latency, artifact size) stays bounded.
+    """
+    if model_type == "xgboost":
+        rounds = get_env_int("RISK_INCREMENTAL_ROUNDS", 20)
+        booster = previous.get_booster()
+        if booster.num_boosted_rounds() + rounds > get_env_int("RISK_INCREMENTAL_MAX_TREES", 160):
+            return None
+        return build_estimator(model_type, {"n_estimators": rounds}), {"xgb_model": booster}
+    estimator = build_estimator(model_type, {"warm_start": True})
+    estimator.coef_ = np.array(previous.coef_, copy=True)
+    estimator.intercept_ = np.array(previous.intercept_, copy=True)
+    return estimator, {}
+
+
+def predict_proba_batch(model: Any, x: np.ndarray) -> np.ndarray:
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(x)[:, 1]
+    if hasattr(model, "decision_function"):
+        decision = model.decision_function(x)
+        return 1.0 / (1.0 + np.exp(-decision))
+    pred = model.predict(x)
+    return np.clip(np.asarray(pred, dtype=float), 0.0, 1.0)
+
+
+def safe_auc(y_true: np.ndarray, y_prob: np.ndarray) -> float | None:
+    if len(np.unique(y_true)) < 2:
+        return None
+    try:
+        return float(roc_auc_score(y_true, y_prob))
+    except Exception:
+        return None
+
+
+def safe_logloss(y_true: np.ndarray, y_prob: np.ndarray) -> float | None:
+    try:
+        prob = np.clip(y_prob, 1e-6, 1 - 1e-6)
+        return float(log_loss(y_true, prob, labels=[0, 1]))
+    except Exception:
+        return None
+
+
+def param_grid(model_type: str) -> list[dict[str, Any]]:
+    grid = PARAM_GRIDS[model_type]
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _fit_fold(
+    model_type: str,
+    params: dict[str, Any],
+    x: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    eval_idx: np.ndarray,
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    # One thread per fold: the process pool already uses every core.
+    estimator = build_estimator(model_type, params | ({"n_jobs": 1} if model_type == "xgboost" else {}))
+    estimator.fit(x[train_idx], y[train_idx])
+    probs = predict_proba_batch(estimator, x[eval_idx])
+    return {
+        "auc": safe_auc(y[eval_idx], probs),
+        "logloss": safe_logloss(y[eval_idx], probs),
+        "fit_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def _mean(values: list[float | None]) -> float | None:
+    present = [v for v in values if v is not None]
+    return float(np.mean(present)) if present else None
+
+
+def cross_validated_search(
+    x: np.ndarray,
+    y: np.ndarray,
+    folds: int,
+    model_type: str | None = None,
+    workers: int | None = None,
+) -> tuple[Any, str, dict[str, Any]]:
+    """Run k-fold CV over PARAM_GRIDS in a process pool, refit the lowest-logloss config on all rows.
+
+    Returns the fitted estimator, its model type and a report for metadata.json.
+    """
+    model_type = model_type or default_model_type()
+    class_counts = np.bincount(y, minlength=2)
+    folds = int(min(folds, class_counts.min()))
+    if folds < 2:
+        raise ValueError("Cross-validation needs at least two rows of each class")
+
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(x, y))
+    candidates = param_grid(model_type)
+    tasks = [(params, train_idx, eval_idx) for params in candidates for train_idx, eval_idx in splits]
+    workers = workers or get_env_int("RISK_TRAIN_WORKERS", os.cpu_count() or 1)
+
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [pool.submit(_fit_fold, model_type, params, x, y, tr, ev) for params, tr, ev in tasks]
+            results = [f.result() for f in futures]
+    else:
+        results = [_fit_fold(model_type, params, x, y, tr, ev) for params, tr, ev in tasks]
+    search_seconds = time.perf_counter() - started
+
+    report_candidates = []
+    for idx, params in enumerate(candidates):
+        fold_results = results[idx * folds : (idx + 1) * folds]
+        report_candidates.append(
+            {
+                "params": params,
+                "fold_auc": [r["auc"] for r in fold_results],
+                "fold_logloss": [r["logloss"] for r in fold_results],
+                "mean_auc": _mean([r["auc"] for r in fold_results]),
+                "mean_logloss": _mean([r["logloss"] for r in fold_results]),
+                "fit_seconds": round(sum(r["fit_seconds"] for r in fold_results), 4),
+            }
+        )
+
+    best = min(
+        report_candidates,
+        key=lambda c: c["mean_logloss"] if c["mean_logloss"] is not None else float("inf"),
+    )
+
+    refit_started = time.perf_counter()
+    estimator = build_estimator(model_type, best["params"])
+    estimator.fit(x, y)
+    refit_seconds = time.perf_counter() - refit_started
+
+    logger.info(
+        "cv_search model_type=%s folds=%d candidates=%d workers=%d seconds=%.3f best=%s",
+        model_type,
+        folds,
+        len(candidates),
+        workers,
+        search_seconds,
+        best["params"],
+    )
+    report = {
+        "folds": folds,
+        "workers": workers,
+        "best_params": best["params"],
+        "candidates": report_candidates,
+        "timings": {
+            "search_seconds": round(search_seconds, 4),
+            "refit_seconds": round(refit_seconds, 4),
+        },
+    }
+    return estimator, model_type, report
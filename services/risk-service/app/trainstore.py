@@ -0,0 +1,87 @@
+"""Accumulated labeled rows for incremental training, stored column-major next to the artifacts.
+
+    artifacts/training/
+      seg-<ns>-<id>/x.npy     float32 (n, 13), Fortran order: one contiguous run per feature
+      seg-<ns>-<id>/y.npy     float32 (n,) raw labels
+
+Each upload becomes one immutable segment, staged under a temporary name and renamed into
+place, so readers (including other workers) never see a partial segment. Segments are read
+through memory maps and copied once into a preallocated matrix. Segments are written
+column by column, so storing a large matrix needs no column-major copy of it in memory.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from app.models import FEATURE_NAMES_V1
+
+
+STORE_DIR = "training"
+X_FILE = "x.npy"
+Y_FILE = "y.npy"
+
+
+class TrainingStore:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def segments(self) -> list[Path]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p for p in self.root.iterdir() if p.name.startswith("seg-") and (p / Y_FILE).exists())
+
+    def _open(self, segment: Path) -> tuple[np.ndarray, np.ndarray]:
+        return np.load(segment / X_FILE, mmap_mode="r"), np.load(segment / Y_FILE, mmap_mode="r")
+
+    def n_rows(self) -> int:
+        return sum(self._open(segment)[1].shape[0] for segment in self.segments())
+
+    def append(self, x: np.ndarray, y: np.ndarray) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".staging-{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            out = np.lib.format.open_memmap(
+                staging / X_FILE, mode="w+", dtype=np.float32, shape=x.shape, fortran_order=True
+            )
+            for col in range(x.shape[1]):
+                out[:, col] = x[:, col]
+            out.flush()
+            del out
+            # y last: segments() only lists directories that have it.
+            np.save(staging / Y_FILE, np.asarray(y, dtype=np.float32), allow_pickle=False)
+            segment = self.root / f"seg-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+            os.rename(staging, segment)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+        return segment
+
+    def replace(self, *parts: tuple[np.ndarray, np.ndarray]) -> None:
+        """Make the (x, y) parts the whole store, as after a full retrain."""
+        previous = self.segments()
+        for x, y in parts:
+            if len(y):
+                self.append(x, y)
+        for segment in previous:
+            shutil.rmtree(segment, ignore_errors=True)
+
+    def load(self, extra_rows: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """All stored rows as float32 (x, y), with `extra_rows` uninitialised rows left at the end."""
+        parts = [self._open(segment) for segment in self.segments()]
+        total = sum(y.shape[0] for _, y in parts) + extra_rows
+        x_out = np.empty((total, len(FEATURE_NAMES_V1)), dtype=np.float32)
+        y_out = np.empty(total, dtype=np.float32)
+        offset = 0
+        for x, y in parts:
+            x_out[offset : offset + y.shape[0]] = x
+            y_out[offset : offset + y.shape[0]] = y
+            offset += y.shape[0]
+        return x_out, y_out
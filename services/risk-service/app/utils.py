@@ -6,6 +6,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 SERVICE_DIR = Path(__file__).resolve().parent.parent
 DEFAULT_ARTIFACT_DIR = SERVICE_DIR / "artifacts"
@@ -18,6 +20,26 @@ def get_artifact_dir() -> Path:
     return DEFAULT_ARTIFACT_DIR
 
 
+def get_env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def get_env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
 def clip(value: float, low: float, high: float) -> float:
     return max(low, min(high, value))
 
@@ -30,6 +52,11 @@ def band_for_risk(risk: float) -> str:
     return "red"
 
 
+def bands_for_risk(risk: np.ndarray) -> list[str]:
+    bands = np.where(risk < 0.33, "green", np.where(risk < 0.66, "amber", "red"))
+    return bands.tolist()
+
+
 def now_iso8601() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -0,0 +1,589 @@
+"""FeaturesV1 computed from raw timestamped vitals, mirroring computeFeaturesV1.ts in apps/web.
+
+Readings are one row each: user_id, ts (UTC), kind and value. Two ways to turn them into a
+feature matrix for the batch scorer:
+
+- compute_features: every (user, as_of_date) at once. Readings are sorted by (user, day) per
+  signal and prefix-summed, so each window sum is two searchsorted lookups and a subtraction.
+  All windows, users and dates come out of one pass over the readings.
+- RollingFeatures: running window sums per user. A new day's readings are added to the
+  windows and the day that falls out of each window is subtracted, so a day costs the same
+  however long the windows are. Per-day sums are kept in a float32 ring per signal (about
+  2.5 KB per user) for the subtraction. Late readings within the ring are folded in too.
+
+Windows end at the end of as_of_date, as in the TypeScript engine: trends use the last 14 days,
+variances, z-score recent means, sleep debt and adherence the last 7, z-score baselines
+days -30..-7, and labs the latest value of the last 181 days. Days are UTC days.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from app.bulk_score import Chunk, iter_chunks
+from app.models import FEATURE_FILL_V1, FEATURE_NAMES_V1, FeaturesV1
+
+
+DAY_SECONDS = 86_400.0
+LAB_DAYS = 180
+SLEEP_TARGET_HOURS = 7.5
+Z_MIN_STD = 0.25
+MMOL_TO_MGDL = 18.0182
+
+# Inclusive day offsets before as_of_date: (first, last).
+WINDOWS = {"trend": (13, 0), "recent": (6, 0), "baseline": (30, 7)}
+
+# signal -> (windows it is summed over, per-day stats kept). "t" stats are in days; sleep keeps
+# one value per day (the longest sleep, capped at the target) and a nudge is 1 if done, else 0.
+SIGNALS: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "bp_sys": (("trend", "recent"), ("n", "t", "v", "tt", "tv", "vv")),
+    "bp_dia": (("trend", "recent"), ("n", "t", "v", "tt", "tv", "vv")),
+    "weight": (("trend",), ("n", "t", "v", "tt", "tv")),
+    "glucose": (("trend",), ("n", "t", "v", "tt", "tv")),
+    "hrv": (("recent", "baseline"), ("n", "v", "vv")),
+    "hr": (("recent", "baseline"), ("n", "v", "vv")),
+    "steps": (("recent", "baseline"), ("n", "v", "vv")),
+    "sleep": (("recent",), ("n", "v")),
+    "nudge": (("recent",), ("n", "v")),
+}
+LABS = ("a1c", "ldl")
+KINDS = (*SIGNALS, *LABS)
+
+# Values are centered before summing so squared sums stay small; every feature is shift-invariant.
+# compute_features (float64) uses these; RollingFeatures (float32 ring) centers on each user's first value.
+CENTER = {"bp_sys": 120.0, "bp_dia": 80.0, "weight": 80.0, "glucose": 100.0, "hrv": 50.0, "hr": 65.0, "steps": 7000.0}
+
+CLAMPS = {
+    "bp_sys_trend_14d": (-5.0, 5.0),
+    "bp_dia_trend_14d": (-5.0, 5.0),
+    "bp_sys_var_7d": (0.0, 40.0),
+    "bp_dia_var_7d": (0.0, 40.0),
+    "hrv_z_7d": (-4.0, 4.0),
+    "rhr_z_7d": (-4.0, 4.0),
+    "steps_z_7d": (-4.0, 4.0),
+    "sleep_debt_hours_7d": (0.0, 4.0),
+    "weight_trend_14d": (-2.0, 2.0),
+    "glucose_trend_14d": (-20.0, 20.0),
+    "adherence_nudge_7d": (0.0, 1.0),
+}
+FILL_VECTOR = np.array([FEATURE_FILL_V1[name] for name in FEATURE_NAMES_V1], dtype=float)
+
+Sums = dict[tuple[str, str], np.ndarray]
+
+
+def _ring_days(signal: str) -> int:
+    return max(WINDOWS[window][0] for window in SIGNALS[signal][0]) + 1
+
+
+def _to_seconds(values: Sequence[Any] | np.ndarray) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.dtype.kind == "M":
+        return arr.astype("datetime64[ms]").astype(np.int64) / 1000.0
+    if arr.dtype.kind in "iuf":
+        return arr.astype(float)
+    out = np.empty(len(arr), dtype=float)
+    for idx, value in enumerate(arr.tolist()):
+        if isinstance(value, datetime):
+            parsed = value
+        elif isinstance(value, date):
+            parsed = datetime(value.year, value.month, value.day)
+        else:
+            parsed = datetime.fromisoformat(str(value))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        out[idx] = parsed.timestamp()
+    return out
+
+
+def _day_number(as_of_date: str) -> int:
+    return (date.fromisoformat(as_of_date) - date(1970, 1, 1)).days
+
+
+def _day_string(day: int) -> str:
+    return (date(1970, 1, 1) + timedelta(days=day)).isoformat()
+
+
+def _factorize(values: Iterable[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """(sorted unique strings, code per value); a dict pass is several times faster than np.unique on strings."""
+    codes: dict[str, int] = {}
+    raw = np.fromiter((codes.setdefault(str(value), len(codes)) for value in values), dtype=np.int64)
+    uniques = np.array(list(codes), dtype=object)
+    order = np.argsort(uniques.astype(str)) if len(uniques) else np.empty(0, dtype=np.int64)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return uniques[order], rank[raw]
+
+
+@dataclass(frozen=True)
+class Readings:
+    """Columns of readings, with user ids and kinds stored as integer codes."""
+
+    users: np.ndarray  # sorted unique user ids (str)
+    user: np.ndarray  # index into users, per reading
+    ts: np.ndarray  # float seconds since the Unix epoch, UTC
+    kind: np.ndarray  # index into KINDS, per reading
+    value: np.ndarray
+
+    @classmethod
+    def from_columns(
+        cls, user_id: Sequence[Any], ts: Sequence[Any] | np.ndarray, kind: Sequence[Any], value: Sequence[Any] | np.ndarray
+    ) -> Readings:
+        """Timestamps may be datetime64, epoch seconds, datetimes or ISO strings (naive = UTC).
+
+        Rows with an unknown kind or a non-finite value are dropped.
+        """
+        users, user_codes = _factorize(user_id)
+        kind_names, kind_codes = _factorize(kind)
+        known = np.array([KINDS.index(name) if name in KINDS else -1 for name in kind_names.tolist()], dtype=np.int8)
+        kind_arr = known[kind_codes] if len(known) else np.empty(0, dtype=np.int8)
+        value_arr = np.asarray(value, dtype=float)
+        ts_arr = _to_seconds(ts)
+        keep = (kind_arr >= 0) & np.isfinite(value_arr) & np.isfinite(ts_arr)
+        return cls(users=users, user=user_codes[keep], ts=ts_arr[keep], kind=kind_arr[keep], value=value_arr[keep])
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @property
+    def days(self) -> np.ndarray:
+        return np.floor(self.ts / DAY_SECONDS).astype(np.int64)
+
+    def of_kind(self, kind: str) -> np.ndarray:
+        return self.kind == KINDS.index(kind)
+
+    def select(self, mask: np.ndarray) -> Readings:
+        return Readings(users=self.users, user=self.user[mask], ts=self.ts[mask], kind=self.kind[mask], value=self.value[mask])
+
+
+def _number(value: Any) -> float | None:
+    try:
+        out = float(value)
+    except (TypeError, ValueError):
+        return None
+    return out if math.isfinite(out) else None
+
+
+def _first_number(payload: dict[str, Any], *keys: str) -> float | None:
+    for key in keys:
+        value = _number(payload.get(key))
+        if value is not None:
+            return value
+    return None
+
+
+def _measurement_values(kind: str, payload: dict[str, Any]) -> list[tuple[str, float | None]]:
+    if kind == "bp":
+        return [("bp_sys", _number(payload.get("systolic"))), ("bp_dia", _number(payload.get("diastolic")))]
+    if kind == "weight":
+        return [("weight", _number(payload.get("kg")))]
+    if kind == "hrv":
+        return [("hrv", _first_number(payload, "rmssd", "ms"))]
+    if kind == "hr":
+        return [("hr", _number(payload.get("bpm")))]
+    if kind == "steps":
+        return [("steps", _number(payload.get("count")))]
+    if kind == "sleep":
+        hours, minutes = _number(payload.get("hours")), _number(payload.get("minutes"))
+        return [("sleep", hours if hours is not None else minutes / 60 if minutes is not None else None)]
+    if kind == "glucose":
+        mgdl, mmol = _number(payload.get("mgdl")), _number(payload.get("mmol"))
+        return [("glucose", mgdl if mgdl is not None else mmol * MMOL_TO_MGDL if mmol is not None else None)]
+    if kind == "a1c":
+        return [("a1c", _first_number(payload, "value", "percent"))]
+    if kind == "lipid":
+        return [("ldl", _number(payload.get("ldl")))]
+    if kind == "nudge":
+        return [("nudge", 1.0 if payload.get("status") in ("done", "completed") else 0.0)]
+    return []
+
+
+def readings_from_measurements(records: Iterable[dict[str, Any]]) -> Readings:
+    """Measurement documents (user_id/userId, measuredAt/ts, type, payload), read as in computeFeaturesV1.ts.
+
+    Nudges are records of type "nudge" with payload {"status": ...}; done/completed count as done.
+    """
+    user_ids: list[str] = []
+    stamps: list[Any] = []
+    kinds: list[str] = []
+    values: list[float] = []
+    for record in records:
+        payload = record.get("payload")
+        stamp = record.get("measuredAt") or record.get("ts")
+        user_id = record.get("user_id") or record.get("userId")
+        if not isinstance(payload, dict) or stamp is None or user_id is None:
+            continue
+        for kind, value in _measurement_values(str(record.get("type")), payload):
+            if value is not None:
+                user_ids.append(str(user_id))
+                stamps.append(stamp)
+                kinds.append(kind)
+                values.append(value)
+    return Readings.from_columns(user_ids, stamps, kinds, values)
+
+
+def load_readings(path: Path, chunk_size: int = 100_000) -> Readings:
+    """A CSV/Parquet file with user_id, ts, kind and value columns."""
+    columns: dict[str, list[Any]] = {"user_id": [], "ts": [], "kind": [], "value": []}
+    for chunk in iter_chunks(path, chunk_size):
+        for name, values in columns.items():
+            if name not in chunk:
+                raise SystemExit(f"{path} is missing the {name!r} column")
+            values.extend(chunk[name])
+    value = np.array([_number(v) for v in columns["value"]], dtype=float)
+    return Readings.from_columns(columns["user_id"], columns["ts"], columns["kind"], value)
+
+
+def _reading_stats(signal: str, t: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Per-reading contributions for `signal`'s stats; `t` is in days from any fixed origin, `v` centered."""
+    parts = {"n": np.ones_like(v), "t": t, "v": v, "tt": t * t, "tv": t * v, "vv": v * v}
+    return np.column_stack([parts[stat] for stat in SIGNALS[signal][1]])
+
+
+def _sleep_relief(hours: np.ndarray) -> np.ndarray:
+    return np.minimum(np.maximum(hours, 0.0), SLEEP_TARGET_HOURS)
+
+
+def _stat(sums: Sums, window: str, signal: str, stat: str) -> np.ndarray:
+    return sums[(window, signal)][:, SIGNALS[signal][1].index(stat)]
+
+
+def _slope(sums: Sums, signal: str) -> np.ndarray:
+    n, t, v, tt, tv = (_stat(sums, "trend", signal, stat) for stat in ("n", "t", "v", "tt", "tv"))
+    safe_n = np.maximum(n, 1.0)
+    den = tt - t * t / safe_n
+    num = tv - t * v / safe_n
+    fitted = (n >= 3) & (den > 1e-9)
+    return np.where(fitted, num / np.where(fitted, den, 1.0), 0.0)
+
+
+def _std(n: np.ndarray, v: np.ndarray, vv: np.ndarray) -> np.ndarray:
+    safe_n = np.maximum(n, 1.0)
+    var = np.maximum(vv / safe_n - (v / safe_n) ** 2, 0.0)
+    return np.where(n >= 2, np.sqrt(var), 0.0)
+
+
+def _zscore(sums: Sums, signal: str) -> np.ndarray:
+    n_r, v_r = _stat(sums, "recent", signal, "n"), _stat(sums, "recent", signal, "v")
+    n_b, v_b, vv_b = (_stat(sums, "baseline", signal, stat) for stat in ("n", "v", "vv"))
+    std_b = np.maximum(_std(n_b, v_b, vv_b), Z_MIN_STD)
+    ok = (n_r >= 1) & (n_b >= 3)
+    return np.where(ok, (v_r / np.maximum(n_r, 1.0) - v_b / np.maximum(n_b, 1.0)) / std_b, 0.0)
+
+
+def features_from_sums(sums: Sums, labs: dict[str, np.ndarray]) -> np.ndarray:
+    """(n, 13) FeaturesV1 matrix from window sums; labs are NaN where there is no recent value."""
+    recent_sleep = _stat(sums, "recent", "sleep", "v")
+    n_nudges, done = _stat(sums, "recent", "nudge", "n"), _stat(sums, "recent", "nudge", "v")
+    window_days = WINDOWS["recent"][0] + 1
+    columns = {
+        "bp_sys_trend_14d": _slope(sums, "bp_sys"),
+        "bp_sys_var_7d": _std(*(_stat(sums, "recent", "bp_sys", stat) for stat in ("n", "v", "vv"))),
+        "bp_dia_trend_14d": _slope(sums, "bp_dia"),
+        "bp_dia_var_7d": _std(*(_stat(sums, "recent", "bp_dia", stat) for stat in ("n", "v", "vv"))),
+        "hrv_z_7d": _zscore(sums, "hrv"),
+        "rhr_z_7d": _zscore(sums, "hr"),
+        "steps_z_7d": _zscore(sums, "steps"),
+        "sleep_debt_hours_7d": (window_days * SLEEP_TARGET_HOURS - recent_sleep) / window_days,
+        "weight_trend_14d": _slope(sums, "weight"),
+        "glucose_trend_14d": _slope(sums, "glucose"),
+        "a1c_latest": labs["a1c"],
+        "ldl_latest": labs["ldl"],
+        "adherence_nudge_7d": np.where(n_nudges > 0, done / np.maximum(n_nudges, 1.0), 0.5),
+    }
+    for name, (low, high) in CLAMPS.items():
+        columns[name] = np.clip(columns[name], low, high)
+    return np.column_stack([columns[name] for name in FEATURE_NAMES_V1])
+
+
+@dataclass(frozen=True)
+class FeatureFrame:
+    user_ids: list[str]
+    as_of_dates: list[str]
+    x: np.ndarray  # (n, 13); NaN where a lab has no value in the last 181 days
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def matrix(self) -> np.ndarray:
+        """x with FeaturesV1 fills for missing values, ready for score_rows / score_users / score_matrix."""
+        return np.where(np.isnan(self.x), FILL_VECTOR, self.x)
+
+    def items(self) -> list[FeaturesV1]:
+        rows = np.where(np.isnan(self.x), None, np.round(self.x, 6).astype(object)).tolist()
+        return [
+            FeaturesV1(user_id=user_id, as_of_date=as_of_date, **dict(zip(FEATURE_NAMES_V1, row)))
+            for user_id, as_of_date, row in zip(self.user_ids, self.as_of_dates, rows)
+        ]
+
+    def chunks(self, chunk_size: int) -> Iterator[Chunk]:
+        """Column chunks in the app.bulk_score layout, e.g. for app.daily_job."""
+        values = np.where(np.isnan(self.x), None, self.x.astype(object))
+        for start in range(0, len(self), chunk_size):
+            stop = start + chunk_size
+            chunk: Chunk = {"user_id": self.user_ids[start:stop], "as_of_date": self.as_of_dates[start:stop]}
+            for col, name in enumerate(FEATURE_NAMES_V1):
+                chunk[name] = values[start:stop, col].tolist()
+            yield chunk
+
+
+def compute_features(
+    readings: Readings, as_of_dates: str | Sequence[str], user_ids: Sequence[str] | None = None
+) -> FeatureFrame:
+    """Features for every user (default: every user with a reading) on every date, user-major."""
+    dates = [as_of_dates] if isinstance(as_of_dates, str) else list(as_of_dates)
+    query_days = np.array([_day_number(value) for value in dates], dtype=np.int64)
+    if user_ids is None:
+        users = readings.users[np.unique(readings.user)].tolist()
+    else:
+        users = [str(user_id) for user_id in user_ids]
+    n_users, n_dates = len(users), len(dates)
+    if not n_users or not n_dates:
+        return FeatureFrame(user_ids=[], as_of_dates=[], x=np.empty((0, len(FEATURE_NAMES_V1))))
+
+    # Keys are user * stride + day, offset so that every window start stays inside its own user's range.
+    user_index = {user_id: idx for idx, user_id in enumerate(users)}
+    code_to_row = np.array([user_index.get(user_id, -1) for user_id in readings.users.tolist()], dtype=np.int64)
+    row_user = code_to_row[readings.user] if len(code_to_row) else np.empty(0, dtype=np.int64)
+    days = readings.days
+    keep = (row_user >= 0) & (days <= query_days.max())
+    origin = int(min(days[keep].min() if keep.any() else query_days.min(), query_days.min() - LAB_DAYS))
+    stride = int(query_days.max()) - origin + 1
+    keys = row_user[keep] * stride + (days[keep] - origin)
+    t = readings.ts[keep] / DAY_SECONDS - origin
+    kind, value = readings.kind[keep], readings.value[keep]
+    query_keys = (np.arange(n_users, dtype=np.int64)[:, None] * stride + (query_days - origin)).ravel()
+
+    sums: Sums = {}
+    for signal, (windows, stats) in SIGNALS.items():
+        mask = kind == KINDS.index(signal)
+        signal_keys, signal_t, signal_value = keys[mask], t[mask], value[mask]
+        if signal == "sleep":
+            # One value per day: that day's longest sleep, capped at the target.
+            signal_keys, inverse = np.unique(signal_keys, return_inverse=True)
+            longest = np.zeros(len(signal_keys))
+            np.maximum.at(longest, inverse, signal_value)
+            signal_t, signal_value = np.zeros(len(signal_keys)), _sleep_relief(longest)
+        order = np.argsort(signal_keys, kind="stable")
+        sorted_keys = signal_keys[order]
+        cum = np.zeros((len(order) + 1, len(stats)))
+        centered = signal_value[order] - CENTER.get(signal, 0.0)
+        np.cumsum(_reading_stats(signal, signal_t[order], centered), axis=0, out=cum[1:])
+        for window in windows:
+            first, last = WINDOWS[window]
+            hi = np.searchsorted(sorted_keys, query_keys - last, side="right")
+            lo = np.searchsorted(sorted_keys, query_keys - first, side="left")
+            sums[(window, signal)] = cum[hi] - cum[lo]
+
+    labs: dict[str, np.ndarray] = {}
+    for lab in LABS:
+        mask = kind == KINDS.index(lab)
+        order = np.lexsort((t[mask], keys[mask]))
+        lab_keys, lab_values = keys[mask][order], value[mask][order]
+        if not len(lab_keys):
+            labs[lab] = np.full(len(query_keys), np.nan)
+            continue
+        # Latest reading on or before the query day, if it is no older than LAB_DAYS.
+        last = np.searchsorted(lab_keys, query_keys, side="right") - 1
+        idx = np.maximum(last, 0)
+        labs[lab] = np.where((last >= 0) & (lab_keys[idx] >= query_keys - LAB_DAYS), lab_values[idx], np.nan)
+
+    return FeatureFrame(
+        user_ids=[user_id for user_id in users for _ in dates],
+        as_of_dates=dates * n_users,
+        x=features_from_sums(sums, labs),
+    )
+
+
+def _lift(signal: str, stats: np.ndarray, day: np.ndarray | int) -> np.ndarray:
+    """Per-day stats with t measured from the start of their day -> t measured from the engine origin."""
+    names = SIGNALS[signal][1]
+    if "t" not in names:
+        return stats
+    col = {name: stats[:, idx] for idx, name in enumerate(names)}
+    d = np.asarray(day, dtype=float)
+    lifted = dict(col)
+    lifted["t"] = col["t"] + col["n"] * d
+    lifted["tt"] = col["tt"] + 2 * d * col["t"] + col["n"] * d * d
+    lifted["tv"] = col["tv"] + d * col["v"]
+    return np.column_stack([lifted[name] for name in names])
+
+
+class RollingFeatures:
+    """Running window sums for many users, advanced one day at a time."""
+
+    def __init__(self, as_of_date: str) -> None:
+        self.origin = _day_number(as_of_date)
+        self.day = 0  # current as_of_date, in days from origin
+        self.users: list[str] = []
+        self._index: dict[str, int] = {}
+        self._capacity = 0
+        self.rings: dict[str, np.ndarray] = {}
+        self.sums: Sums = {}
+        self.centers: dict[str, np.ndarray] = {}
+        self.lab_value: dict[str, np.ndarray] = {}
+        self.lab_ts: dict[str, np.ndarray] = {}
+        self._grow(1024)
+
+    @property
+    def as_of_date(self) -> str:
+        return _day_string(self.origin + self.day)
+
+    def _grow(self, capacity: int) -> None:
+        def resized(arr: np.ndarray | None, shape: tuple[int, ...], dtype: Any, fill: float = 0.0) -> np.ndarray:
+            out = np.full((capacity, *shape), fill, dtype=dtype)
+            if arr is not None:
+                out[: self._capacity] = arr[: self._capacity]
+            return out
+
+        for signal, (windows, stats) in SIGNALS.items():
+            self.rings[signal] = resized(self.rings.get(signal), (_ring_days(signal), len(stats)), np.float32)
+            for window in windows:
+                self.sums[(window, signal)] = resized(self.sums.get((window, signal)), (len(stats),), np.float64)
+            if signal in CENTER:
+                self.centers[signal] = resized(self.centers.get(signal), (), np.float64, np.nan)
+        for lab in LABS:
+            self.lab_value[lab] = resized(self.lab_value.get(lab), (), np.float64, np.nan)
+            self.lab_ts[lab] = resized(self.lab_ts.get(lab), (), np.float64, -np.inf)
+        self._capacity = capacity
+
+    def _rows(self, user_ids: list[str]) -> np.ndarray:
+        """Engine rows for user_ids, adding unknown users."""
+        for user_id in user_ids:
+            if user_id not in self._index:
+                self._index[user_id] = len(self.users)
+                self.users.append(user_id)
+        if len(self.users) > self._capacity:
+            self._grow(max(len(self.users), 2 * self._capacity))
+        return np.array([self._index[user_id] for user_id in user_ids], dtype=np.int64)
+
+    def _centers(self, signal: str, rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Each user's center for `signal`, fixed at their first value; 0 for signals that are not centered."""
+        centers = self.centers.get(signal)
+        if centers is None:
+            return np.zeros(len(rows))
+        unset = np.isnan(centers[rows])
+        if unset.any():
+            first_rows, first_idx = np.unique(rows[unset], return_index=True)
+            centers[first_rows] = values[unset][first_idx]
+        return centers[rows]
+
+    def _apply(self, signal: str, rows: np.ndarray, days: np.ndarray, before: np.ndarray, after: np.ndarray) -> None:
+        """Add the change of some ring cells (one per unique row/day) to every window that covers the day."""
+        delta = _lift(signal, after.astype(np.float64) - before.astype(np.float64), days)
+        for window in SIGNALS[signal][0]:
+            first, last = WINDOWS[window]
+            covered = (days >= self.day - first) & (days <= self.day - last)
+            np.add.at(self.sums[(window, signal)], rows[covered], delta[covered])
+
+    def add(self, readings: Readings) -> int:
+        """Fold readings into the windows; returns how many were used.
+
+        Readings after the current as_of_date raise ValueError (advance first). Readings older than
+        every window they belong to are ignored, except labs.
+        """
+        days = readings.days - self.origin
+        if len(readings) and days.max() > self.day:
+            raise ValueError(f"readings after {self.as_of_date}; advance first")
+        present = np.unique(readings.user)
+        code_to_row = np.zeros(len(readings.users), dtype=np.int64)
+        code_to_row[present] = self._rows(readings.users[present].tolist())
+        rows = code_to_row[readings.user]
+        used = 0
+        for signal in SIGNALS:
+            ring = self.rings[signal]
+            length = ring.shape[1]
+            mask = readings.of_kind(signal) & (days > self.day - length)
+            if not mask.any():
+                continue
+            used += int(mask.sum())
+            cell_rows, cell_days = rows[mask], days[mask]
+            cells, first_idx = np.unique(cell_rows * length + cell_days % length, return_index=True)
+            cell_rows, cell_days = cell_rows[first_idx], cell_days[first_idx]
+            slots = cell_days % length
+            before = ring[cell_rows, slots].copy()
+            values = readings.value[mask]
+            if signal == "sleep":
+                inverse = np.searchsorted(cells, rows[mask] * length + days[mask] % length)
+                longest = ring[cell_rows, slots, 1].astype(np.float64)
+                np.maximum.at(longest, inverse, _sleep_relief(values))
+                ring[cell_rows, slots] = np.column_stack([np.ones(len(cells)), longest]).astype(np.float32)
+            else:
+                within_day = readings.ts[mask] / DAY_SECONDS - readings.days[mask]
+                stats = _reading_stats(signal, within_day, values - self._centers(signal, rows[mask], values))
+                np.add.at(ring, (rows[mask], days[mask] % length), stats.astype(np.float32))
+            self._apply(signal, cell_rows, cell_days, before, ring[cell_rows, slots])
+        for lab in LABS:
+            mask = readings.of_kind(lab)
+            used += int(mask.sum())
+            for row, ts, value in zip(rows[mask].tolist(), readings.ts[mask].tolist(), readings.value[mask].tolist()):
+                if ts > self.lab_ts[lab][row]:
+                    self.lab_ts[lab][row], self.lab_value[lab][row] = ts, value
+        return used
+
+    def advance(self, as_of_date: str | None = None) -> None:
+        """Slide every window forward to as_of_date (default: the next day), one day at a time."""
+        target = self.day + 1 if as_of_date is None else _day_number(as_of_date) - self.origin
+        if target < self.day:
+            raise ValueError(f"cannot move back from {self.as_of_date} to {as_of_date}")
+        n = len(self.users)
+        while self.day < target:
+            for signal, (windows, _) in SIGNALS.items():
+                ring = self.rings[signal]
+                length = ring.shape[1]
+                for window in windows:
+                    first, last = WINDOWS[window]
+                    sums = self.sums[(window, signal)]
+                    leaving = self.day - first
+                    sums[:n] -= _lift(signal, ring[:n, leaving % length].astype(np.float64), leaving)
+                    if last > 0:
+                        entering = self.day + 1 - last
+                        sums[:n] += _lift(signal, ring[:n, entering % length].astype(np.float64), entering)
+                    # Exactly zero once a window is empty, so rounding never accumulates.
+                    active = sums[:n]
+                    active[active[:, 0] < 0.5] = 0.0
+                ring[:n, (self.day + 1) % length] = 0.0
+            self.day += 1
+
+    def frame(self) -> FeatureFrame:
+        n = len(self.users)
+        sums = {key: value[:n] for key, value in self.sums.items()}
+        cutoff = (self.origin + self.day - LAB_DAYS) * DAY_SECONDS
+        labs = {lab: np.where(self.lab_ts[lab][:n] >= cutoff, self.lab_value[lab][:n], np.nan) for lab in LABS}
+        return FeatureFrame(user_ids=list(self.users), as_of_dates=[self.as_of_date] * n, x=features_from_sums(sums, labs))
+
+    def save(self, path: Path) -> None:
+        n = len(self.users)
+        arrays = {"users": np.array(self.users, dtype=str), "days": np.array([self.origin, self.day])}
+        arrays |= {f"ring:{signal}": ring[:n] for signal, ring in self.rings.items()}
+        arrays |= {f"sums:{window}:{signal}": sums[:n] for (window, signal), sums in self.sums.items()}
+        arrays |= {f"center:{signal}": centers[:n] for signal, centers in self.centers.items()}
+        arrays |= {f"lab:{lab}": np.column_stack([self.lab_value[lab][:n], self.lab_ts[lab][:n]]) for lab in LABS}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".tmp-{path.name}")
+        with tmp.open("wb") as f:
+            np.savez(f, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> RollingFeatures:
+        with np.load(path, allow_pickle=False) as data:
+            origin, day = (int(value) for value in data["days"])
+            engine = cls(_day_string(origin))
+            engine.day = day
+            engine._rows(data["users"].tolist())
+            n = len(engine.users)
+            for signal in SIGNALS:
+                engine.rings[signal][:n] = data[f"ring:{signal}"]
+            for window, signal in engine.sums:
+                engine.sums[(window, signal)][:n] = data[f"sums:{window}:{signal}"]
+            for signal, centers in engine.centers.items():
+                centers[:n] = data[f"center:{signal}"]
+            for lab in LABS:
+                engine.lab_value[lab][:n], engine.lab_ts[lab][:n] = data[f"lab:{lab}"].T
+        return engine
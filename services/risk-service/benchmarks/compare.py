@@ -0,0 +1,42 @@
+"""Compare two benchmark result files and flag p50 regressions.
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json --threshold 1.10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+
+def _index(path: Path) -> dict[tuple[str, str, int], dict[str, Any]]:
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {(r["name"], r["model"], int(r["size"])): r for r in report["results"]}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.10, help="head/base p50 ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    base, head = _index(args.base), _index(args.head)
+    regressions = 0
+    for key in sorted(base.keys() & head.keys()):
+        b, h = base[key], head[key]
+        ratio = h["p50_ms"] / b["p50_ms"] if b["p50_ms"] else float("inf")
+        flag = "REGRESSION" if ratio > args.threshold else ""
+        regressions += bool(flag)
+        name, model, size = key
+        print(f"{name:<18} {model:<20} n={size:<6} p50 {b['p50_ms']:>9.3f} -> {h['p50_ms']:>9.3f}ms  x{ratio:5.2f} {flag}")
+    for key in sorted(base.keys() ^ head.keys()):
+        print(f"{' '.join(map(str, key))}: only in {'base' if key in base else 'head'}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
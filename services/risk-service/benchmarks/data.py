@@ -0,0 +1,70 @@
+"""Synthetic FeaturesV1 generators, shaped like tests/test_train_smoke.py::_row but noisy."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from app.models import FEATURE_NAMES_V1, FeaturesV1, TrainRequest
+
+# Rough per-feature (mean, std) for label 0; label 1 rows are shifted by `RISK_SHIFT`.
+BASE = {
+    "bp_sys_trend_14d": (0.3, 2.0),
+    "bp_sys_var_7d": (2.0, 3.0),
+    "bp_dia_trend_14d": (0.2, 1.5),
+    "bp_dia_var_7d": (1.5, 2.0),
+    "hrv_z_7d": (0.4, 1.0),
+    "rhr_z_7d": (-0.2, 1.0),
+    "steps_z_7d": (0.9, 1.0),
+    "sleep_debt_hours_7d": (1.0, 2.0),
+    "weight_trend_14d": (-0.2, 0.5),
+    "glucose_trend_14d": (0.0, 4.0),
+    "a1c_latest": (5.5, 0.6),
+    "ldl_latest": (110.0, 25.0),
+    "adherence_nudge_7d": (0.8, 0.15),
+}
+RISK_SHIFT = {
+    "bp_sys_trend_14d": 4.7,
+    "bp_sys_var_7d": 8.0,
+    "bp_dia_trend_14d": 2.8,
+    "bp_dia_var_7d": 5.5,
+    "hrv_z_7d": -1.4,
+    "rhr_z_7d": 1.0,
+    "steps_z_7d": -2.3,
+    "sleep_debt_hours_7d": 5.0,
+    "weight_trend_14d": 0.8,
+    "glucose_trend_14d": 8.0,
+    "a1c_latest": 0.8,
+    "ldl_latest": 30.0,
+    "adherence_nudge_7d": -0.6,
+}
+
+
+def feature_dicts(n: int, seed: int = 0) -> tuple[list[dict[str, Any]], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    labels = (rng.random(n) < 0.35).astype(float)
+    cols = {}
+    for name in FEATURE_NAMES_V1:
+        mean, std = BASE[name]
+        cols[name] = rng.normal(mean, std, n) + labels * RISK_SHIFT[name]
+    cols["adherence_nudge_7d"] = np.clip(cols["adherence_nudge_7d"], 0.0, 1.0)
+
+    rows = []
+    for idx in range(n):
+        row: dict[str, Any] = {"user_id": f"bench-{seed}-{idx}", "as_of_date": "2026-02-28"}
+        row.update({name: round(float(cols[name][idx]), 4) for name in FEATURE_NAMES_V1})
+        rows.append(row)
+    return rows, labels
+
+
+def features(n: int, seed: int = 0) -> list[FeaturesV1]:
+    rows, _ = feature_dicts(n, seed)
+    return [FeaturesV1.model_validate(row) for row in rows]
+
+
+def train_request(n: int, seed: int = 0, **options: Any) -> TrainRequest:
+    rows, labels = feature_dicts(n, seed)
+    return TrainRequest.model_validate(
+        {"rows": [{"features": row, "label": float(label)} for row, label in zip(rows, labels)], **options}
+    )
@@ -0,0 +1,222 @@
+"""Scoring, batching and training throughput benchmarks.
+
+    python -m benchmarks.run                  # full run, writes benchmarks/results/<git-sha>.json
+    python -m benchmarks.run --quick          # small sizes, for CI smoke checks
+    python -m benchmarks.compare base.json head.json
+
+Every case runs against a fresh artifact dir with the score and explanation caches disabled,
+so repeated rows cannot flatter the numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.cache import ScoreCache
+from app.explain import ContributionCache
+from app.ml import ModelManager
+from app.training import default_model_type
+from benchmarks.data import feature_dicts, features, train_request
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+FULL = {
+    "single": 2000,
+    "batch_sizes": [1, 10, 100, 500],
+    "batch_repeats": 50,
+    "train_sizes": [1000, 10000],
+    "train_repeats": 3,
+    "startup_repeats": 5,
+}
+QUICK = {"single": 200, "batch_sizes": [1, 50], "batch_repeats": 5, "train_sizes": [200], "train_repeats": 1, "startup_repeats": 1}
+
+# Run in a fresh interpreter: seconds to import app.main, and to the first 200 from /score
+# with the lifespan (background model load) running.
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main as main_module
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main_module.app) as client:
+    while client.post("/score", json={"as_of_date": "2026-02-28"}).status_code != 200:
+        time.sleep(0.002)
+print(json.dumps({"import_s": imported - started, "first_score_s": time.perf_counter() - started}))
+"""
+
+
+def _summary(name: str, model: str, size: int, seconds: list[float], rows_per_call: int) -> dict[str, Any]:
+    arr = np.asarray(seconds)
+    return {
+        "name": name,
+        "model": model,
+        "size": size,
+        "repeats": len(seconds),
+        "p50_ms": round(float(np.percentile(arr, 50)) * 1000.0, 4),
+        "p99_ms": round(float(np.percentile(arr, 99)) * 1000.0, 4),
+        "mean_ms": round(float(arr.mean()) * 1000.0, 4),
+        "rows_per_s": round(rows_per_call * len(seconds) / float(arr.sum()), 1) if arr.sum() else 0.0,
+    }
+
+
+def _timed(fn: Callable[[], Any], repeats: int) -> list[float]:
+    out = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - started)
+    return out
+
+
+def _uncached_manager(artifact_dir: Path) -> ModelManager:
+    manager = ModelManager(artifact_dir=artifact_dir)
+    manager.score_cache = ScoreCache(max_size=0, ttl_seconds=0.0)
+    manager.contribution_cache = ContributionCache(max_size=0)
+    return manager
+
+
+def _scoring_cases(manager: ModelManager, model: str, cfg: dict[str, Any]) -> list[dict[str, Any]]:
+    results = []
+    items = features(cfg["single"], seed=1)
+    manager.score_one(items[0])  # warm-up
+    per_item = []
+    for item in items:
+        started = time.perf_counter()
+        manager.score_one(item)
+        per_item.append(time.perf_counter() - started)
+    results.append(_summary("score_one", model, 1, per_item, 1))
+
+    for size in cfg["batch_sizes"]:
+        batch = features(size, seed=2 + size)
+        manager.score_batch(batch)
+        results.append(_summary("score_batch", model, size, _timed(lambda: manager.score_batch(batch), cfg["batch_repeats"]), size))
+
+    main_module.model_manager = manager
+    client = TestClient(main_module.app)
+    size = max(s for s in cfg["batch_sizes"] if s <= 500)
+    payload = {"items": feature_dicts(size, seed=99)[0]}
+    client.post("/score/batch", json=payload)
+    results.append(
+        _summary("http_score_batch", model, size, _timed(lambda: client.post("/score/batch", json=payload), cfg["batch_repeats"]), size)
+    )
+    return results
+
+
+def _startup_cases(artifact_dir: Path, model: str, repeats: int) -> list[dict[str, Any]]:
+    env = os.environ | {"RISK_ARTIFACT_DIR": str(artifact_dir), "RISK_REQUEST_LOG_SAMPLE_RATE": "0"}
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT], cwd=SERVICE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    if not runs:
+        return []
+    return [
+        _summary("import_app", model, 1, [r["import_s"] for r in runs], 1),
+        _summary("time_to_first_score", model, 1, [r["first_score_s"] for r in runs], 1),
+    ]
+
+
+def _model_types() -> list[str]:
+    types = ["logistic_regression"]
+    if default_model_type() == "xgboost":
+        types.append("xgboost")
+    return types
+
+
+def run(cfg: dict[str, Any]) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    served = main_module.model_manager
+    with tempfile.TemporaryDirectory() as tmp:
+        results += _scoring_cases(_uncached_manager(Path(tmp) / "rule"), "rule-v0", cfg)
+        results += _startup_cases(Path(tmp) / "rule", "rule-v0", cfg.get("startup_repeats", 0))
+
+        for model_type in _model_types():
+            for size in cfg["train_sizes"]:
+                req = train_request(size, seed=size, model_type=model_type)
+                runs = []
+                for rep in range(cfg["train_repeats"]):
+                    manager = _uncached_manager(Path(tmp) / f"train-{model_type}-{size}-{rep}")
+                    runs += _timed(lambda: manager.train_and_save(req), 1)
+                results.append(_summary("train_and_save", model_type, size, runs, size))
+
+            trained_dir = Path(tmp) / f"train-{model_type}-{cfg['train_sizes'][0]}-0"
+            results += _scoring_cases(_uncached_manager(trained_dir), model_type, cfg)
+            results += _startup_cases(trained_dir, model_type, cfg.get("startup_repeats", 0))
+    main_module.model_manager = served
+    return results
+
+
+def _git_sha() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_DIR, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def _versions() -> dict[str, str]:
+    versions = {"python": platform.python_version(), "numpy": np.__version__}
+    for module in ("sklearn", "xgboost", "fastapi", "pydantic"):
+        try:
+            versions[module] = __import__(module).__version__
+        except Exception:
+            continue
+    return versions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--quick", action="store_true", help="small sizes for smoke runs")
+    parser.add_argument("--out", type=Path, default=None, help="defaults to benchmarks/results/<git-sha>.json")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    cfg = QUICK if args.quick else FULL
+    results = run(cfg)
+    sha = _git_sha()
+    report = {
+        "meta": {
+            "git_sha": sha,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "versions": _versions(),
+            "config": cfg,
+        },
+        "results": results,
+    }
+
+    out = args.out or RESULTS_DIR / f"{sha}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    for row in results:
+        print(
+            f"{row['name']:<18} {row['model']:<20} n={row['size']:<6} "
+            f"p50={row['p50_ms']:>9.3f}ms p99={row['p99_ms']:>9.3f}ms rows/s={row['rows_per_s']:>11.1f}"
+        )
+    print(f"wrote {out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.batch import feature_matrix
+from app.ml import ModelManager
+from app.models import FEATURE_NAMES_V1, FeaturesV1, TrainRequest
+from app.scoring import RULE_TERMS, score_rule_v0, score_rule_v0_batch
+
+
+def _random_features(n: int, seed: int = 7) -> list[FeaturesV1]:
+    rng = np.random.default_rng(seed)
+    items = []
+    for idx in range(n):
+        vals = dict(zip(FEATURE_NAMES_V1, rng.normal(0.0, 4.0, size=len(FEATURE_NAMES_V1)).tolist()))
+        vals["a1c_latest"] = float(rng.uniform(4.5, 9.0))
+        vals["ldl_latest"] = float(rng.uniform(60.0, 220.0))
+        vals["adherence_nudge_7d"] = float(rng.uniform(0.0, 1.0))
+        if idx % 5 == 0:
+            vals["ldl_latest"] = None
+        items.append(FeaturesV1(user_id=f"u-{idx}", as_of_date="2026-02-28", **vals))
+    return items
+
+
+def test_rule_terms_match_vectorized_signals() -> None:
+    items = _random_features(50)
+    x = feature_matrix(items)
+    batch = score_rule_v0_batch(x)
+    for row, item in enumerate(items):
+        vals = item.as_feature_dict()
+        for col, term in enumerate(RULE_TERMS):
+            normalized = min(max(term.signal(vals) / term.max_signal, 0.0), 1.0)
+            assert batch.contributions[row, col] == term.weight * normalized
+
+
+def test_rule_term_signs_and_offsets() -> None:
+    vals = FeaturesV1(as_of_date="2026-02-28", hrv_z_7d=-1.5, steps_z_7d=2.0, a1c_latest=6.2, ldl_latest=90.0, adherence_nudge_7d=0.2)
+    signals = {term.key: term.signal(vals.as_feature_dict()) for term in RULE_TERMS}
+    assert signals["hrv_z_7d"] == 1.5 and signals["steps_z_7d"] == 0.0
+    assert signals["a1c_latest"] == pytest.approx(0.5) and signals["ldl_latest"] == 0.0
+    assert signals["adherence_nudge_7d"] == pytest.approx(0.3)
+
+
+def test_rule_batch_matches_scalar() -> None:
+    items = _random_features(200) + [FeaturesV1(as_of_date="2026-02-28")]
+    assert score_rule_v0_batch(feature_matrix(items)).as_tuples() == [score_rule_v0(item) for item in items]
+
+
+def test_model_batch_matches_scalar(tmp_path) -> None:
+    items = _random_features(120, seed=11)
+    rows = [{"features": item.model_dump(), "label": float(item.as_feature_vector()[0] > 0)} for item in items]
+    manager = ModelManager(artifact_dir=tmp_path)
+    manager.train_and_save(TrainRequest.model_validate({"rows": rows}))
+
+    batched = manager.score_batch(items)
+    for item, (risk, band, drivers, version) in zip(items, batched):
+        s_risk, s_band, s_drivers, s_version = manager.score_one(item)
+        assert abs(risk - s_risk) <= 1e-6
+        assert band == s_band
+        assert version == s_version
+        assert [d.name for d in drivers] == [d.name for d in s_drivers]
+        assert np.allclose([d.contribution for d in drivers], [d.contribution for d in s_drivers], atol=1e-4)
@@ -0,0 +1,13 @@
+from benchmarks.run import run
+
+
+def test_benchmark_suite_runs_every_case() -> None:
+    cfg = {"single": 5, "batch_sizes": [1, 4], "batch_repeats": 2, "train_sizes": [40], "train_repeats": 1, "startup_repeats": 1}
+    results = run(cfg)
+    names = {(r["name"], r["model"]) for r in results}
+    assert ("score_one", "rule-v0") in names
+    assert ("http_score_batch", "rule-v0") in names
+    assert ("train_and_save", "logistic_regression") in names
+    assert ("score_batch", "logistic_regression") in names
+    assert ("time_to_first_score", "logistic_regression") in names
+    assert all(r["p99_ms"] >= r["p50_ms"] > 0 and r["rows_per_s"] > 0 for r in results)
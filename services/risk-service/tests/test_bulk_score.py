@@ -0,0 +1,86 @@
+import csv
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from app import bulk_score
+from app.bulk_score import Chunk, run
+from app.models import FeaturesV1
+from app.scoring import score_rule_v0
+
+
+def test_bulk_score_csv_matches_rule_v0(tmp_path: Path) -> None:
+    src = tmp_path / "features.csv"
+    rows = [
+        {"user_id": "u-1", "as_of_date": "2026-02-28", "bp_sys_trend_14d": "4.0", "steps_z_7d": "-1.0", "adherence_nudge_7d": ""},
+        {"user_id": "u-2", "as_of_date": "2026-02-28", "bp_sys_trend_14d": "0.1", "steps_z_7d": "0.8", "adherence_nudge_7d": "0.9"},
+        {"user_id": "u-3", "as_of_date": "2026-02-30", "bp_sys_trend_14d": "1", "steps_z_7d": "0", "adherence_nudge_7d": "0.5"},
+        {"user_id": "u-4", "as_of_date": "2026-02-28", "bp_sys_trend_14d": "high", "steps_z_7d": "0", "adherence_nudge_7d": "0.5"},
+    ]
+    with src.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    out = tmp_path / "scores.csv"
+    stats = run(src, out, chunk_size=2, rule_only=True)
+    assert stats["rows"] == 4
+
+    with out.open() as f:
+        scored = list(csv.DictReader(f))
+    assert [r["user_id"] for r in scored] == ["u-1", "u-2", "u-3", "u-4"]
+
+    for src_row, out_row in zip(rows[:2], scored[:2]):
+        features = FeaturesV1(
+            user_id=src_row["user_id"],
+            as_of_date=src_row["as_of_date"],
+            bp_sys_trend_14d=float(src_row["bp_sys_trend_14d"]),
+            steps_z_7d=float(src_row["steps_z_7d"]),
+            adherence_nudge_7d=float(src_row["adherence_nudge_7d"]) if src_row["adherence_nudge_7d"] else None,
+        )
+        risk, band, drivers, _ = score_rule_v0(features)
+        assert float(out_row["risk"]) == risk
+        assert out_row["band"] == band
+        assert out_row["driver_1"] == drivers[0].name
+        assert out_row["error"] == ""
+
+    assert "as_of_date" in scored[2]["error"] and scored[2]["risk"] == ""
+    assert "bp_sys_trend_14d" in scored[3]["error"]
+
+
+def test_bulk_score_rejects_input_without_required_columns(tmp_path: Path) -> None:
+    src = tmp_path / "features.csv"
+    src.write_text("user_id,bp_sys_trend_14d\nu-1,4.0\n")
+    with pytest.raises(SystemExit, match="as_of_date"):
+        run(src, tmp_path / "scores.csv", rule_only=True)
+    assert not (tmp_path / "scores.csv").exists()
+
+
+def test_bulk_score_workers_read_a_bounded_window_ahead(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    src = tmp_path / "features.csv"
+    src.write_text("user_id,as_of_date\n")
+    read = 0
+    ahead: list[int] = []
+
+    def chunks(path: Path, chunk_size: int) -> Iterator[Chunk]:
+        nonlocal read
+        for idx in range(40):
+            read += 1
+            yield {"user_id": [f"u-{idx}"], "as_of_date": ["2026-02-28"]}
+
+    class Writer:
+        written = 0
+
+        def write(self, rows: list[dict[str, Any]]) -> None:
+            Writer.written += 1
+            ahead.append(read - Writer.written)
+
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setattr(bulk_score, "iter_chunks", chunks)
+    monkeypatch.setattr(bulk_score, "open_writer", lambda path: Writer())
+    stats = run(src, tmp_path / "scores.csv", workers=2, rule_only=True)
+    assert stats["rows"] == 40 and Writer.written == 40
+    assert max(ahead) <= 4
@@ -0,0 +1,82 @@
+import csv
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.artifacts import METADATA_FILE, VERSIONS_DIR, current_version
+from app.bulk_train import count_rows, run
+from app.ml import ModelManager
+from app.models import FEATURE_NAMES_V1
+from app.utils import load_json
+from benchmarks.data import feature_dicts, train_request
+
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _write_csv(path: Path, n: int, seed: int) -> None:
+    rows, labels = feature_dicts(n, seed)
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["user_id", "as_of_date", *FEATURE_NAMES_V1, "label"], extrasaction="ignore")
+        writer.writeheader()
+        for row, label in zip(rows, labels):
+            writer.writerow(row | {"label": float(label)})
+        writer.writerow({"as_of_date": "2026-02-28", "bp_sys_trend_14d": "high", "label": 1.0})
+
+
+def test_bulk_train_streams_files_into_a_published_model(tmp_path: Path) -> None:
+    inputs = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    _write_csv(inputs[0], 300, seed=1)
+    _write_csv(inputs[1], 200, seed=2)
+    assert count_rows(inputs[0]) == 301
+
+    stats = run(inputs, chunk_size=64, model_type="logistic_regression", artifact_dir=tmp_path / "artifacts")
+    assert stats["rows"] == 500
+    assert stats["skipped"] == 2
+    assert stats["model_version"] == "ml-1"
+    assert stats["metrics"]["auc"] is not None
+    assert stats["peak_rss_mb"] > 0
+
+    metadata = load_json(tmp_path / "artifacts" / VERSIONS_DIR / current_version(tmp_path / "artifacts") / METADATA_FILE)
+    assert metadata["n_samples"] == 500
+    assert metadata["out_of_core"]["skipped"] == 2
+    assert np.isfinite(metadata["feature_means"]).all()
+
+
+def test_incremental_training_after_bulk_train_builds_on_its_rows(tmp_path: Path) -> None:
+    src = tmp_path / "a.csv"
+    _write_csv(src, 300, seed=1)
+    artifacts = tmp_path / "artifacts"
+    manager = ModelManager(artifact_dir=artifacts)
+    manager.train_and_save(train_request(100, seed=4, model_type="logistic_regression"))
+    run([src], model_type="logistic_regression", artifact_dir=artifacts)
+
+    manager = ModelManager(artifact_dir=artifacts)
+    assert manager.training_store.n_rows() == 300
+    out = manager.train_and_save(train_request(50, seed=2, model_type="logistic_regression", incremental=True))
+    assert out["n_samples"] == 350
+    metadata = load_json(artifacts / VERSIONS_DIR / out["model_version"] / METADATA_FILE)
+    assert metadata["incremental"]["warm_start_from"] == "ml-2"
+
+
+def test_bulk_train_refuses_inputs_over_the_memory_budget(tmp_path: Path) -> None:
+    src = tmp_path / "a.csv"
+    _write_csv(src, 50, seed=1)
+    with pytest.raises(SystemExit):
+        run([src], memory_budget_mb=0.001, artifact_dir=tmp_path)
+
+
+def test_bulk_train_cli(tmp_path: Path) -> None:
+    src = tmp_path / "a.csv"
+    _write_csv(src, 100, seed=3)
+    result = subprocess.run(
+        [sys.executable, "-m", "app.bulk_train", str(src), "--artifact-dir", str(tmp_path / "artifacts"), "--model-type", "logistic_regression"],
+        cwd=SERVICE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "peak_rss_mb=" in result.stderr
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.cohort import RISK_BINS, CohortIndex
+from app.ml import ModelManager
+from app.utils import band_for_risk
+from benchmarks.data import feature_dicts
+
+
+def _population(n: int, seed: int) -> tuple[list[str], np.ndarray, np.ndarray, list[str]]:
+    rng = np.random.default_rng(seed)
+    risk = rng.beta(2, 5, n)
+    return [f"u{idx}" for idx in range(n)], rng.normal(0, 2, (n, 13)), risk, [band_for_risk(r) for r in risk]
+
+
+def test_percentiles_and_quantiles_are_exact_to_one_bin(tmp_path: Path) -> None:
+    index = CohortIndex()
+    user_ids, x, risk, bands = _population(20_000, seed=1)
+    for start in range(0, 20_000, 5_000):
+        stop = start + 5_000
+        index.add("v1", user_ids[start:stop], x[start:stop], risk[start:stop], bands[start:stop])
+
+    for value in (0.05, 0.2, 0.33, 0.7):
+        exact = 100 * np.mean(risk < value)
+        assert index.compare("v1", None, value)["percentile"] == pytest.approx(exact, abs=100 * 0.01)
+    summary = index.summary("v1", n_bins=10)
+    assert summary["n_users"] == 20_000
+    assert summary["quantiles"]["p50"] == pytest.approx(np.median(risk), abs=2 / RISK_BINS)
+    assert sum(b["count"] for b in summary["histogram"]) == 20_000
+    assert summary["band_shares"]["green"] == pytest.approx(np.mean(risk < 0.33), abs=1e-4)
+
+    index.save(tmp_path / "cohort.npz")
+    restored = CohortIndex()
+    assert restored.load(tmp_path / "cohort.npz") == ["v1"]
+    assert restored.summary("v1", n_bins=10) == summary
+    assert restored.compare("v1", "u7", None) == index.compare("v1", "u7", None)
+
+
+def test_rescored_users_replace_their_previous_score() -> None:
+    index = CohortIndex()
+    user_ids, x, risk, bands = _population(100, seed=2)
+    index.add("v1", user_ids, x, risk, bands)
+    index.add("v1", user_ids[:50] + [None], x[:51], np.full(51, 0.95), ["red"] * 51)
+
+    summary = index.summary("v1", n_bins=20)
+    assert summary["n_users"] == 100
+    assert summary["histogram"][-1]["count"] == 50 + int(np.sum(risk[50:] >= 0.95))
+    assert summary["band_shares"]["red"] == pytest.approx((50 + sum(b == "red" for b in bands[50:])) / 100)
+    assert index.compare("v1", "u3", None)["risk"] == pytest.approx(0.95)
+    assert index.compare("v2", "u3", None) is None and index.compare("v1", "nobody", None) is None
+
+
+def test_batch_scores_feed_the_cohort_endpoints(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(main_module, "model_manager", ModelManager(artifact_dir=tmp_path))
+    monkeypatch.setattr(main_module, "cohort_index", CohortIndex())
+    client = TestClient(main_module.app)
+    rows, _ = feature_dicts(200, seed=4)
+    assert client.post("/score/batch", json={"items": rows[:120]}).status_code == 200
+    assert client.post("/score/batch", json={"items": rows[100:]}).status_code == 200
+
+    summary = client.get("/cohort", params={"bins": 4}).json()
+    assert summary["model_version"] == "rule-v0" and summary["n_users"] == 200
+    assert [b["low"] for b in summary["histogram"]] == [0.0, 0.25, 0.5, 0.75]
+
+    compared = client.get("/cohort/compare", params={"user_id": rows[5]["user_id"]}).json()
+    assert 0 <= compared["percentile"] <= 100
+    assert set(compared["feature_percentiles"]) == set(rows[5]) - {"user_id", "as_of_date"}
+    assert client.get("/cohort/compare", params={"risk": 1.0}).json()["percentile"] == pytest.approx(100.0)
+
+    assert client.get("/cohort/compare", params={"user_id": "nobody"}).status_code == 404
+    assert client.get("/cohort/compare").status_code == 422
+    assert client.get("/cohort", params={"model_version": "ml-9"}).status_code == 404
+    assert client.get("/health").json()["cohort"]["users"] == 200
@@ -0,0 +1,71 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.batch import feature_matrix
+from app.columnar import FEATURES_CONTENT_TYPE, SCORES_CONTENT_TYPE, decode_columnar, decode_scores, encode_features
+from app.main import app
+from app.models import FEATURE_NAMES_V1, FeaturesV1
+
+
+client = TestClient(app)
+HEADERS = {"content-type": FEATURES_CONTENT_TYPE}
+
+
+def _items() -> list[dict]:
+    rng = np.random.default_rng(5)
+    return [
+        {
+            "user_id": f"u-{idx}",
+            "as_of_date": "2026-02-28",
+            "bp_sys_trend_14d": float(rng.normal(3, 3)),
+            "sleep_debt_hours_7d": float(rng.uniform(0, 6)),
+            "steps_z_7d": float(rng.normal(0, 1)),
+            "adherence_nudge_7d": float(rng.uniform(0, 1)),
+        }
+        for idx in range(40)
+    ]
+
+
+def test_columnar_body_is_scored_like_json() -> None:
+    items = _items()
+    x = feature_matrix([FeaturesV1(**item) for item in items])
+    body = encode_features(x, [item["as_of_date"] for item in items], [item["user_id"] for item in items])
+
+    res = client.post("/score/batch?drivers=true", content=body, headers=HEADERS)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == SCORES_CONTENT_TYPE
+    out = decode_scores(res.content)
+
+    expected = client.post("/score/batch", json={"items": items}).json()["items"]
+    assert out["model_version"] == expected[0]["model_version"]
+    assert out["risk"].tolist() == [row["risk"] for row in expected]
+    assert out["band"] == [row["band"] for row in expected]
+    names = out["drivers"]
+    for row, contributions in zip(expected, out["contributions"]):
+        top = {names[col]: contributions[col] for col in np.flatnonzero(contributions)}
+        listed = {d["name"]: d["contribution"] for d in row["drivers"] if d["name"] != "Baseline"}
+        assert all(top[name] == contribution for name, contribution in listed.items())
+
+
+def test_columnar_features_are_a_view_and_nan_means_missing() -> None:
+    x = np.zeros((3, len(FEATURE_NAMES_V1)))
+    decoded = decode_columnar(encode_features(x, ["2026-02-28"] * 3), max_rows=10)
+    assert not decoded.x.flags.owndata and decoded.user_ids == [None] * 3
+
+    x[1, FEATURE_NAMES_V1.index("adherence_nudge_7d")] = np.nan
+    decoded = decode_columnar(encode_features(x, ["2026-02-28"] * 3), max_rows=10)
+    assert decoded.x[1, FEATURE_NAMES_V1.index("adherence_nudge_7d")] == 0.5
+
+
+def test_columnar_validation_errors() -> None:
+    x = np.zeros((2, len(FEATURE_NAMES_V1)))
+    x[1, FEATURE_NAMES_V1.index("adherence_nudge_7d")] = 1.5
+    res = client.post("/score/batch", content=encode_features(x, ["2026-02-30", "2026-02-28"]), headers=HEADERS)
+    assert res.status_code == 422
+    assert [err["loc"] for err in res.json()["detail"]] == [
+        ["body", "items", 0, "as_of_date"],
+        ["body", "items", 1, "adherence_nudge_7d"],
+    ]
+
+    truncated = encode_features(x, ["2026-02-28"] * 2)[:-3]
+    assert client.post("/score/batch", content=truncated, headers=HEADERS).status_code == 422
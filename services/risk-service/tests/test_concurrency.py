@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.concurrency import Lane, LaneOverloaded, LaneTimeout
+
+
+def test_lane_rejects_past_capacity_and_frees_slots() -> None:
+    release = threading.Event()
+    lane = Lane("test", workers=1, queue_size=1, timeout_s=None)
+    try:
+        running = lane.submit(release.wait)
+        queued = lane.submit(lambda: "queued")
+        with pytest.raises(LaneOverloaded):
+            lane.submit(lambda: "rejected")
+        assert lane.snapshot()["rejected"] == 1
+
+        release.set()
+        running.result(timeout=5)
+        assert queued.result(timeout=5) == "queued"
+        assert lane.submit(lambda: "again").result(timeout=5) == "again"
+    finally:
+        release.set()
+        lane.shutdown()
+
+
+def test_lane_deadline_raises_timeout() -> None:
+    release = threading.Event()
+    lane = Lane("test", workers=1, queue_size=0, timeout_s=0.05)
+    try:
+        with pytest.raises(LaneTimeout):
+            asyncio.run(lane.run(release.wait))
+        assert lane.snapshot()["timeouts"] == 1
+    finally:
+        release.set()
+        lane.shutdown()
+
+
+def test_full_score_lane_returns_503(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+    lane = Lane("score", workers=1, queue_size=0, timeout_s=None)
+    monkeypatch.setattr(main_module, "score_lane", lane)
+    try:
+        lane.submit(release.wait)
+        res = TestClient(main_module.app).post("/score", json={"as_of_date": "2026-02-28"})
+        assert res.status_code == 503
+        assert res.headers["retry-after"] == "1"
+    finally:
+        release.set()
+        lane.shutdown()
@@ -0,0 +1,84 @@
+import csv
+from pathlib import Path
+
+import pytest
+
+from app.cohort import CohortIndex
+from app.daily_job import CHECKPOINT_FILE, COHORT_FILE, SUCCESS_FILE, FileFeatureSource, run
+from app.ml import ModelManager
+from app.utils import load_json
+from benchmarks.data import feature_dicts
+from test_hot_swap import _train
+
+
+class ListSource:
+    def __init__(self, rows: list[dict], fail_after: int | None = None) -> None:
+        self.rows = rows
+        self.fail_after = fail_after
+
+    def chunks(self, as_of_date: str, chunk_size: int):
+        for idx, start in enumerate(range(0, len(self.rows), chunk_size)):
+            if self.fail_after is not None and idx == self.fail_after:
+                raise RuntimeError("feature store went away")
+            part = self.rows[start : start + chunk_size]
+            yield {name: [row.get(name) for row in part] for name in part[0]}
+
+
+def _rows(n: int) -> list[dict]:
+    rows, _ = feature_dicts(n, seed=5)
+    return [{k: v for k, v in row.items() if k != "as_of_date"} for row in rows]
+
+
+def _read_parts(run_dir: Path) -> list[dict]:
+    out = []
+    for part in sorted(run_dir.glob("part-*.csv")):
+        with part.open() as f:
+            out.extend(csv.DictReader(f))
+    return out
+
+
+def test_crashed_run_resumes_with_the_original_model_version(tmp_path: Path) -> None:
+    artifacts = tmp_path / "artifacts"
+    _train(ModelManager(artifact_dir=artifacts))
+    rows = _rows(50)
+
+    with pytest.raises(RuntimeError):
+        run("2026-02-28", ListSource(rows, fail_after=3), tmp_path / "runs", chunk_size=10, artifact_dir=artifacts)
+    run_dir = tmp_path / "runs" / "2026-02-28"
+    assert len(load_json(run_dir / CHECKPOINT_FILE)["completed"]) == 3
+    assert not (run_dir / SUCCESS_FILE).exists()
+
+    # A model published between the crash and the resume must not leak into this run.
+    _train(ModelManager(artifact_dir=artifacts))
+    stats = run("2026-02-28", ListSource(rows), tmp_path / "runs", chunk_size=999, artifact_dir=artifacts)
+    assert stats["resumed_chunks"] == 3
+    assert stats["scored_rows"] == 20
+    assert stats["rows"] == 50
+    assert stats["model_version"] == "ml-1"
+
+    scored = _read_parts(run_dir)
+    assert sorted(row["user_id"] for row in scored) == sorted(row["user_id"] for row in rows)
+    assert {row["model_version"] for row in scored} == {"ml-1"}
+    assert {row["as_of_date"] for row in scored} == {"2026-02-28"}
+    assert load_json(run_dir / SUCCESS_FILE)["rows"] == 50
+    # Resumed chunks are re-read from their parts, so the run's cohort index still covers everyone.
+    assert stats["cohort_users"] == 50
+    assert CohortIndex().load(run_dir / COHORT_FILE) == ["ml-1"]
+
+
+def test_file_source_with_process_pool(tmp_path: Path) -> None:
+    rows = _rows(30)
+    export = tmp_path / "features-2026-02-28.csv"
+    with export.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    source = FileFeatureSource(str(tmp_path / "features-{date}.csv"))
+    stats = run("2026-02-28", source, tmp_path / "runs", chunk_size=7, workers=2, artifact_dir=tmp_path / "empty")
+    assert stats["chunks"] == 5
+    assert stats["model_version"] == "rule-v0"
+    assert len(_read_parts(tmp_path / "runs" / "2026-02-28")) == 30
+
+    again = run("2026-02-28", source, tmp_path / "runs", restart=True, chunk_size=10, artifact_dir=tmp_path / "empty")
+    assert again["chunks"] == 3 and again["resumed_chunks"] == 0
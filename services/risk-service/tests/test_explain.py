@@ -0,0 +1,103 @@
+import math
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from app.explain import ContributionCache, compile_tree_explainer
+from app.inference import TreeEnsemblePredictor, compile_model, compile_tree_dump
+
+
+def _leaf(node_id: int, value: float, cover: float) -> dict:
+    return {"nodeid": node_id, "leaf": value, "cover": cover}
+
+
+def _split(node_id: int, feature: int, thr: float, yes: int, no: int, missing: int, cover: float, children: list) -> dict:
+    return {
+        "nodeid": node_id, "split": f"f{feature}", "split_condition": thr,
+        "yes": yes, "no": no, "missing": missing, "cover": cover, "children": children,
+    }
+
+
+def _ensemble() -> TreeEnsemblePredictor:
+    # Tree A splits on f0 twice (repeated feature on one path) and on f6.
+    tree_a = _split(0, 0, 1.0, 1, 2, 2, 100.0, [
+        _split(1, 6, 0.0, 3, 4, 3, 60.0, [
+            _split(3, 0, -1.0, 5, 6, 5, 35.0, [_leaf(5, 0.5, 10.0), _leaf(6, 0.1, 25.0)]),
+            _leaf(4, -0.2, 25.0),
+        ]),
+        _leaf(2, 0.3, 40.0),
+    ])
+    tree_b = _split(0, 12, 0.5, 1, 2, 1, 100.0, [_leaf(1, -0.4, 70.0), _leaf(2, 0.6, 30.0)])
+    return compile_tree_dump([tree_a, tree_b], base_margin=0.1, importances=np.zeros(13))
+
+
+def _cond_expectation(p: TreeEnsemblePredictor, x: np.ndarray, known: set[int]) -> float:
+    def walk(node: int) -> float:
+        feat = int(p.feature[node])
+        if feat < 0:
+            return float(p.value[node])
+        left, right = int(p.left[node]), int(p.right[node])
+        if feat in known:
+            xv = np.float32(x[feat])
+            nxt = int(p.missing[node]) if np.isnan(xv) else (left if xv < p.threshold[node] else right)
+            return walk(nxt)
+        return (p.cover[left] * walk(left) + p.cover[right] * walk(right)) / p.cover[node]
+
+    return p.base_margin + sum(walk(int(root)) for root in p.roots)
+
+
+def _brute_shap(p: TreeEnsemblePredictor, x: np.ndarray, players: list[int]) -> np.ndarray:
+    n = len(players)
+    phi = np.zeros(13)
+    for i in players:
+        others = [j for j in players if j != i]
+        for size in range(n):
+            w = math.factorial(size) * math.factorial(n - size - 1) / math.factorial(n)
+            for subset in combinations(others, size):
+                s = set(subset)
+                phi[i] += w * (_cond_expectation(p, x, s | {i}) - _cond_expectation(p, x, s))
+    return phi
+
+
+def test_tree_shap_matches_brute_force() -> None:
+    predictor = _ensemble()
+    explainer = compile_tree_explainer(predictor)
+    rng = np.random.default_rng(5)
+    x = rng.normal(0.0, 1.5, size=(40, 13))
+    x[::7, 0] = np.nan
+
+    phi = explainer.contributions(x)
+    for row in range(x.shape[0]):
+        np.testing.assert_allclose(phi[row], _brute_shap(predictor, x[row], [0, 6, 12]), atol=1e-6)
+    np.testing.assert_allclose(phi.sum(axis=1) + explainer.expected_margin, predictor.predict_margin(x), atol=1e-5)
+
+
+def test_contribution_cache_reuses_rows() -> None:
+    explainer = compile_tree_explainer(_ensemble())
+    cache = ContributionCache(max_size=2)
+    x = np.arange(39, dtype=float).reshape(3, 13) / 10.0
+
+    first = cache.contributions("ml-1", explainer, x[:2])
+    again = cache.contributions("ml-1", explainer, x[:2])
+    np.testing.assert_array_equal(first, again)
+    assert cache.stats.snapshot()["cache_hits"] == 2
+
+    cache.contributions("ml-2", explainer, x[:1])
+    assert cache.stats.snapshot()["computed_rows"] == 3
+
+
+def test_xgboost_tree_shap_matches_native_contribs() -> None:
+    xgboost = pytest.importorskip("xgboost")
+    rng = np.random.default_rng(9)
+    x = rng.normal(0.0, 2.0, size=(300, 13))
+    y = (x[:, 0] * x[:, 6] + x[:, 2] > 0).astype(int)
+    model = xgboost.XGBClassifier(n_estimators=30, max_depth=3, eval_metric="logloss").fit(x, y)
+
+    predictor = compile_model(model)
+    explainer = compile_tree_explainer(predictor)
+    phi = explainer.contributions(x)
+    np.testing.assert_allclose(phi.sum(axis=1) + explainer.expected_margin, predictor.predict_margin(x), atol=1e-4)
+
+    native = model.get_booster().predict(xgboost.DMatrix(x), pred_contribs=True)
+    np.testing.assert_allclose(phi, native[:, :13], atol=1e-4)
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app, model_manager
+from app.models import BatchScoreOutput, BatchScoreRequest, ScoreOutput
+
+
+reference = FastAPI()
+
+
+@reference.post("/score/batch", response_model=BatchScoreOutput)
+def reference_batch(payload: BatchScoreRequest) -> BatchScoreOutput:
+    results = model_manager.score_batch(payload.items)
+    return BatchScoreOutput(
+        items=[
+            ScoreOutput(risk=risk, band=band, drivers=drivers, model_version=version, as_of_date=item.as_of_date)
+            for item, (risk, band, drivers, version) in zip(payload.items, results)
+        ]
+    )
+
+
+fast = TestClient(app)
+slow = TestClient(reference)
+ITEM = {"user_id": "u-1", "as_of_date": "2026-02-28", "bp_sys_trend_14d": 6.5, "sleep_debt_hours_7d": 4}
+
+BODIES = [
+    {"items": [ITEM, {**ITEM, "a1c_latest": None, "adherence_nudge_7d": None}, {"as_of_date": "2026-3-1"}]},
+    {"items": [{**ITEM, "steps_z_7d": "-1.5", "hrv_z_7d": True, "user_id": None}]},
+    {"items": [ITEM, {**ITEM, "as_of_date": "2026-02-30"}, {**ITEM, "adherence_nudge_7d": 1.5}]},
+    {"items": [{**ITEM, "unknown": 1}, {**ITEM, "user_id": 7}, {"bp_sys_trend_14d": 1.0}, "nope"]},
+    {"items": [ITEM, {**ITEM, "ldl_latest": "high"}, {**ITEM, "as_of_date": None}]},
+    {"items": []},
+    {"items": [ITEM] * 501},
+    {"items": [ITEM], "extra": True},
+    {"item": [ITEM]},
+    [ITEM],
+]
+
+
+@pytest.mark.parametrize("body", BODIES)
+def test_fast_path_matches_pydantic_route(body: object) -> None:
+    got, want = fast.post("/score/batch", json=body), slow.post("/score/batch", json=body)
+    assert got.status_code == want.status_code
+    assert got.json() == want.json()
+
+
+@pytest.mark.parametrize(
+    "content, headers",
+    [
+        (b"", {"content-type": "application/json"}),
+        (b'{"items": [', {"content-type": "application/json"}),
+        (b'{"items":[{"as_of_date":"\xff"}]}', {"content-type": "application/json"}),
+        (json.dumps({"items": [ITEM]}).encode(), {}),
+    ],
+)
+def test_fast_path_matches_body_errors(content: bytes, headers: dict[str, str]) -> None:
+    got, want = fast.post("/score/batch", content=content, headers=headers), slow.post("/score/batch", content=content, headers=headers)
+    assert (got.status_code, got.json()) == (want.status_code, want.json())
+
+
+def test_batch_request_schema_is_documented() -> None:
+    body = fast.get("/openapi.json").json()["paths"]["/score/batch"]["post"]["requestBody"]
+    assert body["content"]["application/json"]["schema"]["properties"]["items"]["items"] == {"$ref": "#/components/schemas/FeaturesV1"}
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.fingerprints import FingerprintIndex
+from app.ml import ModelManager
+from benchmarks.data import feature_dicts, features
+from test_hot_swap import _train
+
+
+def _manager(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> ModelManager:
+    monkeypatch.setenv("RISK_FINGERPRINT_DB", str(tmp_path / "fingerprints.sqlite"))
+    monkeypatch.setenv("RISK_SCORE_CACHE_SIZE", "0")
+    return ModelManager(artifact_dir=tmp_path)
+
+
+def test_unchanged_users_are_served_from_the_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = _manager(tmp_path, monkeypatch)
+    _train(manager)
+    items = features(20, seed=2)
+    first = manager.score_batch(items)
+
+    changed = list(items)
+    changed[3] = changed[3].model_copy(update={"bp_sys_trend_14d": 40.0})
+    scored: list[int] = []
+    original = manager.score_rows
+    monkeypatch.setattr(manager, "score_rows", lambda x, version=None: scored.append(len(x)) or original(x, version))
+
+    second = manager.score_batch(changed)
+    assert scored == [1]
+    assert second[:3] == first[:3] and second[4:] == first[4:]
+    assert second[3] != first[3]
+
+    manager.score_batch(changed, force=True)
+    assert scored == [1, 20]
+    stats = manager.fingerprints.snapshot()
+    assert stats["skipped"] == 19 and stats["forced"] == 20
+
+
+def test_index_survives_restart_and_is_keyed_by_model_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = _manager(tmp_path, monkeypatch)
+    _train(manager)
+    items = features(5, seed=3)
+    first = manager.score_batch(items)
+
+    restarted = _manager(tmp_path, monkeypatch)
+    assert restarted.score_batch(items) == first
+    assert restarted.fingerprints.snapshot()["skip_rate"] == 1.0
+
+    _train(restarted)
+    assert {row[3] for row in restarted.score_batch(items)} == {"ml-2"}
+    assert restarted.fingerprints.snapshot()["skipped"] == 5
+
+
+def test_rows_without_user_id_are_always_scored(tmp_path: Path) -> None:
+    index = FingerprintIndex(tmp_path / "fp.sqlite")
+    x = np.zeros((2, 13))
+    row = (0.5, "amber", (), "ml-1")
+    index.store([None, "u-1"], x, [row, row])
+    assert index.lookup([None, "u-1"], x, "ml-1") == [None, row]
+
+
+def test_batch_endpoint_reports_skipped_rows(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = _manager(tmp_path, monkeypatch)
+    monkeypatch.setattr(main_module, "model_manager", manager)
+    client = TestClient(main_module.app)
+    rows, _ = feature_dicts(10, seed=4)
+    body = {"items": rows}
+
+    assert client.post("/score/batch", json=body).headers["X-Risk-Skipped"] == "0"
+    again = client.post("/score/batch", json=body)
+    assert again.headers["X-Risk-Skipped"] == "10"
+    assert client.post("/score/batch?force=true", json=body).headers["X-Risk-Skipped"] == "0"
+    assert client.get("/health").json()["fingerprints"]["skipped"] == 10
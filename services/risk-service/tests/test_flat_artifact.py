@@ -0,0 +1,52 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.artifacts import current_version
+from app.flatmodel import FLAT_DIR
+from app.ml import ModelManager
+from app.models import TrainRequest
+from benchmarks.data import features, train_request
+from test_hot_swap import _train
+
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.parametrize("model_type", ["logistic_regression", "xgboost"])
+def test_flat_artifact_scores_like_the_pickle(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, model_type: str) -> None:
+    if model_type == "xgboost":
+        pytest.importorskip("xgboost")
+    ModelManager(artifact_dir=tmp_path).train_and_save(TrainRequest.model_validate(train_request(300, seed=4, model_type=model_type)))
+    assert (tmp_path / "versions" / current_version(tmp_path) / FLAT_DIR / "manifest.json").exists()
+
+    flat = ModelManager(artifact_dir=tmp_path)
+    assert flat.model is None and flat.model_loaded()
+    arrays = [value for value in vars(flat.bundle.predictor).values() if isinstance(value, np.ndarray)]
+    assert arrays and all(isinstance(value, np.memmap) for value in arrays)
+
+    monkeypatch.setenv("RISK_MODEL_FORMAT", "pickle")
+    pickled = ModelManager(artifact_dir=tmp_path)
+    assert pickled.model is not None
+
+    items = features(50, seed=8)
+    assert flat.score_batch(items) == pickled.score_batch(items)
+
+
+def test_flat_artifact_serves_without_sklearn_or_xgboost(tmp_path: Path) -> None:
+    _train(ModelManager(artifact_dir=tmp_path))
+    code = (
+        "import sys\n"
+        "sys.modules['sklearn'] = None\n"
+        "sys.modules['xgboost'] = None\n"
+        "from pathlib import Path\n"
+        "from app.ml import ModelManager\n"
+        "from app.models import FeaturesV1\n"
+        f"manager = ModelManager(artifact_dir=Path({str(tmp_path)!r}))\n"
+        "print(manager.score_one(FeaturesV1(as_of_date='2026-02-28', bp_sys_trend_14d=4.0))[3])\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=SERVICE_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "ml-1"
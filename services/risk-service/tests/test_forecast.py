@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.forecast import Forecaster, history_stats, project
+from app.ml import ModelManager
+from app.models import FEATURE_NAMES_V1, FeaturesV1, ForecastRequest
+
+
+BP = FEATURE_NAMES_V1.index("bp_sys_trend_14d")
+SLEEP = FEATURE_NAMES_V1.index("sleep_debt_hours_7d")
+A1C = FEATURE_NAMES_V1.index("a1c_latest")
+
+
+def _history(n: int, skip: tuple[int, ...] = ()) -> list[dict]:
+    start = date(2026, 2, 1)
+    return [
+        {
+            "user_id": "u-1",
+            "as_of_date": (start + timedelta(days=i)).isoformat(),
+            "bp_sys_trend_14d": 1.0 + 0.5 * i,
+            "sleep_debt_hours_7d": 2.0 if i < n - 3 else 5.0,
+            "a1c_latest": 6.1 if i < 3 else None,
+        }
+        for i in range(n)
+        if i not in skip
+    ]
+
+
+def test_trends_extrapolate_and_other_features_hold() -> None:
+    items = [FeaturesV1.model_validate(row) for row in _history(10, skip=(4,))]
+    x = np.array([[getattr(item, name) for name in FEATURE_NAMES_V1] for item in items], dtype=float)
+    days = np.array([(date.fromisoformat(item.as_of_date) - date(2026, 2, 10)).days for item in items])
+    stats = history_stats(x, days)
+
+    assert np.isclose(stats.slope[BP], 0.5)
+    assert np.isclose(stats.level[BP], 5.5)
+    assert stats.slope[SLEEP] == 0.0
+    assert np.isclose(stats.level[SLEEP], (2.0 * 3 + 5.0 * 3) / 6)
+    assert stats.level[A1C] == 6.1
+
+    rows = project(stats, 30)
+    assert np.isclose(rows[0, BP], 6.0)
+    # Clamped to the observed range widened by its span (1.0..5.5 -> up to 10.0).
+    assert rows[-1, BP] == 10.0
+
+
+def test_forecast_scores_current_and_projected_days(tmp_path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    forecaster = Forecaster(cache_size=8)
+    req = ForecastRequest.model_validate({"history": _history(12), "horizon_days": 14})
+    out = forecaster.forecast(manager, req)
+
+    assert out.current.as_of_date == "2026-02-12"
+    assert [p.day for p in out.trajectory] == list(range(1, 15))
+    assert out.trajectory[-1].as_of_date == "2026-02-26"
+    assert out.confidence == "high"
+    assert out.model_version == "rule-v0"
+    assert out.slope_per_day > 0
+
+    # The last day has no A1c: it is scored with the latest observed one, like the trajectory.
+    last = FeaturesV1.model_validate(_history(12)[-1] | {"a1c_latest": 6.1})
+    assert out.current.risk == manager.score_batch([last])[0][0]
+
+    forecaster.forecast(manager, req)
+    assert forecaster.cache.snapshot()["hits"] == 1
+
+
+def test_flat_history_with_a_sparse_lab_forecasts_flat(tmp_path) -> None:
+    history = [
+        {"as_of_date": (date(2026, 2, 1) + timedelta(days=i)).isoformat(), "sleep_debt_hours_7d": 3.0}
+        | ({"a1c_latest": 9.5, "ldl_latest": 190.0} if i == 3 else {})
+        for i in range(10)
+    ]
+    req = ForecastRequest.model_validate({"history": history, "horizon_days": 7})
+    out = Forecaster(cache_size=0).forecast(ModelManager(artifact_dir=tmp_path), req)
+
+    assert out.slope_per_day == 0
+    assert out.trajectory[0].risk == out.current.risk
+
+
+def test_forecast_endpoint() -> None:
+    client = TestClient(main_module.app)
+    res = client.post("/forecast", json={"history": _history(3), "horizon_days": 5})
+    assert res.status_code == 200
+    assert len(res.json()["trajectory"]) == 5
+    assert res.json()["confidence"] == "low"
+
+    duplicate = _history(2) + _history(1)
+    assert client.post("/forecast", json={"history": duplicate}).status_code == 422
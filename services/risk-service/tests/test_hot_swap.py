@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from app.artifacts import current_version
+from app.ml import ModelManager
+from app.models import FeaturesV1, TrainRequest
+from test_train_smoke import _row
+
+
+def _train(manager: ModelManager) -> str:
+    rows = [_row(i, 1.0 if i % 2 else 0.0) for i in range(30)]
+    return manager.train_and_save(TrainRequest.model_validate({"rows": rows}))["model_version"]
+
+
+def test_versions_are_published_atomically(tmp_path: Path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    assert _train(manager) == "ml-1"
+    assert _train(manager) == "ml-2"
+
+    assert current_version(tmp_path) == "ml-2"
+    assert (tmp_path / "versions" / "ml-1" / "model.pkl").exists()
+    assert (tmp_path / "versions" / "ml-2" / "metadata.json").exists()
+    assert not [p for p in (tmp_path / "versions").iterdir() if p.name.startswith(".")]
+
+
+def test_other_worker_picks_up_new_model(tmp_path: Path) -> None:
+    trainer = ModelManager(artifact_dir=tmp_path)
+    worker = ModelManager(artifact_dir=tmp_path)
+    worker.reload_interval = 60.0
+    assert worker.model_version() == "rule-v0"
+    in_flight = worker.bundle
+
+    _train(trainer)
+    assert worker.reload_if_changed(force=True) is True
+    assert worker.model_version() == "ml-1"
+    assert in_flight.version == "rule-v0"
+    assert worker.reload_if_changed(force=True) is False
+
+    features = FeaturesV1(as_of_date="2026-02-28", bp_sys_trend_14d=5.0)
+    assert worker.score_one(features)[3] == "ml-1"
+
+    _train(trainer)
+    assert worker.reload_if_changed() is False  # inside reload_interval, no stat yet
+    assert worker.reload_if_changed(force=True) is True
+    assert worker.model_version() == "ml-2"
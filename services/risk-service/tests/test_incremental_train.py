@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.artifacts import METADATA_FILE, VERSIONS_DIR
+from app.ml import ModelManager
+from app.models import TrainRequest
+from app.utils import load_json
+from benchmarks.data import train_request
+from test_train_smoke import _row
+
+
+def _request(n: int, seed: int, model_type: str, incremental: bool) -> TrainRequest:
+    return train_request(n, seed=seed, model_type=model_type, incremental=incremental)
+
+
+@pytest.mark.parametrize("model_type", ["logistic_regression", "xgboost"])
+def test_incremental_training_appends_and_warm_starts(tmp_path: Path, model_type: str) -> None:
+    if model_type == "xgboost":
+        pytest.importorskip("xgboost")
+    manager = ModelManager(artifact_dir=tmp_path)
+    manager.train_and_save(_request(200, 1, model_type, incremental=False))
+    assert manager.training_store.n_rows() == 200
+
+    out = manager.train_and_save(_request(50, 2, model_type, incremental=True))
+    assert out["model_version"] == "ml-2"
+    assert out["n_samples"] == 250
+    assert manager.training_store.n_rows() == 250
+    metadata = load_json(tmp_path / VERSIONS_DIR / "ml-2" / METADATA_FILE)
+    assert metadata["incremental"] == {"n_new_samples": 50, "n_holdout": 10, "warm_start_from": "ml-1"}
+    assert metadata["model_type"] == model_type
+
+    # A full retrain resets the stored set to its own rows.
+    manager.train_and_save(_request(100, 3, model_type, incremental=False))
+    assert manager.training_store.n_rows() == 100
+
+
+def test_incremental_xgboost_refits_past_the_tree_cap_and_evaluates_on_the_upload(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pytest.importorskip("xgboost")
+    monkeypatch.setenv("RISK_INCREMENTAL_MAX_TREES", "100")
+    manager = ModelManager(artifact_dir=tmp_path)
+    manager.train_and_save(_request(200, 1, "xgboost", incremental=False))
+    trees = []
+    for seed in (2, 3, 4):
+        manager.train_and_save(_request(50, seed, "xgboost", incremental=True))
+        trees.append(manager._warm_start_source("xgboost")[0].get_booster().num_boosted_rounds())
+    # 80 + 20 reaches the cap; the next upload refits from scratch instead of growing to 120.
+    assert trees == [100, 80, 100]
+    metadata = load_json(tmp_path / VERSIONS_DIR / "ml-3" / METADATA_FILE)
+    assert metadata["incremental"]["warm_start_from"] is None and metadata["n_samples"] == 300
+
+    # The holdout comes from the upload alone: scoring those rows reproduces the reported logloss.
+    from app.training import safe_logloss
+
+    request = _request(50, 5, "xgboost", incremental=True)
+    new_x = np.array([r.features.as_feature_vector() for r in request.rows])
+    new_y = np.array([float(r.label) >= 0.5 for r in request.rows], dtype=int)
+    _, held = manager._split_dataset(np.arange(50), new_y)[:2]
+    out = manager.train_and_save(request)
+    model = manager._warm_start_source("xgboost")[0]
+    assert out["metrics"]["logloss"] == pytest.approx(safe_logloss(new_y[held], model.predict_proba(new_x[held])[:, 1]))
+
+
+def test_store_round_trips_rows_column_major(tmp_path: Path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    x = np.arange(26, dtype=float).reshape(2, 13)
+    manager.training_store.append(x, np.array([0.0, 1.0]))
+    manager.training_store.append(x + 100, np.array([1.0, 0.0]))
+    stored_x, stored_y = manager.training_store.load()
+    assert stored_x.dtype == np.float32
+    np.testing.assert_array_equal(stored_x, np.vstack([x, x + 100]))
+    np.testing.assert_array_equal(stored_y, [0.0, 1.0, 1.0, 0.0])
+    assert np.load(manager.training_store.segments()[0] / "x.npy").flags.f_contiguous
+
+
+def test_failed_incremental_fit_stores_nothing(tmp_path: Path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    rows = [_row(i, 1.0) for i in range(10)]
+    with pytest.raises(ValueError):
+        manager.train_and_save(TrainRequest.model_validate({"rows": rows, "incremental": True}))
+    assert manager.training_store.n_rows() == 0
+
+
+def test_incremental_search_is_rejected(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(main_module, "model_manager", ModelManager(artifact_dir=tmp_path))
+    rows = [_row(i, float(i % 2)) for i in range(10)]
+    res = TestClient(main_module.app).post("/train", json={"rows": rows, "incremental": True, "search": True})
+    assert res.status_code == 400
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from app.inference import LinearPredictor, compile_model, compile_tree_dump
+
+
+def _dataset(n: int = 400, seed: int = 3) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 2.0, size=(n, 13))
+    y = (x[:, 0] - 0.5 * x[:, 6] + rng.normal(0.0, 1.0, size=n) > 0).astype(int)
+    return x, y
+
+
+def test_linear_predictor_matches_sklearn() -> None:
+    x, y = _dataset()
+    model = LogisticRegression(max_iter=1000).fit(x, y)
+    predictor = compile_model(model)
+    assert isinstance(predictor, LinearPredictor)
+    np.testing.assert_allclose(predictor.predict_proba(x), model.predict_proba(x)[:, 1], rtol=0, atol=1e-12)
+
+
+def test_tree_dump_traversal() -> None:
+    # f0 < 1 ? (f6 < 0 ? 0.4 : -0.2) : 0.3, missing f0 goes right; plus a stump on f12.
+    tree_a = {
+        "nodeid": 0, "split": "f0", "split_condition": 1.0, "yes": 1, "no": 2, "missing": 2,
+        "children": [
+            {"nodeid": 1, "split": "f6", "split_condition": 0.0, "yes": 3, "no": 4, "missing": 3,
+             "children": [{"nodeid": 3, "leaf": 0.4}, {"nodeid": 4, "leaf": -0.2}]},
+            {"nodeid": 2, "leaf": 0.3},
+        ],
+    }
+    tree_b = {"nodeid": 0, "leaf": -0.1}
+    predictor = compile_tree_dump([tree_a, tree_b], base_margin=0.0, importances=np.zeros(13))
+
+    x = np.zeros((4, 13))
+    x[0, 0], x[0, 6] = 0.5, -1.0
+    x[1, 0], x[1, 6] = 0.5, 1.0
+    x[2, 0] = 2.0
+    x[3, 0] = np.nan
+    np.testing.assert_allclose(predictor.predict_margin(x), [0.3, -0.3, 0.2, 0.2], atol=1e-6)
+
+
+def test_xgboost_predictor_matches_estimator() -> None:
+    xgboost = pytest.importorskip("xgboost")
+    x, y = _dataset()
+    x[::17, 3] = np.nan
+    model = xgboost.XGBClassifier(n_estimators=40, max_depth=3, learning_rate=0.1, eval_metric="logloss").fit(x, y)
+    predictor = compile_model(model)
+    np.testing.assert_allclose(predictor.predict_proba(x), model.predict_proba(x)[:, 1], rtol=0, atol=1e-6)
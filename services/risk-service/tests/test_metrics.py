@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def test_metrics_exposes_latency_stages_and_bands() -> None:
+    item = {"user_id": "u-1", "as_of_date": "2026-02-28", "bp_sys_trend_14d": 4.0}
+    assert client.post("/score", json=item).status_code == 200
+    assert client.post("/score/batch", json={"items": [item, {**item, "steps_z_7d": -2.0}]}).status_code == 200
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    text = res.text
+    assert 'risk_request_duration_seconds_count{endpoint="/score"}' in text
+    for stage in ("validation", "vectorize", "predict", "serialization"):
+        assert f'risk_stage_duration_seconds_count{{endpoint="/score/batch",stage="{stage}"}}' in text
+    assert 'risk_batch_size_bucket{endpoint="/score/batch",le="2"}' in text
+    assert "risk_scores_total{band=" in text
+    assert "risk_model_info{model_version=" in text
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.concurrency import Lane
+from app.microbatch import MicroBatcher
+from app.ml import ModelManager
+from app.models import FeaturesV1
+
+
+def _features(n: int) -> list[FeaturesV1]:
+    return [FeaturesV1(as_of_date="2026-02-28", bp_sys_trend_14d=float(i), sleep_debt_hours_7d=i / 2) for i in range(n)]
+
+
+def test_concurrent_calls_share_batches_and_get_their_own_rows(tmp_path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    calls: list[int] = []
+
+    def score_batch(items):
+        calls.append(len(items))
+        return manager.score_batch(items)
+
+    lane = Lane("test", workers=1, queue_size=8, timeout_s=None)
+    batcher = MicroBatcher(score_batch, lane, window_s=0.05, max_items=3)
+    items = _features(7)
+
+    async def main():
+        return await asyncio.gather(*(batcher.score(item) for item in items))
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        lane.shutdown()
+    assert calls == [3, 3, 1]
+    assert results == [manager.score_one(item) for item in items]
+    assert batcher.snapshot()["batches"] == 3
+
+
+def test_score_endpoint_uses_batcher_when_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    lane = Lane("score", workers=1, queue_size=8, timeout_s=None)
+    batcher = MicroBatcher(lambda items: main_module.model_manager.score_batch(items), lane, window_s=0.001, max_items=8)
+    monkeypatch.setattr(main_module, "score_batcher", batcher)
+    try:
+        res = TestClient(main_module.app).post("/score", json={"as_of_date": "2026-02-28", "bp_sys_trend_14d": 5.0})
+    finally:
+        lane.shutdown()
+    assert res.status_code == 200
+    assert batcher.snapshot()["items"] == 1
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.batch import feature_matrix
+from app.concurrency import Lane
+from app.ml import ModelManager
+from app.models import FeaturesV1
+from app.registry import ModelRegistry, UnknownModelVersion
+from app.shadow import ShadowScorer
+from benchmarks.data import features
+from test_hot_swap import _train
+
+
+def test_registry_evicts_least_recently_used_past_budget() -> None:
+    loaded: list[str] = []
+
+    def loader(version: str):
+        loaded.append(version)
+        return f"bundle-{version}", 40
+
+    registry = ModelRegistry(loader, budget_bytes=100)
+    assert registry.get("a") == "bundle-a"
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+    assert registry.loaded() == ["a", "c"]
+    registry.get("a")
+    assert loaded == ["a", "b", "c"]
+    assert registry.snapshot()["evictions"] == 1
+
+
+def test_manager_scores_pinned_versions(tmp_path: Path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    _train(manager)
+    _train(manager)
+    item = FeaturesV1(as_of_date="2026-02-28", bp_sys_trend_14d=6.0)
+
+    assert manager.score_one(item)[3] == "ml-2"
+    assert manager.score_one(item, "ml-1")[3] == "ml-1"
+    assert manager.score_one(item, "rule-v0")[3] == "rule-v0"
+    assert [row[3] for row in manager.score_batch([item, item], "ml-1")] == ["ml-1", "ml-1"]
+    assert manager.available_versions() == ["rule-v0", "ml-1", "ml-2"]
+    assert manager.registry.loaded() == ["ml-1"]
+    for bad in ("ml-9", "../ml-1", ""):
+        with pytest.raises(UnknownModelVersion):
+            manager.score_one(item, bad)
+
+
+def test_shadow_records_differences_off_the_request_path(tmp_path: Path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    _train(manager)
+    lane = Lane("shadow", workers=1, queue_size=0, timeout_s=None)
+    shadow = ShadowScorer(manager, lane, version="rule-v0")
+    try:
+        x = feature_matrix(features(20, seed=3))
+        rows = manager.score_rows(x)
+        future = shadow.observe(x, [(risk, band) for risk, band, _, _ in rows], "ml-1")
+        assert shadow.observe(x, [(0.5, "amber")], "rule-v0") is None
+        future.result(timeout=10)
+    finally:
+        lane.shutdown()
+    stats = shadow.snapshot()
+    assert stats["rows"] == 20
+    assert stats["max_abs_diff"] > 0
+
+
+def test_endpoints_accept_model_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    _train(manager)
+    monkeypatch.setattr(main_module, "model_manager", manager)
+    client = TestClient(main_module.app)
+    item = {"as_of_date": "2026-02-28", "bp_sys_trend_14d": 5.0}
+
+    assert client.post("/score", json=item).json()["model_version"] == "ml-1"
+    assert client.post("/score?model_version=rule-v0", json=item).json()["model_version"] == "rule-v0"
+    res = client.post("/score/batch?model_version=rule-v0", json={"items": [item]})
+    assert res.json()["items"][0]["model_version"] == "rule-v0"
+    assert client.post("/score?model_version=ml-7", json=item).status_code == 404
+    assert client.post("/score/stream?model_version=ml-7", content=b"{}\n").status_code == 404
+
+    models = client.get("/models").json()
+    assert models["active"] == "ml-1"
+    assert models["available"] == ["rule-v0", "ml-1"]
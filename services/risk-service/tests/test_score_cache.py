@@ -0,0 +1,38 @@
+import time
+from pathlib import Path
+
+from app.cache import ScoreCache
+from app.ml import ModelManager
+from app.models import FeaturesV1, TrainRequest
+from test_train_smoke import _row
+
+
+def _features(bp: float) -> FeaturesV1:
+    return FeaturesV1(user_id="u-1", as_of_date="2026-02-28", bp_sys_trend_14d=bp)
+
+
+def test_cache_hits_and_invalidates_on_new_model(tmp_path: Path) -> None:
+    manager = ModelManager(artifact_dir=tmp_path)
+    first = manager.score_one(_features(4.0))
+    assert manager.score_one(_features(4.0)) == first
+    manager.score_batch([_features(4.0), _features(1.0)])
+    stats = manager.score_cache.snapshot()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+
+    rows = [_row(i, 1.0 if i % 2 else 0.0) for i in range(30)]
+    manager.train_and_save(TrainRequest.model_validate({"rows": rows}))
+    assert manager.score_cache.snapshot()["size"] == 0
+    assert manager.score_one(_features(4.0))[3] == "ml-1"
+
+
+def test_cache_evicts_and_expires() -> None:
+    cache = ScoreCache(max_size=2, ttl_seconds=0.05)
+    for idx in range(3):
+        cache.put(("rule-v0", bytes([idx])), (0.1, "green", [], "rule-v0"))
+    assert cache.snapshot()["evictions"] == 1
+    assert cache.get(("rule-v0", bytes([0]))) is None
+    assert cache.get(("rule-v0", bytes([2]))) is not None
+
+    time.sleep(0.06)
+    assert cache.get(("rule-v0", bytes([2]))) is None
+    assert cache.snapshot()["expirations"] == 1
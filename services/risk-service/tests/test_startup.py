@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.ml import ModelManager
+from test_hot_swap import _train
+
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_serving_imports_skip_training_dependencies() -> None:
+    code = "import sys, app.main; print(sorted(m for m in ('sklearn', 'xgboost') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=SERVICE_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_manager_warms_up_on_demand(tmp_path: Path) -> None:
+    version = _train(ModelManager(artifact_dir=tmp_path))
+
+    manager = ModelManager(artifact_dir=tmp_path, load=False)
+    assert manager.status == "cold" and not manager.model_loaded()
+    assert manager.ensure_ready()
+    assert manager.status == "ready" and manager.model_version() == version
+    assert manager.load_seconds is not None
+
+
+def test_lifespan_loads_in_background_and_reports_startup(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(main_module, "model_manager", ModelManager(artifact_dir=tmp_path, load=False))
+    monkeypatch.setattr(main_module, "LANES", ())  # shutdown would stop the lanes other tests share
+    with TestClient(main_module.app) as client:
+        for _ in range(500):
+            res = client.post("/score", json={"as_of_date": "2026-02-28"})
+            if res.status_code != 503:
+                break
+            time.sleep(0.01)
+        assert res.status_code == 200
+        body = client.get("/health").json()
+    assert body["status"] == "ready"
+    assert {"model_load_s", "first_score_s"} <= set(body["startup"])
@@ -0,0 +1,25 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def test_stream_scores_lines_and_reports_bad_ones() -> None:
+    good = {"user_id": "u-1", "as_of_date": "2026-02-28", "bp_sys_trend_14d": 4.0, "steps_z_7d": -1.0}
+    lines = [json.dumps(good), "", "{not json", json.dumps({**good, "as_of_date": "28/02/2026"})]
+    lines += [json.dumps({**good, "user_id": f"u-{i}"}) for i in range(600)]
+    body = ("\n".join(lines) + "\n").encode()
+
+    res = client.post("/score/stream", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert res.status_code == 200
+    out = [json.loads(line) for line in res.text.splitlines()]
+
+    assert len(out) == 603
+    assert out[0]["band"] in {"green", "amber", "red"}
+    assert out[1]["line"] == 3 and "error" in out[1]
+    assert out[2]["line"] == 4 and "as_of_date" in out[2]["error"]
+    assert all("risk" in row for row in out[3:])
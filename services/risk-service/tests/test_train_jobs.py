@@ -0,0 +1,50 @@
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.main import app
+from app.ml import ModelManager
+from test_train_smoke import _row
+
+
+def _wait(client: TestClient, job_id: str) -> dict:
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        body = client.get(f"/train/jobs/{job_id}").json()
+        if body["status"] in {"succeeded", "failed"}:
+            return body
+        time.sleep(0.05)
+    raise AssertionError("training job did not finish")
+
+
+def test_background_train_job_reports_result(tmp_path: Path) -> None:
+    main_module.model_manager = ModelManager(artifact_dir=tmp_path)
+    client = TestClient(app)
+
+    rows = [_row(i, 1.0 if i % 2 else 0.0) for i in range(30)]
+    res = client.post("/train?background=true", json={"rows": rows})
+    assert res.status_code == 202
+    job = res.json()
+    assert job["status"] in {"queued", "running"}
+
+    done = _wait(client, job["job_id"])
+    assert done["status"] == "succeeded"
+    assert done["progress"] == 1.0
+
+    result = client.get(f"/train/jobs/{job['job_id']}/result")
+    assert result.status_code == 200
+    assert result.json()["model_version"] == "ml-1"
+    assert client.get("/health").json()["model_version"] == "ml-1"
+
+
+def test_background_train_job_failure(tmp_path: Path) -> None:
+    main_module.model_manager = ModelManager(artifact_dir=tmp_path)
+    client = TestClient(app)
+
+    rows = [_row(i, 1.0) for i in range(10)]
+    job = client.post("/train?background=true", json={"rows": rows}).json()
+    assert _wait(client, job["job_id"])["status"] == "failed"
+    assert client.get(f"/train/jobs/{job['job_id']}/result").status_code == 400
+    assert client.get("/train/jobs/missing").status_code == 404
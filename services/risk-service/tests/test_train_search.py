@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from app.ml import ModelManager
+from app.models import TrainRequest
+from app.training import param_grid
+from app.utils import load_json
+from test_train_smoke import _row
+
+
+def test_train_search_records_cv_report(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("RISK_TRAIN_WORKERS", "2")
+    manager = ModelManager(artifact_dir=tmp_path)
+    rows = [_row(i, 1.0 if i % 2 else 0.0) for i in range(40)]
+
+    out = manager.train_and_save(TrainRequest.model_validate({"rows": rows, "search": True, "cv_folds": 4}))
+    assert out["model_version"] == "ml-1"
+    assert out["metrics"]["logloss"] is not None
+
+    cv = load_json(tmp_path / "metadata.json")["cross_validation"]
+    assert cv["folds"] == 4
+    assert len(cv["candidates"]) == len(param_grid(manager.metadata["model_type"]))
+    assert all(len(c["fold_auc"]) == 4 and len(c["fold_logloss"]) == 4 for c in cv["candidates"])
+    best = min(c["mean_logloss"] for c in cv["candidates"])
+    assert next(c for c in cv["candidates"] if c["params"] == cv["best_params"])["mean_logloss"] == best
+    assert cv["timings"]["search_seconds"] > 0
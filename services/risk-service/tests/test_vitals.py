@@ -0,0 +1,196 @@
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.daily_job import VitalsFeatureSource, run
+from app.ml import ModelManager
+from app.models import FEATURE_NAMES_V1
+from app.vitals import (
+    CLAMPS,
+    Readings,
+    RollingFeatures,
+    compute_features,
+    readings_from_measurements,
+)
+
+
+START = date(2026, 1, 1)
+KIND_VALUES = {
+    "bp_sys": (128.0, 9.0),
+    "bp_dia": (82.0, 6.0),
+    "weight": (88.0, 1.5),
+    "glucose": (105.0, 12.0),
+    "hrv": (45.0, 8.0),
+    "hr": (66.0, 4.0),
+    "steps": (7500.0, 2500.0),
+    "sleep": (6.8, 1.2),
+    "a1c": (5.9, 0.4),
+    "ldl": (120.0, 15.0),
+}
+
+
+def _raw(n_users: int, n_days: int, seed: int = 3) -> list[tuple[str, float, str, float]]:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for user in range(n_users):
+        for day in range(n_days):
+            midnight = datetime(START.year, START.month, START.day, tzinfo=timezone.utc) + timedelta(days=day)
+            for kind, (mean, spread) in KIND_VALUES.items():
+                rate = 0.05 if kind in ("a1c", "ldl") else 0.6
+                for _ in range(rng.poisson(rate)):
+                    ts = (midnight + timedelta(seconds=float(rng.uniform(0, 86_399)))).timestamp()
+                    drift = 0.1 * day if kind in ("bp_sys", "weight") else 0.0
+                    rows.append((f"u{user}", ts, kind, float(rng.normal(mean + drift, spread))))
+            if rng.random() < 0.7:
+                rows.append((f"u{user}", midnight.timestamp(), "nudge", float(rng.random() < 0.6)))
+    return rows
+
+
+def _readings(rows: list[tuple[str, float, str, float]]) -> Readings:
+    user_id, ts, kind, value = zip(*rows)
+    return Readings.from_columns(user_id, ts, kind, value)
+
+
+def _reference(rows: list[tuple[str, float, str, float]], user: str, as_of: date) -> list[float | None]:
+    """computeFeaturesV1.ts, one user and date at a time."""
+    end = datetime(as_of.year, as_of.month, as_of.day, tzinfo=timezone.utc).timestamp() + 86_400
+
+    def points(kind: str, first: int, last: int) -> list[tuple[float, float]]:
+        lo, hi = end - (first + 1) * 86_400, end - last * 86_400
+        return sorted((ts, v) for u, ts, k, v in rows if u == user and k == kind and lo <= ts < hi)
+
+    def slope(pts: list[tuple[float, float]]) -> float:
+        if len(pts) < 3:
+            return 0.0
+        xs = np.array([ts / 86_400 for ts, _ in pts])
+        ys = np.array([v for _, v in pts])
+        den = ((xs - xs.mean()) ** 2).sum()
+        return float(((xs - xs.mean()) * (ys - ys.mean())).sum() / den) if den else 0.0
+
+    def std(values: list[float]) -> float:
+        return float(np.std(values)) if len(values) >= 2 else 0.0
+
+    def zscore(kind: str) -> float:
+        recent = [v for _, v in points(kind, 6, 0)]
+        base = [v for _, v in points(kind, 30, 7)]
+        if not recent or len(base) < 3:
+            return 0.0
+        return (np.mean(recent) - np.mean(base)) / max(std(base), 0.25)
+
+    sleep_by_day: dict[int, float] = {}
+    for ts, v in points("sleep", 6, 0):
+        day = int(ts // 86_400)
+        sleep_by_day[day] = max(sleep_by_day.get(day, 0.0), v)
+    debt = sum(max(0.0, 7.5 - sleep_by_day.get(int(end // 86_400) - 1 - i, 0.0)) for i in range(7)) / 7
+    nudges = [v for _, v in points("nudge", 6, 0)]
+    labs = {kind: points(kind, 180, 0) for kind in ("a1c", "ldl")}
+    out = {
+        "bp_sys_trend_14d": slope(points("bp_sys", 13, 0)),
+        "bp_sys_var_7d": std([v for _, v in points("bp_sys", 6, 0)]),
+        "bp_dia_trend_14d": slope(points("bp_dia", 13, 0)),
+        "bp_dia_var_7d": std([v for _, v in points("bp_dia", 6, 0)]),
+        "hrv_z_7d": zscore("hrv"),
+        "rhr_z_7d": zscore("hr"),
+        "steps_z_7d": zscore("steps"),
+        "sleep_debt_hours_7d": debt,
+        "weight_trend_14d": slope(points("weight", 13, 0)),
+        "glucose_trend_14d": slope(points("glucose", 13, 0)),
+        "a1c_latest": labs["a1c"][-1][1] if labs["a1c"] else None,
+        "ldl_latest": labs["ldl"][-1][1] if labs["ldl"] else None,
+        "adherence_nudge_7d": sum(nudges) / len(nudges) if nudges else 0.5,
+    }
+    for name, (low, high) in CLAMPS.items():
+        out[name] = min(max(out[name], low), high)
+    return [out[name] for name in FEATURE_NAMES_V1]
+
+
+def _assert_matches(x: np.ndarray, expected: list[float | None]) -> None:
+    want = np.array([np.nan if v is None else v for v in expected])
+    np.testing.assert_allclose(x, want, rtol=1e-4, atol=1e-4, equal_nan=True)
+
+
+def test_compute_features_matches_the_typescript_definitions() -> None:
+    rows = _raw(n_users=6, n_days=50)
+    dates = [(START + timedelta(days=offset)).isoformat() for offset in (2, 20, 49)]
+    frame = compute_features(_readings(rows), dates)
+
+    assert len(frame) == 18 and frame.user_ids[:3] == ["u0"] * 3 and frame.as_of_dates[:3] == dates
+    for idx, (user, as_of) in enumerate(zip(frame.user_ids, frame.as_of_dates)):
+        _assert_matches(frame.x[idx], _reference(rows, user, date.fromisoformat(as_of)))
+
+
+def test_rolling_features_match_batch_day_by_day_including_late_readings(tmp_path: Path) -> None:
+    rows = _raw(n_users=5, n_days=45, seed=11)
+    readings = _readings(rows)
+    days = readings.days - (START - date(1970, 1, 1)).days
+    # Every fifth reading arrives a day late (or on time on day 0).
+    arrival = np.where(np.arange(len(readings)) % 5 == 0, days + 1, days)
+    engine = RollingFeatures(START.isoformat())
+    for day in range(45):
+        if day:
+            engine.advance()
+        if day == 20:
+            engine.save(tmp_path / "state.npz")
+            engine = RollingFeatures.load(tmp_path / "state.npz")
+        engine.add(readings.select(arrival == day))
+        if day in (5, 30, 44):
+            rolled = engine.frame()
+            want = compute_features(readings.select(arrival <= day), engine.as_of_date, user_ids=rolled.user_ids)
+            np.testing.assert_allclose(rolled.x, want.x, rtol=1e-4, atol=1e-4, equal_nan=True)
+    assert engine.as_of_date == (START + timedelta(days=44)).isoformat()
+
+    with pytest.raises(ValueError):
+        engine.add(_readings([("u0", datetime(2026, 3, 1, tzinfo=timezone.utc).timestamp(), "hr", 60.0)]))
+
+
+def test_measurement_documents_and_frame_feed_the_batch_scorer() -> None:
+    as_of = "2026-02-10"
+    records = [
+        {
+            "userId": "a",
+            "type": "bp",
+            "measuredAt": f"2026-02-0{d}T08:00:00Z",
+            "payload": {"systolic": 120 + 2 * d, "diastolic": 80},
+        }
+        for d in range(1, 10)
+    ] + [
+        {"userId": "a", "type": "sleep", "measuredAt": f"2026-02-{d:02d}T07:00:00Z", "payload": {"hours": 8}}
+        for d in range(4, 10)
+    ] + [
+        {"userId": "a", "type": "sleep", "measuredAt": "2026-02-10T07:00:00Z", "payload": {"minutes": 360}},
+        {"userId": "a", "type": "glucose", "measuredAt": "2026-02-09T07:00:00Z", "payload": {"mmol": 5.5}},
+        {"userId": "a", "type": "lipid", "measuredAt": "2025-06-01T07:00:00Z", "payload": {"ldl": 150}},
+        {"userId": "b", "type": "a1c", "measuredAt": "2026-01-15T07:00:00Z", "payload": {"percent": "6.1"}},
+        {"userId": "b", "type": "nudge", "ts": "2026-02-09", "payload": {"status": "completed"}},
+        {"userId": "b", "type": "nudge", "ts": "2026-02-10", "payload": {"status": "done"}},
+        {"userId": "b", "type": "nudge", "ts": "2026-02-10", "payload": {"status": "snoozed"}},
+        {"userId": "b", "type": "hr", "measuredAt": "2026-02-10T07:00:00Z", "payload": {"bpm": "n/a"}},
+    ]
+    frame = compute_features(readings_from_measurements(records), as_of)
+    a, b = (dict(zip(FEATURE_NAMES_V1, row)) for row in frame.x.tolist())
+    assert a["bp_sys_trend_14d"] == pytest.approx(2.0)
+    assert a["sleep_debt_hours_7d"] == pytest.approx(1.5 / 7)
+    assert np.isnan(a["ldl_latest"]) and a["adherence_nudge_7d"] == 0.5
+    assert b["a1c_latest"] == pytest.approx(6.1) and b["adherence_nudge_7d"] == pytest.approx(2 / 3)
+
+    items = frame.items()
+    assert items[0].ldl_latest is None and items[1].a1c_latest == pytest.approx(6.1)
+    rows, _ = ModelManager().score_users(frame.user_ids, frame.matrix())
+    assert [row[3] for row in rows] == ["rule-v0", "rule-v0"]
+    chunk = next(frame.chunks(10))
+    assert chunk["user_id"] == ["a", "b"] and chunk["ldl_latest"] == [None, None]
+
+
+def test_daily_job_scores_straight_from_a_raw_vitals_export(tmp_path: Path) -> None:
+    rows = _raw(n_users=4, n_days=20, seed=2)
+    export = tmp_path / "vitals-2026-01-20.csv"
+    with export.open("w") as f:
+        f.write("user_id,ts,kind,value\n")
+        for user, ts, kind, value in rows:
+            stamp = datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+            f.write(f"{user},{stamp},{kind},{value}\n")
+
+    stats = run("2026-01-20", VitalsFeatureSource(str(tmp_path / "vitals-{date}.csv")), tmp_path / "runs", chunk_size=3)
+    assert stats["rows"] == 4 and stats["chunks"] == 2 and stats["error_rows"] == 0